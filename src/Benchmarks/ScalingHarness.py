@@ -0,0 +1,201 @@
+import cProfile
+import io
+import math
+import pstats
+import sys
+import time
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, List, Optional, Tuple
+
+from rich.console import Console
+
+from ..Parser.HTMLParser import HTMLParser, Node
+from ..Parser.CSSParser import CSSParser
+from ..Parser.StyleResolver import StyleResolver
+from ..Profiling.Profiler import Profiler
+from ..Views.TerminalRenderer import TerminalRenderer
+from .SyntheticPage import SyntheticPage, SyntheticSpec
+
+
+# Expected growth exponents per (axis, stage). A fitted exponent above
+# bound + tolerance means the stage scales worse than it should.
+# "nodes" varies the document size at a fixed stylesheet, "rules" varies
+# the stylesheet at a fixed document.
+EXPECTED_BOUNDS: Dict[Tuple[str, str], float] = {
+    ("nodes", "parse"): 1.0,
+    ("nodes", "style"): 1.0,
+    ("nodes", "render"): 1.0,
+    ("rules", "css"): 1.0,
+    ("rules", "style"): 1.0,
+}
+
+
+def count_nodes(root: Node) -> int:
+    """Count nodes without recursion so deep documents are safe."""
+    return sum(1 for _ in root.walk())
+
+
+def fit_exponent(sizes: List[float], times: List[float]) -> float:
+    """Least squares slope of log(time) against log(size)."""
+    points = [(math.log(s), math.log(t)) for s, t in zip(sizes, times) if s > 0 and t > 0]
+    if len(points) < 2:
+        return 0.0
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if var_x == 0:
+        return 0.0
+    cov = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    return cov / var_x
+
+
+@dataclass
+class StageFit:
+    axis: str
+    stage: str
+    sizes: List[int]
+    times: List[float]
+    exponent: float
+    bound: float
+
+    def within(self, tolerance: float) -> bool:
+        return self.exponent <= self.bound + tolerance
+
+
+@dataclass
+class ScalingReport:
+    fits: List[StageFit] = field(default_factory=list)
+    tolerance: float = 0.3
+
+    @property
+    def failures(self) -> List[StageFit]:
+        return [fit for fit in self.fits if not fit.within(self.tolerance)]
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+    def format(self) -> str:
+        lines = [f"{'axis':<6} {'stage':<7} {'exponent':>8} {'bound':>6}  status"]
+        for fit in self.fits:
+            status = "ok" if fit.within(self.tolerance) else "WORSE THAN EXPECTED"
+            lines.append(
+                f"{fit.axis:<6} {fit.stage:<7} {fit.exponent:>8.2f} {fit.bound:>6.2f}  {status}"
+            )
+            for size, t in zip(fit.sizes, fit.times):
+                lines.append(f"         n={size:<8} {t * 1000:9.2f} ms")
+        return "\n".join(lines)
+
+
+class ScalingHarness:
+    """Runs the parse -> style -> render pipeline over a grid of synthetic sizes."""
+
+    def __init__(self, base: Optional[SyntheticSpec] = None, repeats: int = 3, tolerance: float = 0.3):
+        self.base = base or SyntheticSpec()
+        self.repeats = repeats
+        self.tolerance = tolerance
+
+    def _best_of(self, fn: Callable[[], object]) -> float:
+        """Minimum wall time over the configured repeats (least noisy estimate)."""
+        best = float("inf")
+        for _ in range(self.repeats):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    def measure(self, spec: SyntheticSpec) -> Tuple[int, int, Dict[str, float]]:
+        """Time every pipeline stage for one document, returning (nodes, rules, timings)."""
+        html = SyntheticPage.generate_html(spec)
+        css = SyntheticPage.generate_css(spec)
+
+        timings: Dict[str, float] = {}
+        timings["parse"] = self._best_of(lambda: HTMLParser.parse_html(html))
+        timings["css"] = self._best_of(lambda: CSSParser.parse(css))
+
+        root = HTMLParser.parse_html(html)
+        rules = CSSParser.parse(css)
+
+        def style():
+            StyleResolver.apply_styles(root, rules)
+
+        timings["style"] = self._best_of(style)
+
+        def render():
+            console = Console(file=io.StringIO(), width=100, force_terminal=True, color_system="truecolor")
+            TerminalRenderer(console=console).render(root)
+
+        timings["render"] = self._best_of(render)
+        return count_nodes(root), len(rules), timings
+
+    @staticmethod
+    def count_work(spec: SyntheticSpec) -> Tuple[int, int, Dict[str, int]]:
+        """
+        Deterministic work counters for styling one document, returning (nodes, rules, counters).
+
+        Besides the Profiler counters, "function_calls" is every Python and
+        builtin call made while styling, as counted by cProfile. The selector
+        counters follow from nodes x selectors by construction; the call count
+        follows whatever the resolver really does per node, so an added walk
+        or rescan shows up in it. Unlike measure() none of this depends on
+        machine load, so growth measured on it is stable enough to assert in tests.
+        """
+        root = HTMLParser.parse_html(SyntheticPage.generate_html(spec))
+        rules = CSSParser.parse(SyntheticPage.generate_css(spec))
+        calls = cProfile.Profile()
+        with Profiler() as profiler:
+            calls.enable()
+            try:
+                StyleResolver.apply_styles(root, rules)
+            finally:
+                calls.disable()
+        counters = dict(profiler.counters)
+        counters["function_calls"] = pstats.Stats(calls).total_calls
+        return count_nodes(root), len(rules), counters
+
+    def run(self, widths: List[int], rule_counts: List[int]) -> ScalingReport:
+        """Sweep document width (node axis) and rule count (rule axis) and fit growth curves."""
+        report = ScalingReport(tolerance=self.tolerance)
+
+        node_runs = [self.measure(replace(self.base, width=w)) for w in widths]
+        rule_runs = [self.measure(replace(self.base, rule_count=r)) for r in rule_counts]
+
+        for (axis, stage), bound in EXPECTED_BOUNDS.items():
+            if axis == "nodes":
+                sizes = [nodes for nodes, _, _ in node_runs]
+                times = [t[stage] for _, _, t in node_runs]
+            else:
+                sizes = [rules for _, rules, _ in rule_runs]
+                times = [t[stage] for _, _, t in rule_runs]
+            if len(sizes) < 2:
+                continue
+            report.fits.append(StageFit(
+                axis=axis,
+                stage=stage,
+                sizes=sizes,
+                times=times,
+                exponent=fit_exponent(sizes, times),
+                bound=bound,
+            ))
+
+        return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Scaling harness for the rendering pipeline")
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--widths", type=int, nargs="+", default=[4, 6, 8, 11, 14])
+    parser.add_argument("--rules", type=int, nargs="+", default=[50, 100, 200, 400, 800])
+    parser.add_argument("--classes", type=int, default=40)
+    parser.add_argument("--words", type=int, default=12)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=0.3)
+    args = parser.parse_args()
+
+    base = SyntheticSpec(depth=args.depth, class_count=args.classes, text_words=args.words)
+    harness = ScalingHarness(base, repeats=args.repeats, tolerance=args.tolerance)
+    report = harness.run(args.widths, args.rules)
+    print(report.format())
+    sys.exit(0 if report.ok else 1)
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import time
+from typing import Callable, Dict
+
+from ..Parser.HTMLParser import HTMLParser
+from ..Parser.CSSParser import CSSParser
+from ..Parser.StyleResolver import StyleResolver
+from ..Parser.Snapshot import Snapshot
+from .SyntheticPage import SyntheticPage, SyntheticSpec
+
+
+def _best_of(fn: Callable[[], object], repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark(spec: SyntheticSpec, repeats: int = 3) -> Dict[str, float]:
+    """Compare parse+style against loading the same styled tree from a snapshot."""
+    html = SyntheticPage.generate_html(spec)
+    css = SyntheticPage.generate_css(spec)
+
+    def pipeline():
+        root = HTMLParser.parse_html(html)
+        StyleResolver.apply_styles(root, CSSParser.parse(css))
+        return root
+
+    root = pipeline()
+    data = Snapshot.dumps(root)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "page.tbsn")
+        with open(path, "wb") as f:
+            f.write(data)
+
+        return {
+            "nodes": sum(1 for _ in root.walk()),
+            "html_bytes": len(html),
+            "snapshot_bytes": len(data),
+            "pipeline_s": _best_of(pipeline, repeats),
+            "loads_s": _best_of(lambda: Snapshot.loads(data), repeats),
+            "load_mmap_s": _best_of(lambda: Snapshot.load(path), repeats),
+            "load_read_s": _best_of(lambda: Snapshot.load(path, use_mmap=False), repeats),
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Snapshot load time vs. the full pipeline")
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--width", type=int, default=8)
+    parser.add_argument("--rules", type=int, default=300)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    result = benchmark(SyntheticSpec(depth=args.depth, width=args.width, rule_count=args.rules), args.repeats)
+    print(f"nodes:          {result['nodes']}")
+    print(f"html / snapshot {result['html_bytes']} B / {result['snapshot_bytes']} B")
+    print(f"parse+style:    {result['pipeline_s'] * 1000:9.2f} ms")
+    for key in ("loads_s", "load_mmap_s", "load_read_s"):
+        speedup = result["pipeline_s"] / result[key]
+        print(f"{key[:-2]:<15} {result[key] * 1000:9.2f} ms  ({speedup:.1f}x faster)")
@@ -0,0 +1,112 @@
+import random
+from dataclasses import dataclass
+from typing import List
+
+
+# words used to fill text nodes, kept small so generation stays cheap
+_WORDS = [
+    "lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing",
+    "elit", "sed", "do", "eiusmod", "tempor", "incididunt", "labore",
+    "magna", "aliqua", "terminal", "browser", "render", "style",
+]
+
+# container tags are used for inner levels, leaf tags hold the text
+_CONTAINER_TAGS = ["div", "section", "article", "ul", "div", "section"]
+_LEAF_TAGS = ["p", "span", "a", "em", "strong", "li", "h2", "code"]
+
+_PROPERTIES = [
+    ("color", ["red", "#333", "#0af", "rgb(10, 20, 30)", "inherit"]),
+    ("font-weight", ["bold", "normal", "700"]),
+    ("font-style", ["italic", "normal"]),
+    ("text-decoration", ["underline", "none"]),
+    ("margin", ["0", "4px", "1em"]),
+    ("padding", ["0", "2px 4px"]),
+    ("display", ["block", "inline", "flex"]),
+]
+
+
+@dataclass
+class SyntheticSpec:
+    """Shape of a generated document and its stylesheet."""
+    depth: int = 3           # levels of nesting below <body>
+    width: int = 4           # children per container element
+    text_words: int = 12     # words in every leaf text node
+    class_count: int = 40    # distinct class names used in the document
+    rule_count: int = 100    # number of CSS rules in the stylesheet
+    seed: int = 0
+
+    @property
+    def element_count(self) -> int:
+        """Number of elements generated below <body>."""
+        return sum(self.width ** level for level in range(1, self.depth + 1))
+
+
+class SyntheticPage:
+    """Generates deterministic HTML/CSS documents for scaling measurements."""
+
+    @staticmethod
+    def class_names(spec: SyntheticSpec) -> List[str]:
+        return [f"c{i}" for i in range(max(spec.class_count, 1))]
+
+    @staticmethod
+    def generate_html(spec: SyntheticSpec) -> str:
+        """Build an HTML document with the given depth, width and text volume."""
+        rng = random.Random(spec.seed)
+        classes = SyntheticPage.class_names(spec)
+        parts: List[str] = ["<html><head><title>synthetic</title></head><body>"]
+        counter = [0]
+
+        def text() -> str:
+            return " ".join(rng.choice(_WORDS) for _ in range(spec.text_words))
+
+        # iterative build so very deep documents do not hit the recursion limit
+        stack = [("open", 1)] * spec.width
+        while stack:
+            action, value = stack.pop()
+            if action == "close":
+                parts.append(f"</{value}>")
+                continue
+
+            level = value
+            counter[0] += 1
+            cls = classes[counter[0] % len(classes)]
+            ident = f' id="n{counter[0]}"' if counter[0] % 10 == 0 else ""
+
+            if level >= spec.depth:
+                tag = _LEAF_TAGS[counter[0] % len(_LEAF_TAGS)]
+                parts.append(f'<{tag} class="{cls}"{ident}>{text()}</{tag}>')
+                continue
+
+            tag = _CONTAINER_TAGS[level % len(_CONTAINER_TAGS)]
+            parts.append(f'<{tag} class="{cls}"{ident}>')
+            stack.append(("close", tag))
+            stack.extend([("open", level + 1)] * spec.width)
+
+        parts.append("</body></html>")
+        return "".join(parts)
+
+    @staticmethod
+    def generate_css(spec: SyntheticSpec) -> str:
+        """Build a stylesheet with rule_count rules over tag, class and id selectors."""
+        rng = random.Random(spec.seed + 1)
+        classes = SyntheticPage.class_names(spec)
+        tags = sorted(set(_CONTAINER_TAGS + _LEAF_TAGS))
+        rules: List[str] = []
+
+        for i in range(spec.rule_count):
+            kind = i % 4
+            if kind == 0:
+                selector = rng.choice(tags)
+            elif kind == 1:
+                selector = "." + rng.choice(classes)
+            elif kind == 2:
+                selector = f"#n{rng.randrange(1, spec.element_count + 1)}"
+            else:
+                selector = ", ".join("." + rng.choice(classes) for _ in range(3))
+
+            decls = []
+            for prop, values in rng.sample(_PROPERTIES, 3):
+                decls.append(f"{prop}: {rng.choice(values)};")
+            rules.append(f"{selector} {{ {' '.join(decls)} }}")
+
+        return "\n".join(rules)
@@ -0,0 +1,340 @@
+import asyncio
+import json
+import logging
+import time
+from contextlib import nullcontext
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+from .FetchURL import (
+    CACHE_HEADERS, BodyReader, DynamicFetcher, Fetcher, HeuristicsEngine, PageResource, StaticFetcher,
+)
+from .SingleFlight import AsyncSingleFlight, normalize_url
+from ..Profiling.Profiler import Profiler
+
+try:
+    import aiohttp
+
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+try:
+    from playwright.async_api import async_playwright
+
+    ASYNC_PLAYWRIGHT_AVAILABLE = True
+except ImportError:
+    ASYNC_PLAYWRIGHT_AVAILABLE = False
+
+logger = logging.getLogger("fetcher")
+
+
+class _PageSheets:
+    """Stylesheets of one page load: each URL is downloaded once, however many times it is linked or imported."""
+
+    def __init__(self):
+        self.tasks: Dict[str, "asyncio.Task[str]"] = {}
+        self.linked: set = set()
+
+
+class AsyncFetcher:
+    """
+    asyncio counterpart of Fetcher: same modes, heuristics and PageResource output.
+
+    Static pages are fetched with aiohttp and dynamic ones with Playwright's
+    async API (one browser, launched on first use, with a context per page),
+    so many fetches can be in flight on one event loop. HTML/CSS extraction
+    is shared with StaticFetcher; BeautifulSoup work runs in a worker thread
+    to keep the loop responsive.
+
+    Rate limiting is per host: requests to the same host start at least
+    rate_limit_delay seconds apart, requests to different hosts don't wait
+    for each other. Use as an async context manager, or call close().
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    MAX_RETRIES = 3
+    TIMEOUT = 10
+
+    def __init__(self, mode="auto", prompt_for_dynamic=False, rate_limit_delay: float = 0.5,
+                 max_body_bytes: Optional[int] = None, limit: int = 100, limit_per_host: int = 10,
+                 computed_styles: bool = True, max_nodes: Optional[int] = None) -> None:
+        """
+        Args:
+            mode: "static", "dynamic", or "auto"
+            prompt_for_dynamic: Whether to prompt user if dynamic rendering needed
+            rate_limit_delay: Minimum seconds between requests to the same host
+            max_body_bytes: Stop reading static responses after this many bytes (None = no limit)
+            limit: most connections open at once
+            limit_per_host: most connections open to one host
+            computed_styles: Dynamic pages come back as a node tree styled by the browser (PageResource.node_tree)
+            max_nodes: Most nodes taken from a dynamic page's node tree
+        """
+        if not AIOHTTP_AVAILABLE:
+            raise ImportError("aiohttp is not installed")
+
+        self.mode = mode
+        self.prompt_for_dynamic = prompt_for_dynamic
+        self.rate_limit_delay = rate_limit_delay
+        self.max_body_bytes = max_body_bytes
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.computed_styles = computed_styles
+        self.max_nodes = max_nodes
+        self.heuristics = HeuristicsEngine()
+
+        self.dynamic_available = ASYNC_PLAYWRIGHT_AVAILABLE
+        if not self.dynamic_available and mode != "static":
+            logger.warning("Dynamic fetching is not available")
+            self.mode = "static"
+
+        self._session: Optional["aiohttp.ClientSession"] = None
+        self._inflight = AsyncSingleFlight()  # concurrent GETs of the same URL share one request
+        self._host_locks: Dict[str, asyncio.Lock] = {}
+        self._host_last_request: Dict[str, float] = {}
+        self._playwright = None
+        self._browser = None
+        self._browser_lock: Optional[asyncio.Lock] = None
+
+    async def __aenter__(self) -> "AsyncFetcher":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    # ---------- HTTP ----------
+    def _get_session(self) -> "aiohttp.ClientSession":
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.TIMEOUT),
+                headers=StaticFetcher.DEFAULT_HEADERS,
+            )
+        return self._session
+
+    async def _apply_rate_limit(self, url: str) -> None:
+        """Wait until rate_limit_delay has passed since the last request to url's host."""
+        if not self.rate_limit_delay:
+            return
+        host = urlparse(url).netloc
+        lock = self._host_locks.setdefault(host, asyncio.Lock())
+        # held while sleeping so requests to one host start delay seconds apart
+        async with lock:
+            elapsed = time.monotonic() - self._host_last_request.get(host, 0)
+            if elapsed < self.rate_limit_delay:
+                await asyncio.sleep(self.rate_limit_delay - elapsed)
+            self._host_last_request[host] = time.monotonic()
+
+    async def _read_body(self, response: "aiohttp.ClientResponse") -> Tuple[str, int, bool]:
+        """Read up to max_body_bytes and decode it like BodyReader does. Returns (text, wire bytes, truncated)."""
+        body = bytearray()
+        truncated = False
+        async for chunk in response.content.iter_chunked(BodyReader.CHUNK_SIZE):
+            if self.max_body_bytes is not None and len(body) + len(chunk) > self.max_body_bytes:
+                body += chunk[: self.max_body_bytes - len(body)]
+                truncated = True
+                break
+            body += chunk
+        encoding = BodyReader(response).detect_encoding(bytes(body[: BodyReader.PREFIX_BYTES]))
+        # bytes received (compressed size under Content-Encoding), the same quantity as BodyReader.wire_bytes
+        wire_bytes = getattr(response.content, "total_raw_bytes", len(body))
+        return bytes(body).decode(encoding, errors="replace"), wire_bytes, truncated
+
+    async def _get(self, url: str, kind: str) -> Tuple[str, int, dict]:
+        """GET with rate limiting and retries (429/5xx, exponential backoff). Returns (text, status, cache headers).
+
+        Concurrent GETs of the same (normalized) URL share one request.
+        """
+        (text, status, cache_headers), _ = await self._inflight.do(
+            (normalize_url(url), kind), lambda: self._download(url, kind)
+        )
+        return text, status, dict(cache_headers)
+
+    async def _download(self, url: str, kind: str) -> Tuple[str, int, dict]:
+        for attempt in range(self.MAX_RETRIES + 1):
+            await self._apply_rate_limit(url)
+            async with self._get_session().get(url) as response:
+                if response.status in self.RETRY_STATUSES and attempt < self.MAX_RETRIES:
+                    await asyncio.sleep(2 ** attempt)  # 1s, 2s, 4s delays
+                    continue
+                response.raise_for_status()
+                text, nbytes, truncated = await self._read_body(response)
+                cache_headers = {
+                    name: response.headers[name] for name in CACHE_HEADERS if name in response.headers
+                }
+                status = response.status
+            break
+
+        profiler = Profiler.active()
+        if profiler:
+            profiler.record_resource(url, nbytes, kind=kind)
+        if truncated:
+            logger.warning(f"Response body truncated at {self.max_body_bytes} bytes: {url}")
+            if profiler:
+                profiler.count("body_truncated")
+        return text, status, cache_headers
+
+    # ---------- CSS ----------
+    async def _download_css(self, full_url: str) -> str:
+        try:
+            css_text, _, _ = await self._get(full_url, kind="css")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"Failed to fetch CSS from {full_url}: {e}")
+            return ""
+        return StaticFetcher._absolute_css_urls(css_text, full_url)
+
+    def _css(self, sheets: _PageSheets, full_url: str) -> "asyncio.Task[str]":
+        """The (shared) download of a stylesheet for this page."""
+        task = sheets.tasks.get(full_url)
+        if task is None:
+            task = sheets.tasks[full_url] = asyncio.ensure_future(self._download_css(full_url))
+        return task
+
+    async def resolve_imports(self, css_text: str, sheet_url: str, sheets: _PageSheets,
+                              _chain: Tuple[str, ...] = ()) -> str:
+        """Inline a stylesheet's @import chain, downloading the imports concurrently (see StaticFetcher.resolve_imports)."""
+        imports = StaticFetcher._import_rules(css_text)
+        if not imports:
+            return css_text
+
+        chain = _chain + (sheet_url,)
+        targets = StaticFetcher._import_targets(imports, sheet_url, chain)
+
+        async def load(full_url: str, media: str) -> str:
+            imported = await self._css(sheets, full_url)
+            if not imported:
+                return ""
+            imported = await self.resolve_imports(imported, full_url, sheets, chain)
+            return StaticFetcher._wrap_media(imported, media)
+
+        # gather keeps import order, which is the cascade order
+        resolved = await asyncio.gather(*(load(full_url, media) for full_url, media in targets))
+        return "\n".join([*filter(None, resolved), css_text])
+
+    async def _linked_sheet(self, url: str, css_url: str, media: str, sheets: _PageSheets) -> str:
+        full_url = urljoin(url, css_url)
+        css_content = await self._css(sheets, full_url)
+        if not css_content:
+            return ""
+        css_content = await self.resolve_imports(css_content, full_url, sheets)
+        return StaticFetcher._wrap_media(css_content, media)
+
+    # ---------- fetching ----------
+    async def fetch_static(self, url: str) -> PageResource:
+        """Async StaticFetcher.fetch_with_css: the page plus its inline, linked and @imported CSS."""
+        profiler = Profiler.active()
+        with profiler.stage("fetch.html") if profiler else nullcontext():
+            html, status, cache_headers = await self._get(url, kind="html")
+        soup, title, inline_styles, links = await asyncio.to_thread(StaticFetcher._collect_page, html, url)
+
+        sheets = _PageSheets()
+        # a sheet linked twice is only used once, like StaticFetcher's deduplication
+        unique_links: List[Tuple[str, str]] = []
+        for css_url, media in links:
+            full_url = urljoin(url, css_url)
+            if full_url not in sheets.linked:
+                sheets.linked.add(full_url)
+                unique_links.append((css_url, media))
+
+        with profiler.stage("fetch.css") if profiler else nullcontext():
+            inline = await asyncio.gather(*(self.resolve_imports(text, url, sheets) for text in inline_styles))
+            external = await asyncio.gather(*(
+                self._linked_sheet(url, css_url, media, sheets) for css_url, media in unique_links
+            ))
+
+        css_data = {
+            "inline": list(inline),
+            "external": {css_url: css for (css_url, _), css in zip(unique_links, external) if css},
+            "attribute": [],
+        }
+        return await asyncio.to_thread(StaticFetcher._page_resource, soup, css_data, url, title,
+                                       status, cache_headers)
+
+    async def _get_browser(self):
+        if self._browser_lock is None:
+            self._browser_lock = asyncio.Lock()
+        async with self._browser_lock:
+            if self._browser is None:
+                self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=True)
+        return self._browser
+
+    async def fetch_dynamic(self, url: str) -> PageResource:
+        """Async DynamicFetcher.fetch_with_css, sharing one browser between fetches."""
+        if not ASYNC_PLAYWRIGHT_AVAILABLE:
+            raise ImportError("Playwright is not installed")
+
+        browser = await self._get_browser()
+        context = await browser.new_context(viewport=DynamicFetcher.VIEWPORT, user_agent=DynamicFetcher.USER_AGENT)
+        try:
+            page = await context.new_page()
+            response = await page.goto(url, wait_until="networkidle", timeout=20000)
+            status_code = response.status if response else 200
+            title = await page.title()
+
+            if self.computed_styles:
+                node_tree = await page.evaluate(DynamicFetcher.COMPUTED_TREE_SCRIPT, self.max_nodes)
+                profiler = Profiler.active()
+                if profiler:
+                    profiler.record_resource(url, len(json.dumps(node_tree)), kind="node_tree")
+                return DynamicFetcher._computed_page(node_tree, url, title, status_code)
+
+            html = await page.content()
+
+            profiler = Profiler.active()
+            if profiler:
+                profiler.record_resource(url, len(html.encode("utf-8")), kind="html")
+
+            css_result = await page.evaluate(DynamicFetcher.COLLECT_CSS_SCRIPT)
+            return DynamicFetcher._page_resource(html, css_result, url, title, status_code)
+        finally:
+            await context.close()
+
+    async def fetch(self, url: str) -> PageResource:
+        """Fetch page content; mirrors Fetcher.fetch, including the error page on failure."""
+        logger.info(f"Fetching page content from {url} in mode: {self.mode} (rate limit: {self.rate_limit_delay}s)")
+        try:
+            if self.mode == "dynamic":
+                return await self.fetch_dynamic(url)
+
+            # mode is 'static' or 'auto'
+            resource = await self.fetch_static(url)
+
+            if self.mode == "auto" and await asyncio.to_thread(self.heuristics.looks_dynamic, resource.html):
+                logger.info("Page appears dynamic")
+                if self.prompt_for_dynamic:
+                    try:
+                        response = await asyncio.to_thread(
+                            input, "\nThis page appears to require JavaScript. Fetch with dynamic renderer? (y/n): "
+                        )
+                    except EOFError:  # In case of non-interactive environment
+                        response = "n"
+
+                    if response.lower() == "y":
+                        if self.dynamic_available:
+                            logger.info("Fetching page content with dynamic renderer")
+                            return await self.fetch_dynamic(url)
+                        else:
+                            logger.warning("Dynamic fetching requested but not available. Falling back to static.")
+
+            return resource
+
+        except Exception as e:
+            logger.error(f"Error fetching page content: {e}")
+            return Fetcher.error_page(url, e)
+
+    async def fetch_all(self, urls: List[str]) -> List[PageResource]:
+        """Fetch many pages concurrently; results are in the order of urls."""
+        return list(await asyncio.gather(*(self.fetch(url) for url in urls)))
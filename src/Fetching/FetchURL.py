@@ -1,18 +1,28 @@
 #!/usr/bin/env python3
 
+import codecs
+import contextvars
+import json
+import threading
 import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+import tinycss2
 from bs4 import BeautifulSoup
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from urllib.parse import urlparse, urljoin
 import logging
 import lxml
-from typing import Optional, Tuple, List, Set
+from typing import Dict, Iterator, Optional, Tuple, List, Set
 import re
 import time
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
 from urllib.robotparser import RobotFileParser
 
+from ..Profiling.Profiler import Profiler
+from .SessionManager import SessionManager
+from .SingleFlight import SingleFlight, normalize_url
+
 try:
     from playwright.sync_api import sync_playwright
 
@@ -20,6 +30,13 @@ try:
 except ImportError:
     PLAYWRIGHT_AVAILABLE = False
 
+try:
+    from charset_normalizer import from_bytes as detect_charset
+
+    CHARSET_NORMALIZER_AVAILABLE = True
+except ImportError:
+    CHARSET_NORMALIZER_AVAILABLE = False
+
 # logging info for debugging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -37,6 +54,9 @@ class PageResource:
     title: Optional[str] = None
     status_code: int = 200  # might change this later in the case of an unsuccessful request or falsey data
     is_dynamic_render: bool = False
+    headers: dict = field(default_factory=dict)  # caching headers: etag, last-modified, cache-control, ...
+    # browser-built tree with computed styles (see DynamicFetcher.COMPUTED_TREE_SCRIPT); html is empty then
+    node_tree: Optional[dict] = field(default=None, repr=False)
 
     @property
     def base_url(self) -> str:
@@ -102,10 +122,158 @@ class HeuristicsEngine:
         return False
 
 
+# response headers kept on PageResource so cached pages can be revalidated
+CACHE_HEADERS = ("etag", "last-modified", "cache-control", "expires", "date")
+
+
+class BodyReader:
+    """
+    Reads a streamed response body in chunks.
+
+    Stops after max_bytes (the rest of the body is never downloaded) and
+    detects the charset from the headers or the first PREFIX_BYTES of the
+    body, then decodes incrementally so text is available chunk by chunk.
+    """
+
+    PREFIX_BYTES = 4096
+    CHUNK_SIZE = 64 * 1024
+
+    _CHARSET_HEADER = re.compile(r"charset=[\"']?([\w.:-]+)", re.I)
+    _CHARSET_META = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?\s*([\w.:-]+)", re.I)
+    _CHARSET_CSS = re.compile(rb'^@charset\s+"([\w.:-]+)"\s*;')
+    _BOMS = [
+        (codecs.BOM_UTF8, "utf-8-sig"),
+        (codecs.BOM_UTF16_LE, "utf-16"),
+        (codecs.BOM_UTF16_BE, "utf-16"),
+    ]
+
+    def __init__(self, response, max_bytes: Optional[int] = None, chunk_size: int = CHUNK_SIZE):
+        self.response = response
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.bytes_read = 0  # decompressed body bytes
+        self.truncated = False
+        self.encoding: Optional[str] = None
+
+    @property
+    def wire_bytes(self) -> int:
+        """Bytes received over the network (compressed size when Content-Encoding is used)."""
+        raw = getattr(self.response, "raw", None)
+        try:
+            return raw.tell() if raw is not None else self.bytes_read
+        except Exception:
+            return self.bytes_read
+
+    def iter_bytes(self) -> Iterator[bytes]:
+        for chunk in self.response.iter_content(chunk_size=self.chunk_size):
+            if self.max_bytes is not None and self.bytes_read + len(chunk) > self.max_bytes:
+                chunk = chunk[: self.max_bytes - self.bytes_read]
+                self.bytes_read += len(chunk)
+                self.truncated = True
+                yield chunk
+                return
+            self.bytes_read += len(chunk)
+            yield chunk
+
+    @staticmethod
+    def _valid(encoding: Optional[str]) -> Optional[str]:
+        if not encoding:
+            return None
+        try:
+            return codecs.lookup(encoding).name
+        except LookupError:
+            return None
+
+    def detect_encoding(self, prefix: bytes) -> str:
+        """Charset from a BOM, Content-Type, <meta>/@charset, then statistical detection on the prefix."""
+        # a BOM overrides the declared charset, as in browsers
+        for bom, encoding in self._BOMS:
+            if prefix.startswith(bom):
+                return encoding
+
+        content_type = getattr(self.response, "headers", {}).get("content-type", "")
+        match = self._CHARSET_HEADER.search(content_type)
+        if match and self._valid(match.group(1)):
+            return self._valid(match.group(1))
+
+        match = self._CHARSET_META.search(prefix) or self._CHARSET_CSS.search(prefix)
+        if match and self._valid(match.group(1).decode("ascii", "ignore")):
+            return self._valid(match.group(1).decode("ascii", "ignore"))
+
+        # an ASCII prefix says nothing about the rest of the body (the non-ASCII
+        # text usually comes after <head>); utf-8 decodes ASCII the same way
+        if CHARSET_NORMALIZER_AVAILABLE and prefix and not prefix.isascii():
+            best = detect_charset(prefix).best()
+            if best and self._valid(best.encoding) and self._valid(best.encoding) != "ascii":
+                return self._valid(best.encoding)
+        return "utf-8"
+
+    def iter_text(self) -> Iterator[str]:
+        """Yield decoded text as the body arrives. Only the prefix is buffered."""
+        chunks = self.iter_bytes()
+        prefix = b""
+        for chunk in chunks:
+            prefix += chunk
+            if len(prefix) >= self.PREFIX_BYTES:
+                break
+
+        self.encoding = self.detect_encoding(prefix[: self.PREFIX_BYTES])
+        decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace")
+        if prefix:
+            yield decoder.decode(prefix)
+        for chunk in chunks:
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+    def read_text(self) -> str:
+        return "".join(self.iter_text())
+
+    @classmethod
+    def decode(cls, data, content_type: str = "") -> str:
+        """Decode a body that is already in memory or memory-mapped (saved pages, archives)."""
+        reader = cls(SimpleNamespace(headers={"content-type": content_type}))
+        encoding = reader.detect_encoding(bytes(data[: cls.PREFIX_BYTES]))
+        with memoryview(data) as view:
+            return str(view, encoding, "replace")
+
+
+class PageSheets:
+    """
+    Stylesheets fetched for one page load, by normalized URL.
+
+    Each fetch_with_css call gets its own, so a background prefetch and the
+    page the user is waiting for never clear or share each other's sheets.
+    """
+
+    def __init__(self):
+        self.texts: Dict[str, str] = {}
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self.lock:
+            return self.texts.get(key)
+
+    def put(self, key: str, css_text: str) -> None:
+        with self.lock:
+            self.texts.setdefault(key, css_text)
+
+
 class StaticFetcher:
-    _session = None
+    session_manager: Optional[SessionManager] = None  # None: the shared SessionManager.default()
     _last_request_time = 0
-    _fetched_css_urls: Set[str] = set()  # Track fetched URLs for deduplication
+    _inflight = SingleFlight()  # concurrent GETs of the same URL share one request
+    _rate_cond = threading.Condition()
+    _foreground_waiting = 0  # foreground requests queued in the rate limiter
+    _background = contextvars.ContextVar("background_requests", default=False)
+    max_import_workers = 4
+
+    DEFAULT_HEADERS = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+    }
     
     def __init__(self, rate_limit_delay: float = 0.5):
         """
@@ -118,104 +286,284 @@ class StaticFetcher:
     
     @classmethod
     def _get_session(cls) -> requests.Session:
-        """Create or return a requests session with retry logic"""
-        if cls._session is None:
-            cls._session = requests.Session()
-            
-            # Define retry strategy
-            retry_strategy = Retry(
-                total=3,
-                backoff_factor=1,  # 1s, 2s, 4s delays
-                status_forcelist=[429, 500, 502, 503, 504],
-                allowed_methods=["GET", "HEAD"]
-            )
-            
-            # Mount adapter with retry strategy to both http and https
-            adapter = HTTPAdapter(max_retries=retry_strategy)
-            cls._session.mount("http://", adapter)
-            cls._session.mount("https://", adapter)
-        
-        return cls._session
+        """The calling thread's session; connections are pooled across threads (see SessionManager)."""
+        manager = cls.session_manager or SessionManager.default()
+        return manager.session()
     
+    @classmethod
+    @contextmanager
+    def background_requests(cls):
+        """
+        Mark requests made in this context (and the @import downloads it
+        starts) as background work, e.g. prefetching: they only take a
+        rate-limit slot while no foreground request is waiting for one.
+        """
+        token = cls._background.set(True)
+        try:
+            yield
+        finally:
+            cls._background.reset(token)
+
     @classmethod
     def _apply_rate_limit(cls, delay: float):
         """Apply rate limiting by sleeping if needed"""
-        elapsed = time.time() - cls._last_request_time
-        if elapsed < delay:
-            time.sleep(delay - elapsed)
-        cls._last_request_time = time.time()
+        background = cls._background.get()
+        with cls._rate_cond:
+            if not background:
+                cls._foreground_waiting += 1
+            try:
+                # wait() releases the lock, so a foreground request can claim the next
+                # slot while a background one is still waiting for it
+                while True:
+                    if background and cls._foreground_waiting:
+                        cls._rate_cond.wait()
+                        continue
+                    remaining = cls._last_request_time + delay - time.time()
+                    if remaining <= 0:
+                        break
+                    cls._rate_cond.wait(remaining)
+                cls._last_request_time = time.time()
+            finally:
+                if not background:
+                    cls._foreground_waiting -= 1
+                cls._rate_cond.notify_all()
     
+    @staticmethod
+    def _read_body(response: requests.Response, max_bytes: Optional[int] = None) -> Tuple[bytes, bool]:
+        """Read a streamed response body, stopping after max_bytes. Returns (body, truncated)."""
+        reader = BodyReader(response, max_bytes)
+        body = b"".join(reader.iter_bytes())
+        return body, reader.truncated
+
     @classmethod
-    def _reset_deduplication(cls):
-        """Reset deduplication set (call this for new pages)"""
-        cls._fetched_css_urls.clear()
-    
+    def stream(cls, url: str, rate_limit_delay: float = 0.5, max_bytes: Optional[int] = None) -> Iterator[str]:
+        """Yield the page's decoded text chunk by chunk as it arrives, so callers can start early."""
+        cls._apply_rate_limit(rate_limit_delay)
+        session = cls._get_session()
+        with session.get(url, headers=cls.DEFAULT_HEADERS, timeout=10, stream=True) as response:
+            response.raise_for_status()
+            yield from BodyReader(response, max_bytes).iter_text()
+
+    @classmethod
+    def fetch(cls, url: str, rate_limit_delay: float = 0.5, max_bytes: Optional[int] = None) -> tuple[str, int]:
+        """returns the HTML content and status code of a static page
+
+        max_bytes: stop reading the body after this many bytes (the rest of the page is dropped)
+        """
+        html, status, _ = cls._fetch_document(url, rate_limit_delay, max_bytes)
+        return html, status
+
+    @classmethod
+    def _fetch_document(cls, url: str, rate_limit_delay: float = 0.5,
+                        max_bytes: Optional[int] = None) -> Tuple[str, int, dict]:
+        """Like fetch(), but also returns the response's caching headers.
+
+        Concurrent calls for the same URL (e.g. a prefetch racing a click)
+        share one request.
+        """
+        (html, status, cache_headers), _ = cls._inflight.do(
+            ("document", normalize_url(url), max_bytes),
+            lambda: cls._download_document(url, rate_limit_delay, max_bytes),
+        )
+        return html, status, dict(cache_headers)
+
     @classmethod
-    def fetch(cls, url: str, rate_limit_delay: float = 0.5) -> tuple[str, int]:
-        """returns the HTML content and status code of a static page"""
+    def _download_document(cls, url: str, rate_limit_delay: float = 0.5,
+                           max_bytes: Optional[int] = None) -> Tuple[str, int, dict]:
         try:
             cls._apply_rate_limit(rate_limit_delay)
             
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-            }
             session = cls._get_session()
-            response = session.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            return response.text, response.status_code
+            with session.get(url, headers=cls.DEFAULT_HEADERS, timeout=10, stream=True) as response:
+                response.raise_for_status()
+                return cls._read_document(response, url, max_bytes)
         except Exception as e:
             logger.error(f"Error fetching static content: {e}")
             raise
 
+    @staticmethod
+    def _read_document(response: requests.Response, url: str,
+                       max_bytes: Optional[int] = None) -> Tuple[str, int, dict]:
+        """(html, status, caching headers) of a streamed page response."""
+        reader = BodyReader(response, max_bytes)
+        html = reader.read_text()
+        cache_headers = {
+            name: response.headers[name] for name in CACHE_HEADERS if name in response.headers
+        }
+
+        profiler = Profiler.active()
+        if profiler:
+            profiler.record_resource(url, reader.wire_bytes, kind="html")
+        if reader.truncated:
+            logger.warning(f"Response body truncated at {max_bytes} bytes: {url}")
+            if profiler:
+                profiler.count("body_truncated")
+        return html, response.status_code, cache_headers
+
     @classmethod
-    def fetch_css(cls, base_url: str, css_url: str, rate_limit_delay: float = 0.5) -> str:
-        """Fetch a CSS file, resolving relative URLs with deduplication"""
+    def fetch_css(cls, base_url: str, css_url: str, rate_limit_delay: float = 0.5,
+                  max_bytes: Optional[int] = None, sheets: Optional[PageSheets] = None) -> str:
+        """Fetch a CSS file, resolving relative URLs with deduplication
+
+        A sheet is downloaded once per page (sheets): repeats return the same
+        text, and concurrent requests for it (sibling @imports, or another
+        page loading the same sheet) share one download.
+        """
+        sheets = sheets if sheets is not None else PageSheets()
+        full_url = urljoin(base_url, css_url)
+        key = normalize_url(full_url)
+        cached = sheets.get(key)
+        if cached is not None:
+            logger.debug(f"CSS already fetched, reusing: {full_url}")
+            return cached
+
+        css_text, _ = cls._inflight.do(
+            ("css", key, max_bytes),
+            lambda: cls._download_css(full_url, key, sheets, rate_limit_delay, max_bytes),
+        )
+        # a call joined from another page load stored the sheet in that page's sheets only
+        sheets.put(key, css_text)
+        return css_text
+
+    @classmethod
+    def _download_css(cls, full_url: str, key: str, sheets: PageSheets, rate_limit_delay: float = 0.5,
+                      max_bytes: Optional[int] = None) -> str:
+        # checked again here: the sheet may have been stored since fetch_css looked
+        cached = sheets.get(key)
+        if cached is not None:
+            return cached
+
         try:
-            full_url = urljoin(base_url, css_url)
-            
-            # Deduplication: skip if already fetched
-            if full_url in cls._fetched_css_urls:
-                logger.debug(f"CSS already fetched, skipping: {full_url}")
-                return ""
-            
             cls._apply_rate_limit(rate_limit_delay)
             
             session = cls._get_session()
-            response = session.get(full_url, timeout=10)
-            response.raise_for_status()
+            with session.get(full_url, timeout=10, stream=True) as response:
+                response.raise_for_status()
+                reader = BodyReader(response, max_bytes)
+                css_text = reader.read_text()
 
-            # Mark as fetched
-            cls._fetched_css_urls.add(full_url)
+            profiler = Profiler.active()
+            if profiler:
+                profiler.record_resource(full_url, reader.wire_bytes, kind="css")
 
-            # Convert url(relative) to url(absolute)
-            css_text = response.text
-            css_text = re.sub(
-                r'url\([\'"]?(?!http)([^\'")]+)[\'"]?\)',
-                lambda m: f"url({urljoin(full_url, m.group(1))})",
-                css_text,
-            )
+            css_text = cls._absolute_css_urls(css_text, full_url)
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Failed to fetch CSS from {full_url}: {e}")
+            css_text = ""  # Return empty string on failure (and don't retry it for this page)
+
+        # stored before the in-flight call ends, so later callers find it here
+        sheets.put(key, css_text)
+        return css_text
+
+    @staticmethod
+    def _absolute_css_urls(css_text: str, sheet_url: str) -> str:
+        """Convert url(relative) to url(absolute)"""
+        return re.sub(
+            r'url\([\'"]?(?!http)([^\'")]+)[\'"]?\)',
+            lambda m: f"url({urljoin(sheet_url, m.group(1))})",
+            css_text,
+        )
+
+    @staticmethod
+    def _wrap_media(css_text: str, media: str) -> str:
+        if media and media.lower() != "all":
+            return f"@media {media} {{\n{css_text}\n}}"
+        return css_text
+
+    @staticmethod
+    def _import_rules(css_text: str) -> List[Tuple[str, str]]:
+        """Return (url, media query) for each @import at the top of a stylesheet."""
+        imports: List[Tuple[str, str]] = []
+        for rule in tinycss2.parse_stylesheet(css_text, skip_whitespace=True, skip_comments=True):
+            if rule.type == "at-rule" and rule.lower_at_keyword == "import":
+                tokens = [t for t in rule.prelude if t.type not in ("whitespace", "comment")]
+                if not tokens:
+                    continue
+                first = tokens[0]
+                if first.type in ("url", "string"):
+                    href = first.value
+                elif first.type == "function" and first.lower_name == "url":
+                    args = [a for a in first.arguments if a.type == "string"]
+                    if not args:
+                        continue
+                    href = args[0].value
+                else:
+                    continue
+                media = tinycss2.serialize(tokens[1:]).strip()
+                imports.append((href, media))
+            elif rule.type == "at-rule" and rule.lower_at_keyword in ("charset", "layer"):
+                continue
+            else:
+                break  # @import is only valid before any other rule
+        return imports
+
+    @staticmethod
+    def _import_targets(imports: List[Tuple[str, str]], sheet_url: str,
+                        chain: Tuple[str, ...]) -> List[Tuple[str, str]]:
+        """Absolute (url, media) for each @import, leaving out imports back into the chain."""
+        targets = []
+        for href, media in imports:
+            full_url = urljoin(sheet_url, href)
+            if full_url in chain:
+                logger.warning(f"Skipping cyclic @import of {full_url}")
+                continue
+            targets.append((full_url, media))
+        return targets
 
+    @classmethod
+    def resolve_imports(cls, css_text: str, sheet_url: str, rate_limit_delay: float = 0.5,
+                        sheets: Optional[PageSheets] = None, _chain: Tuple[str, ...] = ()) -> str:
+        """
+        Inline the @import chain of a stylesheet.
+
+        Imported sheets are downloaded concurrently, deduplicated through
+        fetch_css and resolved recursively; an import that points
+        back into its own chain is skipped. Imported CSS is prepended in
+        import order (wrapped in @media when the import has a media query),
+        which keeps the cascade order of the original stylesheet.
+        """
+        imports = cls._import_rules(css_text)
+        if not imports:
             return css_text
-        except requests.exceptions.RequestException as e:
-            logger.warning(f"Failed to fetch CSS from {css_url}: {e}")
-            return ""  # Return empty string on failure
+
+        chain = _chain + (sheet_url,)
+        targets = cls._import_targets(imports, sheet_url, chain)
+        if not targets:
+            return css_text
+        sheets = sheets if sheets is not None else PageSheets()
+
+        def load(target: Tuple[str, str]) -> str:
+            full_url, media = target
+            # a sheet imported from two places is downloaded once but applies in both
+            imported = cls.fetch_css(sheet_url, full_url, rate_limit_delay=rate_limit_delay, sheets=sheets)
+            if not imported:
+                return ""
+            imported = cls.resolve_imports(imported, full_url, rate_limit_delay, sheets, chain)
+            return cls._wrap_media(imported, media)
+
+        # each download runs in a copy of the caller's context, so it reports to the caller's profiler
+        with ThreadPoolExecutor(max_workers=min(cls.max_import_workers, len(targets))) as pool:
+            futures = [pool.submit(contextvars.copy_context().run, load, target) for target in targets]
+            resolved = [future.result() for future in futures]
+
+        return "\n".join([*filter(None, resolved), css_text])
 
     @classmethod
-    def fetch_with_css(cls, url: str, rate_limit_delay: float = 0.5) -> PageResource:
-        """Fetch HTML and all associated CSS with rate limiting and deduplication"""
-        # Reset deduplication for this page
-        cls._reset_deduplication()
-        
-        html, status = cls.fetch(url, rate_limit_delay=rate_limit_delay)
-        soup = BeautifulSoup(html, "lxml")
+    def fetch_with_css(cls, url: str, rate_limit_delay: float = 0.5, max_bytes: Optional[int] = None,
+                       document: Optional[Tuple[str, int, dict]] = None) -> PageResource:
+        """Fetch HTML and all associated CSS with rate limiting and deduplication
 
-        # Remove unwanted tags
-        for tag in soup.find_all(["script", "nav", "header", "footer", "aside"]):
-            tag.decompose()
+        document: (html, status, caching headers) already downloaded, e.g. by
+        revalidate(); only the stylesheets are fetched then.
+        """
+        sheets = PageSheets()  # deduplication for this page only
+        profiler = Profiler.active()
 
-        # Extract title
-        title_tag = soup.find("title")
-        title = title_tag.text if title_tag else url
+        if document is None:
+            with profiler.stage("fetch.html") if profiler else nullcontext():
+                document = cls._fetch_document(url, rate_limit_delay, max_bytes)
+        html, status, cache_headers = document
+        soup, title, inline_styles, links = cls._collect_page(html, url)
 
         # Collect all CSS with metadata
         css_data = {
@@ -224,18 +572,59 @@ class StaticFetcher:
             "attribute": []    # inline style attributes
         }
 
-        # 1. Inline <style> tags
+        with profiler.stage("fetch.css") if profiler else nullcontext():
+            # 1. Inline <style> tags
+            for style_text in inline_styles:
+                css_data["inline"].append(cls.resolve_imports(style_text, url, rate_limit_delay, sheets))
+
+            # 2. Linked stylesheets (with deduplication)
+            linked: Set[str] = set()
+            for css_url, media in links:
+                # a sheet linked twice applies once
+                full_url = normalize_url(urljoin(url, css_url))
+                if full_url in linked:
+                    continue
+                linked.add(full_url)
+                css_content = cls.fetch_css(url, css_url, rate_limit_delay=rate_limit_delay, sheets=sheets)
+                if css_content:
+                    css_content = cls.resolve_imports(css_content, urljoin(url, css_url), rate_limit_delay, sheets)
+                    css_data["external"][css_url] = cls._wrap_media(css_content, media)
+
+        return cls._page_resource(soup, css_data, url, title, status, cache_headers)
+
+    @staticmethod
+    def _collect_page(html: str, url: str) -> Tuple[BeautifulSoup, str, List[str], List[Tuple[str, str]]]:
+        """
+        Parse fetched HTML and pull out what the CSS stage needs.
+
+        Returns (soup, title, inline <style> texts, [(stylesheet href, media)]).
+        Unwanted tags and the <style> elements are removed from the soup.
+        Shared by the sync and async fetchers; does no I/O.
+        """
+        soup = BeautifulSoup(html, "lxml")
+
+        # Remove unwanted tags
+        for tag in soup.find_all(["script", "nav", "header", "footer", "aside"]):
+            tag.decompose()
+
+        # Extract title
+        title_tag = soup.find("title")
+        title = title_tag.text if title_tag else url
+
+        inline_styles = []
         for style in soup.find_all("style"):
-            css_data["inline"].append(style.text)
+            inline_styles.append(style.text)
             style.decompose()
 
-        # 2. Linked stylesheets (with deduplication)
-        for link in soup.find_all("link", rel="stylesheet", href=True):
-            css_url = link["href"]
-            css_content = cls.fetch_css(url, css_url, rate_limit_delay=rate_limit_delay)
-            if css_content:
-                css_data["external"][css_url] = css_content
+        links = [
+            (link["href"], link.get("media", "").strip())
+            for link in soup.find_all("link", rel="stylesheet", href=True)
+        ]
+        return soup, title, inline_styles, links
 
+    @classmethod
+    def _page_resource(cls, soup: BeautifulSoup, css_data: dict, url: str, title: str,
+                       status: int, cache_headers: dict) -> PageResource:
         # 3. Collect inline styles (for reference)
         for tag in soup.find_all(attrs={"style": True}):
             selector = cls._get_selector_for_element(tag)
@@ -252,8 +641,44 @@ class StaticFetcher:
             title=title,
             status_code=status,
             is_dynamic_render=False,
+            headers=cache_headers,
         )
 
+    @classmethod
+    def revalidate(cls, url: str, headers: dict, rate_limit_delay: float = 0.5,
+                   max_bytes: Optional[int] = None) -> Tuple[bool, Optional[Tuple[str, int, dict]]]:
+        """
+        Ask the server whether a cached copy is still current.
+
+        Sends a conditional GET using the cached ETag / Last-Modified values,
+        rate limited like any other request. Returns (True, None) on 304 Not
+        Modified. When the page changed the server sends it in full, so the
+        new (html, status, caching headers) is returned as (False, document)
+        for fetch_with_css(document=...) instead of being downloaded twice.
+        Without validators nothing is sent and the copy is treated as stale.
+        """
+        conditional = {}
+        if headers.get("etag"):
+            conditional["If-None-Match"] = headers["etag"]
+        if headers.get("last-modified"):
+            conditional["If-Modified-Since"] = headers["last-modified"]
+        if not conditional:
+            return False, None
+
+        try:
+            cls._apply_rate_limit(rate_limit_delay)
+            session = cls._get_session()
+            with session.get(url, headers={**cls.DEFAULT_HEADERS, **conditional}, timeout=10,
+                             stream=True) as response:
+                if response.status_code == 304:
+                    return True, None
+                if response.status_code != 200:
+                    return False, None
+                return False, cls._read_document(response, url, max_bytes)
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Revalidation failed for {url}: {e}")
+            return False, None
+
     @staticmethod
     def _get_selector_for_element(tag) -> Optional[str]:
         """Generate a simple CSS selector for an element"""
@@ -269,22 +694,178 @@ class StaticFetcher:
 
 class DynamicFetcher:
     """Fetch a page using Playwright"""
+
+    VIEWPORT = {"width": 1200, "height": 800}
+    USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/91.0.4472.124 Safari/537.36"
+
+    # run in the page: every readable stylesheet's rules plus the elements' style attributes
+    COLLECT_CSS_SCRIPT = """
+        () => {
+            // Collect all stylesheet content
+            const sheets = Array.from(document.styleSheets);
+            const cssTexts = [];
+            const externalSheets = {};
+
+            for (const sheet of sheets) {
+                try {
+                    const rules = Array.from(sheet.cssRules);
+                    const sheetUrl = sheet.href || "dynamic";
+                    const cssText = rules.map(r => r.cssText).join("\\n");
+                    externalSheets[sheetUrl] = cssText;
+                } catch (e) {
+                    // CORS error for external stylesheets
+                    console.warn("Could not access stylesheet rules:", e);
+                }
+            }
+
+            // Also collect inline styles
+            const elements = document.querySelectorAll('[style]');
+            const inlineStyles = [];
+
+            for (const el of elements) {
+                let selector = '';
+                if (el.id) {
+                    selector = '#' + el.id;
+                } else if (el.className) {
+                    selector = el.tagName.toLowerCase() + '.' +
+                        el.className.split(' ').join('.');
+                } else {
+                    selector = el.tagName.toLowerCase();
+                }
+
+                inlineStyles.push({
+                    selector: selector,
+                    style: el.style.cssText
+                });
+            }
+
+            return {
+                external: externalSheets,
+                attribute: inlineStyles
+            };
+        }
+    """
+
+    # Walks the rendered DOM once and returns it as a compact tree:
+    #   element: {"t": tag, "a": {attr: value}, "s": {property: value}, "c": [children]}
+    #   text:    a plain string (whitespace collapsed as in HTMLParser unless white-space: pre*, NFC-normalized)
+    # "s" only holds the renderer's properties whose computed value differs from
+    # the parent's (or from the initial value at the root); display:none
+    # subtrees are left out, and at most maxNodes nodes are emitted.
+    COMPUTED_TREE_SCRIPT = """
+        (maxNodes) => {
+            const INITIAL = {"color": "rgb(0, 0, 0)", "font-weight": "400", "font-style": "normal", "text-decoration": "none"};
+            const SKIP = new Set(["SCRIPT", "STYLE", "NOSCRIPT", "TEMPLATE", "HEAD"]);
+            let remaining = maxNodes || Infinity;
+
+            const isBlock = (node) => node && node.nodeType === 1 &&
+                !getComputedStyle(node).display.startsWith("inline") && getComputedStyle(node).display !== "contents";
+
+            const styleOf = (cs) => ({
+                "color": cs.color,
+                "font-weight": cs.fontWeight,
+                "font-style": cs.fontStyle,
+                "text-decoration": cs.textDecorationLine,
+            });
+
+            const build = (el, parentStyle) => {
+                const cs = getComputedStyle(el);
+                if (cs.display === "none" || SKIP.has(el.tagName) || remaining <= 0) return null;
+                remaining--;
+
+                const style = styleOf(cs);
+                const diff = {};
+                for (const prop in style) {
+                    const value = style[prop];
+                    // decorations are drawn across descendants, so "none" never needs restating
+                    if (prop === "text-decoration" && value === "none") continue;
+                    if (value !== (parentStyle ? parentStyle[prop] : INITIAL[prop])) diff[prop] = value;
+                }
+
+                const attrs = {};
+                for (const attr of el.attributes) attrs[attr.name] = attr.value;
+
+                const pre = cs.whiteSpace.startsWith("pre") || cs.whiteSpace === "break-spaces";
+                const children = [];
+                for (const child of el.childNodes) {
+                    if (remaining <= 0) break;
+                    if (child.nodeType === 3) {
+                        let text = child.nodeValue;
+                        if (!pre) {
+                            text = text.replace(/[ \\t\\n\\r\\f]+/g, " ");
+                            // spaces at a block boundary are never rendered
+                            if (child.previousSibling ? isBlock(child.previousSibling) : isBlock(el)) text = text.replace(/^ /, "");
+                            if (child.nextSibling ? isBlock(child.nextSibling) : isBlock(el)) text = text.replace(/ $/, "");
+                        }
+                        if (text) {
+                            children.push(text.normalize("NFC"));
+                            remaining--;
+                        }
+                    } else if (child.nodeType === 1) {
+                        const node = build(child, style);
+                        if (node) children.push(node);
+                    }
+                }
+
+                const node = {"t": el.tagName.toLowerCase()};
+                if (Object.keys(attrs).length) node.a = attrs;
+                if (Object.keys(diff).length) node.s = diff;
+                if (children.length) node.c = children;
+                return node;
+            };
+
+            return build(document.documentElement, null);
+        }
+    """
+
+    @staticmethod
+    def _page_resource(html: str, css_result: dict, url: str, title: str, status_code: int) -> PageResource:
+        css_data = {
+            "inline": [],
+            "external": css_result.get("external", {}),
+            "attribute": css_result.get("attribute", [])
+        }
+
+        return PageResource(
+            html=html,
+            css=css_data,
+            url=url,
+            title=title,
+            status_code=status_code,
+            is_dynamic_render=True,
+        )
+
     @classmethod
     def is_available(cls) -> bool:
         return PLAYWRIGHT_AVAILABLE
 
+    @staticmethod
+    def _computed_page(node_tree: Optional[dict], url: str, title: str, status_code: int) -> PageResource:
+        return PageResource(
+            html="",
+            css={"inline": [], "external": {}, "attribute": []},
+            url=url,
+            title=title,
+            status_code=status_code,
+            is_dynamic_render=True,
+            node_tree=node_tree or {"t": "html"},
+        )
+
     @classmethod
-    def fetch_with_css(cls, url: str) -> PageResource:
-        """Fetch a page's HTML and CSS content using Playwright"""
+    def fetch_with_css(cls, url: str, computed_styles: bool = False,
+                       max_nodes: Optional[int] = None) -> PageResource:
+        """Fetch a page's HTML and CSS content using Playwright
+
+        computed_styles: return the page as PageResource.node_tree with the
+        browser's computed styles instead of HTML + CSS text, so parsing and
+        the Python-side cascade can be skipped.
+        """
         if not cls.is_available():
             raise ImportError("Playwright is not installed")
 
         with sync_playwright() as p:
             browser = p.chromium.launch(headless=True)
-            context = browser.new_context(
-                viewport={"width": 1200, "height": 800},
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/91.0.4472.124 Safari/537.36",
-            )
+            context = browser.new_context(viewport=cls.VIEWPORT, user_agent=cls.USER_AGENT)
             page = context.new_page()
             try:
                 response = page.goto(url, wait_until="networkidle", timeout=20000)
@@ -293,71 +874,23 @@ class DynamicFetcher:
                 # Get title
                 title = page.title()
 
+                if computed_styles:
+                    node_tree = page.evaluate(cls.COMPUTED_TREE_SCRIPT, max_nodes)
+                    profiler = Profiler.active()
+                    if profiler:
+                        profiler.record_resource(url, len(json.dumps(node_tree)), kind="node_tree")
+                    return cls._computed_page(node_tree, url, title, status_code)
+
                 # Get rendered HTML
                 html = page.content()
 
-                # Extract all CSS
-                css_result = page.evaluate("""
-                    () => {
-                        // Collect all stylesheet content
-                        const sheets = Array.from(document.styleSheets);
-                        const cssTexts = [];
-                        const externalSheets = {};
-
-                        for (const sheet of sheets) {
-                            try {
-                                const rules = Array.from(sheet.cssRules);
-                                const sheetUrl = sheet.href || "dynamic";
-                                const cssText = rules.map(r => r.cssText).join("\\n");
-                                externalSheets[sheetUrl] = cssText;
-                            } catch (e) {
-                                // CORS error for external stylesheets
-                                console.warn("Could not access stylesheet rules:", e);
-                            }
-                        }
-
-                        // Also collect inline styles
-                        const elements = document.querySelectorAll('[style]');
-                        const inlineStyles = [];
-
-                        for (const el of elements) {
-                            let selector = '';
-                            if (el.id) {
-                                selector = '#' + el.id;
-                            } else if (el.className) {
-                                selector = el.tagName.toLowerCase() + '.' +
-                                    el.className.split(' ').join('.');
-                            } else {
-                                selector = el.tagName.toLowerCase();
-                            }
-
-                            inlineStyles.push({
-                                selector: selector,
-                                style: el.style.cssText
-                            });
-                        }
+                profiler = Profiler.active()
+                if profiler:
+                    profiler.record_resource(url, len(html.encode("utf-8")), kind="html")
 
-                        return {
-                            external: externalSheets,
-                            attribute: inlineStyles
-                        };
-                    }
-                """)
-                
-                css_data = {
-                    "inline": [],
-                    "external": css_result.get("external", {}),
-                    "attribute": css_result.get("attribute", [])
-                }
-                
-                return PageResource(
-                    html=html,
-                    css=css_data,
-                    url=url,
-                    title=title,
-                    status_code=status_code,
-                    is_dynamic_render=True,
-                )
+                # Extract all CSS
+                css_result = page.evaluate(cls.COLLECT_CSS_SCRIPT)
+                return cls._page_resource(html, css_result, url, title, status_code)
             except:
                 logger.error(f"Error fetching page content: {e}")
                 raise
@@ -367,7 +900,9 @@ class DynamicFetcher:
 
 # main fetcher that combines static and dynamic apporaches
 class Fetcher:
-    def __init__(self, mode="auto", prompt_for_dynamic=True, rate_limit_delay: float = 0.5) -> None:
+    def __init__(self, mode="auto", prompt_for_dynamic=True, rate_limit_delay: float = 0.5,
+                 max_body_bytes: Optional[int] = None, computed_styles: bool = True,
+                 max_nodes: Optional[int] = None) -> None:
         """
         Initialize Fetcher.
         
@@ -375,10 +910,16 @@ class Fetcher:
             mode: "static", "dynamic", or "auto"
             prompt_for_dynamic: Whether to prompt user if dynamic rendering needed
             rate_limit_delay: Minimum seconds between requests (prevents being blocked)
+            max_body_bytes: Stop reading static responses after this many bytes (None = no limit)
+            computed_styles: Dynamic pages come back as a node tree styled by the browser (PageResource.node_tree)
+            max_nodes: Most nodes taken from a dynamic page's node tree
         """
         self.mode = mode
         self.prompt_for_dynamic = prompt_for_dynamic
         self.rate_limit_delay = rate_limit_delay
+        self.max_body_bytes = max_body_bytes
+        self.computed_styles = computed_styles
+        self.max_nodes = max_nodes
         self.heuristics = HeuristicsEngine()
 
         self.dynamic_available = DynamicFetcher.is_available()
@@ -397,20 +938,26 @@ class Fetcher:
         # For auto mode, check heuristics
         return self.heuristics.looks_dynamic(html)
 
-    def fetch(self, url: str) -> PageResource:
-        """Fetch page content with rate limiting and deduplication"""
+    def fetch(self, url: str, document: Optional[Tuple[str, int, dict]] = None) -> PageResource:
+        """Fetch page content with rate limiting and deduplication
+
+        document: the page's (html, status, caching headers) when already
+        downloaded (see StaticFetcher.revalidate); not used in dynamic mode.
+        """
         logger.info(f"Fetching page content from {url} in mode: {self.mode} (rate limit: {self.rate_limit_delay}s)")
         try:
             if self.mode == 'dynamic':
                 if self.dynamic_available:
-                    return DynamicFetcher.fetch_with_css(url)
+                    return DynamicFetcher.fetch_with_css(url, self.computed_styles, self.max_nodes)
                 else:
                     logger.error("Dynamic fetching is not available.")
                     # Should not happen due to check in __init__
                     raise Exception("Dynamic fetching is not available.")
 
             # mode is 'static' or 'auto'
-            resource = StaticFetcher.fetch_with_css(url, rate_limit_delay=self.rate_limit_delay)
+            resource = StaticFetcher.fetch_with_css(
+                url, rate_limit_delay=self.rate_limit_delay, max_bytes=self.max_body_bytes, document=document
+            )
 
             if self.mode == 'auto' and self.heuristics.looks_dynamic(resource.html):
                 logger.info("Page appears dynamic")
@@ -425,7 +972,7 @@ class Fetcher:
                     if response.lower() == "y":
                         if self.dynamic_available:
                             logger.info("Fetching page content with dynamic renderer")
-                            return DynamicFetcher.fetch_with_css(url)
+                            return DynamicFetcher.fetch_with_css(url, self.computed_styles, self.max_nodes)
                         else:
                             logger.warning("Dynamic fetching requested but not available. Falling back to static.")
             
@@ -433,10 +980,15 @@ class Fetcher:
 
         except Exception as e:
             logger.error(f"Error fetching page content: {e}")
-            return PageResource(
-                html=f"<html><body><h1>Error fetching {url}</h1><p>{str(e)}</p></body></html>",
-                css={"inline": [], "external": {}, "attribute": []},
-                url=url,
-                status_code=500,
-                is_dynamic_render=False,
-            )
+            return self.error_page(url, e)
+
+    @staticmethod
+    def error_page(url: str, error: Exception) -> PageResource:
+        """The page shown in place of one that could not be fetched."""
+        return PageResource(
+            html=f"<html><body><h1>Error fetching {url}</h1><p>{str(error)}</p></body></html>",
+            css={"inline": [], "external": {}, "attribute": []},
+            url=url,
+            status_code=500,
+            is_dynamic_render=False,
+        )
@@ -0,0 +1,209 @@
+import logging
+import threading
+import weakref
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.cookies import RequestsCookieJar
+from urllib3.connectionpool import HTTPConnectionPool
+from urllib3.util.retry import Retry
+from urllib3.util.request import ACCEPT_ENCODING
+
+logger = logging.getLogger("fetcher")
+
+
+@dataclass
+class PoolStats:
+    """Connection reuse for one pooled host."""
+    scheme: str
+    host: str
+    port: Optional[int]
+    connections: int  # TCP (and TLS) connections opened
+    requests: int     # requests sent over them
+
+    @property
+    def reused(self) -> int:
+        return max(self.requests - self.connections, 0)
+
+
+@dataclass
+class ConnectionStats:
+    pools: List[PoolStats] = field(default_factory=list)
+
+    @property
+    def connections(self) -> int:
+        return sum(pool.connections for pool in self.pools)
+
+    @property
+    def requests(self) -> int:
+        return sum(pool.requests for pool in self.pools)
+
+    @property
+    def reused(self) -> int:
+        return sum(pool.reused for pool in self.pools)
+
+    @property
+    def reuse_ratio(self) -> float:
+        return self.reused / self.requests if self.requests else 0.0
+
+    def __str__(self) -> str:
+        return (f"{self.requests} requests over {self.connections} connections "
+                f"({self.reuse_ratio:.0%} reused)")
+
+
+class _TrackingAdapter(HTTPAdapter):
+    """HTTPAdapter that remembers the connection pools its PoolManager creates, for stats()."""
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        # also called when an adapter is unpickled, so the tracking state starts here
+        self.pools: "weakref.WeakSet[HTTPConnectionPool]" = weakref.WeakSet()
+        self.pools_lock = threading.Lock()
+        super().init_poolmanager(*args, **kwargs)
+        adapter = weakref.proxy(self)
+
+        def tracked(pool_class):
+            class TrackedPool(pool_class):
+                def __init__(self, *pool_args, **pool_kwargs):
+                    super().__init__(*pool_args, **pool_kwargs)
+                    with adapter.pools_lock:
+                        adapter.pools.add(self)
+            return TrackedPool
+
+        # pools dropped by the PoolManager (LRU eviction, clear()) fall out of the WeakSet
+        manager = self.poolmanager
+        manager.pool_classes_by_scheme = {
+            scheme: tracked(pool_class) for scheme, pool_class in manager.pool_classes_by_scheme.items()
+        }
+
+    def live_pools(self) -> List[HTTPConnectionPool]:
+        with self.pools_lock:
+            return list(self.pools)
+
+
+class SessionManager:
+    """
+    Hands out requests sessions that are safe to use from several threads.
+
+    requests.Session is not thread-safe (cookies, headers and the adapter
+    table are plain dicts), but urllib3's pool manager is. Every thread
+    therefore gets its own Session, and all of them mount the same
+    HTTPAdapters, so keep-alive connections are shared across threads and
+    across Fetcher instances instead of each paying for a new TCP/TLS
+    handshake. Pool sizes are configurable globally and per host.
+
+    The sessions also share one cookie jar (CookieJar locks internally), so
+    a cookie set while loading a page is sent with the stylesheet requests
+    made from the @import worker threads.
+    """
+
+    _default: Optional["SessionManager"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 10,
+                 host_pool_sizes: Optional[Dict[str, int]] = None,
+                 max_retries: Optional[Retry] = None, headers: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            pool_connections: how many hosts keep a connection pool at once
+            pool_maxsize: idle keep-alive connections kept per host
+            host_pool_sizes: pool_maxsize overrides for specific hosts ("cdn.example.com": 16)
+            max_retries: urllib3 Retry policy shared by every adapter
+            headers: default headers for every session
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries or Retry(
+            total=3,
+            backoff_factor=1,  # 1s, 2s, 4s delays
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET", "HEAD"]
+        )
+        self.headers = dict(headers or {})
+        # urllib3 lists br / zstd here only when brotli / zstandard are installed
+        self.headers.setdefault("Accept-Encoding", ACCEPT_ENCODING)
+        self.cookies = RequestsCookieJar()
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # url prefix -> adapter; bumping _version makes threads remount on their next call
+        self._adapters: Dict[str, _TrackingAdapter] = {}
+        self._version = 0
+        default = self._make_adapter(pool_maxsize)
+        self._adapters["http://"] = default
+        self._adapters["https://"] = default
+        for host, size in (host_pool_sizes or {}).items():
+            self.set_host_pool_size(host, size)
+
+    @classmethod
+    def default(cls) -> "SessionManager":
+        """The process-wide manager used by the fetchers."""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @classmethod
+    def set_default(cls, manager: Optional["SessionManager"]) -> None:
+        with cls._default_lock:
+            old, cls._default = cls._default, manager
+        if old is not None and old is not manager:
+            old.close()
+
+    def _make_adapter(self, maxsize: int) -> _TrackingAdapter:
+        return _TrackingAdapter(pool_connections=self.pool_connections, pool_maxsize=maxsize,
+                           max_retries=self.max_retries)
+
+    def set_host_pool_size(self, host: str, maxsize: int) -> None:
+        """Keep up to maxsize connections to host (e.g. a CDN serving many stylesheets).
+
+        host is matched as a URL prefix, so include the port when it isn't the default one.
+        """
+        adapter = self._make_adapter(maxsize)
+        with self._lock:
+            for scheme in ("http", "https"):
+                self._adapters[f"{scheme}://{host}/"] = adapter
+            self._version += 1
+
+    def session(self) -> requests.Session:
+        """The calling thread's session."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self.headers)
+            session.cookies = self.cookies
+            self._local.session = session
+            self._local.version = -1
+        if self._local.version != self._version:
+            with self._lock:
+                adapters, version = dict(self._adapters), self._version
+            for prefix, adapter in adapters.items():
+                session.mount(prefix, adapter)
+            self._local.version = version
+        return session
+
+    def _unique_adapters(self) -> List[_TrackingAdapter]:
+        with self._lock:
+            adapters = list(self._adapters.values())
+        unique: List[_TrackingAdapter] = []
+        for adapter in adapters:
+            if not any(adapter is seen for seen in unique):
+                unique.append(adapter)
+        return unique
+
+    def stats(self) -> ConnectionStats:
+        """Requests versus connections for every host that currently has a pool."""
+        stats = ConnectionStats()
+        for adapter in self._unique_adapters():
+            for pool in adapter.live_pools():
+                stats.pools.append(PoolStats(
+                    scheme=pool.scheme, host=pool.host, port=pool.port,
+                    connections=pool.num_connections, requests=pool.num_requests,
+                ))
+        return stats
+
+    def close(self) -> None:
+        """Close every pooled connection; sessions handed out earlier reconnect on next use."""
+        for adapter in self._unique_adapters():
+            adapter.close()
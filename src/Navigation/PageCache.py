@@ -0,0 +1,154 @@
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional, Tuple
+
+from ..Fetching.FetchURL import PageResource, StaticFetcher
+from ..Parser.HTMLParser import Node
+
+logger = logging.getLogger("navigation")
+
+
+@dataclass
+class CachedPage:
+    """A fetched page together with its styled Node tree."""
+    url: str
+    page: PageResource
+    root: Node
+    size: int  # estimated bytes held by this entry
+    stored_at: float = field(default_factory=time.time)
+    prefetched: bool = False  # loaded in the background before the user asked for it
+
+    # like browsers, reuse a prefetched page without revalidating for a few minutes
+    PREFETCH_TTL = 300
+
+    def max_age(self) -> Optional[int]:
+        match = re.search(r"max-age\s*=\s*(\d+)", self.page.headers.get("cache-control", ""))
+        return int(match.group(1)) if match else None
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        """True while Cache-Control max-age says the copy may be reused without asking the server."""
+        cache_control = self.page.headers.get("cache-control", "").lower()
+        if "no-cache" in cache_control:
+            return False
+        age = (now or time.time()) - self.stored_at
+        if self.prefetched and age < self.PREFETCH_TTL:
+            return True
+        max_age = self.max_age()
+        if max_age is None:
+            return False
+        return age < max_age
+
+
+class PageCache:
+    """
+    Session-level LRU cache of styled pages, bounded by estimated memory.
+
+    get() returns an entry as-is (used for back/forward navigation).
+    lookup() only returns an entry the HTTP cache rules allow reusing:
+    fresh by max-age, or confirmed unchanged by a conditional request.
+    """
+
+    # rough per-node overhead of a Node object with its attrs and computed_style dicts
+    NODE_OVERHEAD = 600
+    STYLE_ENTRY_OVERHEAD = 120
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, rate_limit_delay: float = 0.5):
+        self.max_bytes = max_bytes
+        self.rate_limit_delay = rate_limit_delay  # for conditional requests
+        self.total_bytes = 0
+        self._entries: "OrderedDict[str, CachedPage]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._entries
+
+    @classmethod
+    def estimate_size(cls, page: PageResource, root: Node) -> int:
+        """Approximate memory held by a cached page, in bytes."""
+        size = len(page.html)
+        for css in page.css.get("inline", []):
+            size += len(css)
+        for css in page.css.get("external", {}).values():
+            size += len(css)
+        for node in root.walk():
+            size += cls.NODE_OVERHEAD + len(node.text)
+            size += cls.STYLE_ENTRY_OVERHEAD * len(node.computed_style)
+        return size
+
+    @staticmethod
+    def is_cacheable(page: PageResource) -> bool:
+        if page.status_code != 200:
+            return False
+        return "no-store" not in page.headers.get("cache-control", "").lower()
+
+    def put(self, url: str, page: PageResource, root: Node, prefetched: bool = False) -> Optional[CachedPage]:
+        """Store a styled page, evicting least recently used entries to stay under max_bytes."""
+        if not self.is_cacheable(page):
+            return None
+
+        entry = CachedPage(url=url, page=page, root=root, size=self.estimate_size(page, root),
+                           prefetched=prefetched)
+        if entry.size > self.max_bytes:
+            logger.info(f"Page too large to cache ({entry.size} bytes): {url}")
+            return None
+
+        with self._lock:
+            old = self._entries.pop(url, None)
+            if old:
+                self.total_bytes -= old.size
+            self._entries[url] = entry
+            self.total_bytes += entry.size
+
+            while self.total_bytes > self.max_bytes:
+                evicted_url, evicted = self._entries.popitem(last=False)
+                self.total_bytes -= evicted.size
+                logger.debug(f"Evicted from page cache: {evicted_url}")
+        return entry
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        """Return the cached entry without any freshness check."""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry:
+                self._entries.move_to_end(url)
+            return entry
+
+    def lookup(self, url: str) -> Optional[CachedPage]:
+        """Return the cached entry if HTTP caching rules allow reusing it."""
+        return self.check(url)[0]
+
+    def check(self, url: str) -> Tuple[Optional[CachedPage], Optional[Tuple[str, int, dict]]]:
+        """
+        Like lookup(), but when revalidation finds the page changed, also
+        return the new (html, status, caching headers) the server sent, so
+        the caller can build the page from it without fetching it again.
+        """
+        entry = self.get(url)
+        if entry is None:
+            return None, None
+        if entry.is_fresh():
+            return entry, None
+        not_modified, document = StaticFetcher.revalidate(url, entry.page.headers, self.rate_limit_delay)
+        if not_modified:
+            entry.stored_at = time.time()
+            return entry, None
+        self.remove(url)
+        return None, document
+
+    def remove(self, url: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(url, None)
+            if entry:
+                self.total_bytes -= entry.size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
@@ -0,0 +1,195 @@
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urldefrag, urljoin, urlparse
+
+from ..Fetching.FetchURL import PageResource, StaticFetcher
+from ..Parser.HTMLParser import Node
+from .PageCache import PageCache
+
+logger = logging.getLogger("navigation")
+
+# ancestors that mark a link as part of the page content rather than chrome
+CONTENT_TAGS = {"p", "article", "main", "section", "li", "blockquote", "td"}
+
+
+class _QuietPrefetchLogs(logging.Filter):
+    """Keep the prefetch worker's INFO chatter off the terminal while the user reads."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.threadName != Prefetcher.THREAD_NAME or record.levelno >= logging.WARNING
+
+
+_QUIET_LOGS = _QuietPrefetchLogs()
+
+
+class Prefetcher:
+    """
+    Loads likely next pages in the background after a page has rendered.
+
+    Candidate links are ranked (rel="next" first, then in-content links,
+    then other same-origin links by position) and fetched, parsed and styled
+    by a single low-priority worker thread into the PageCache. The worker
+    only runs while no foreground load is in progress, waits host_delay
+    between requests to the same host and sleeps after each page so that
+    average throughput stays under max_bytes_per_second. A load already in
+    flight when the user navigates keeps its own stylesheet state
+    (PageSheets), never reports to the foreground profiler, and makes its
+    requests as StaticFetcher.background_requests(), so it never takes a
+    rate-limit slot a foreground load is waiting for.
+    """
+
+    THREAD_NAME = "prefetcher"
+
+    def __init__(self, cache: PageCache, load: Callable[[str], Tuple[PageResource, Node]],
+                 max_links: int = 4, max_per_host: int = 3, host_delay: float = 2.0,
+                 max_bytes_per_second: int = 256 * 1024):
+        self.cache = cache
+        self.load = load
+        self.max_links = max_links
+        self.max_per_host = max_per_host
+        self.host_delay = host_delay
+        self.max_bytes_per_second = max_bytes_per_second
+
+        self._queue: "queue.Queue[Tuple[int, str]]" = queue.Queue()
+        self._generation = 0  # bumped on every schedule(); older queue items are dropped
+        self._idle = threading.Event()
+        self._idle.set()
+        self._stopped = False
+        self._host_last_fetch: Dict[str, float] = {}
+        self._thread: Optional[threading.Thread] = None
+        self.prefetched: List[str] = []
+
+        for name in ("fetcher", "parser", "navigation"):
+            logging.getLogger(name).addFilter(_QUIET_LOGS)
+
+    # ---------- link selection ----------
+    @staticmethod
+    def candidate_links(root: Node, page_url: str, limit: int = 4) -> List[str]:
+        """Rank the page's links by how likely the reader is to follow them next."""
+        origin = urlparse(page_url).netloc
+        current = urldefrag(page_url)[0]
+        anchors = [node for node in root.walk() if node.tag == "a" and node.attrs.get("href")]
+
+        scored: Dict[str, float] = {}
+        for position, node in enumerate(anchors):
+            url = urldefrag(urljoin(page_url, node.attrs["href"]))[0]
+            parsed = urlparse(url)
+            if parsed.scheme not in ("http", "https") or url == current:
+                continue
+
+            rel = node.attrs.get("rel", [])
+            if isinstance(rel, str):
+                rel = rel.split()
+            is_next = "next" in rel
+            same_origin = parsed.netloc == origin
+            if not same_origin and not is_next:
+                continue
+            if "nofollow" in rel:
+                continue
+
+            score = 100.0 if is_next else 0.0
+            if Prefetcher._in_content(node):
+                score += 10
+            if same_origin:
+                score += 5
+            # earlier links rank higher
+            score -= position / max(len(anchors), 1)
+            scored[url] = max(scored.get(url, score), score)
+
+        ranked = sorted(scored, key=scored.get, reverse=True)
+        return ranked[:limit]
+
+    @staticmethod
+    def _in_content(node: Node) -> bool:
+        parent = node.parent
+        while parent is not None:
+            if parent.tag in CONTENT_TAGS:
+                return True
+            parent = parent.parent
+        return False
+
+    # ---------- scheduling ----------
+    def schedule(self, root: Node, page_url: str) -> List[str]:
+        """Replace pending work with the best links from a freshly rendered page."""
+        self._generation += 1
+        links = [
+            url for url in self.candidate_links(root, page_url, self.max_links * 2)
+            if url not in self.cache
+        ]
+
+        per_host: Dict[str, int] = {}
+        selected = []
+        for url in links:
+            host = urlparse(url).netloc
+            if per_host.get(host, 0) >= self.max_per_host:
+                continue
+            per_host[host] = per_host.get(host, 0) + 1
+            selected.append(url)
+            if len(selected) >= self.max_links:
+                break
+
+        for url in selected:
+            self._queue.put((self._generation, url))
+        self._ensure_worker()
+        return selected
+
+    @contextmanager
+    def foreground(self):
+        """Pause prefetching while the user's own navigation is loading."""
+        self._idle.clear()
+        try:
+            yield
+        finally:
+            self._idle.set()
+
+    def stop(self) -> None:
+        self._stopped = True
+        self._generation += 1
+        self._queue.put((self._generation, ""))
+
+    # ---------- worker ----------
+    def _ensure_worker(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name=self.THREAD_NAME, daemon=True)
+            self._thread.start()
+
+    def _wait_for_host(self, host: str) -> None:
+        elapsed = time.time() - self._host_last_fetch.get(host, 0)
+        if elapsed < self.host_delay:
+            time.sleep(self.host_delay - elapsed)
+
+    def _run(self) -> None:
+        while not self._stopped:
+            generation, url = self._queue.get()
+            if self._stopped:
+                return
+            if generation != self._generation or url in self.cache:
+                continue
+
+            self._idle.wait()
+            host = urlparse(url).netloc
+            self._wait_for_host(host)
+            if generation != self._generation:
+                continue
+
+            try:
+                with StaticFetcher.background_requests():
+                    page, root = self.load(url)
+            except Exception as e:
+                logger.warning(f"Prefetch failed for {url}: {e}")
+                continue
+            finally:
+                self._host_last_fetch[host] = time.time()
+
+            if self.cache.put(url, page, root, prefetched=True):
+                self.prefetched.append(url)
+
+            # spread downloads out so the average rate stays under the bandwidth limit
+            downloaded = len(page.html) + sum(len(css) for css in page.css.get("external", {}).values())
+            if self.max_bytes_per_second:
+                time.sleep(downloaded / self.max_bytes_per_second)
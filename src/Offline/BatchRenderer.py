@@ -0,0 +1,699 @@
+import io
+import logging
+import mmap
+import os
+import re
+import sys
+import tempfile
+import time
+import zlib
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
+from urllib.parse import unquote, urljoin, urlsplit
+from urllib.request import url2pathname
+
+from rich.console import Console
+
+from ..Fetching.FetchURL import BodyReader, PageResource, StaticFetcher
+from ..Fetching.SingleFlight import normalize_url
+from ..Profiling.MemoryBudget import MemoryBudget
+from ..Profiling.Profiler import Profiler
+from ..Views.TerminalRenderer import TerminalRenderer
+from ..terminalbrowser import prepare_page
+
+logger = logging.getLogger("offline")
+
+
+HTML_SUFFIXES = (".html", ".htm", ".xhtml")
+WARC_SUFFIXES = (".warc", ".warc.gz")
+HTML_TYPES = ("text/html", "application/xhtml+xml")
+
+
+# ---------- loading local pages ----------
+def _read_mapped(path: Union[str, Path], threshold: int, content_type: str = "") -> str:
+    """Decode a file, memory-mapping it when it is at least threshold bytes."""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size and size >= threshold:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return BodyReader.decode(mm, content_type)
+        return BodyReader.decode(f.read(), content_type)
+
+
+def resolve_imports(css_text: str, sheet_url: str, load: Callable[[str], str],
+                    _chain: Tuple[str, ...] = ()) -> str:
+    """StaticFetcher.resolve_imports without the network: imported sheets come from load(url)."""
+    imports = StaticFetcher._import_rules(css_text)
+    if not imports:
+        return css_text
+    chain = _chain + (sheet_url,)
+    resolved = []
+    for full_url, media in StaticFetcher._import_targets(imports, sheet_url, chain):
+        imported = load(full_url)
+        if imported:
+            imported = resolve_imports(imported, full_url, load, chain)
+            resolved.append(StaticFetcher._wrap_media(imported, media))
+    return "\n".join([*resolved, css_text])
+
+
+def offline_page(html: str, url: str, load: Callable[[str], str]) -> PageResource:
+    """
+    Build the PageResource StaticFetcher.fetch_with_css would, from HTML that
+    is already at hand. Stylesheets and @imports are read with load(url),
+    which returns "" for anything it doesn't have.
+    """
+    soup, title, inline_styles, links = StaticFetcher._collect_page(html, url)
+    css_data = {"inline": [], "external": {}, "attribute": []}
+
+    for style_text in inline_styles:
+        css_data["inline"].append(resolve_imports(style_text, url, load))
+
+    linked: Set[str] = set()
+    for css_url, media in links:
+        full_url = urljoin(url, css_url)
+        if normalize_url(full_url) in linked:
+            continue
+        linked.add(normalize_url(full_url))
+        css_content = load(full_url)
+        if css_content:
+            css_content = resolve_imports(css_content, full_url, load)
+            css_data["external"][css_url] = StaticFetcher._wrap_media(css_content, media)
+
+    return StaticFetcher._page_resource(soup, css_data, url, title, 200, {})
+
+
+# ---------- WARC archives ----------
+@dataclass(frozen=True)
+class WarcRecord:
+    """Where one response lives in an archive, so a worker can read it without rescanning."""
+    archive: str
+    uri: str
+    content_type: str
+    member: int  # offset of the gzip member holding the record, -1 for uncompressed archives
+    start: int   # offset of the record block in the file (or in the decompressed member)
+    length: int
+    http: bool   # block is an HTTP response (status line + headers + body)
+
+
+class WarcReader:
+    """
+    Minimal WARC 1.0/1.1 reader over a memory-mapped archive.
+
+    Handles uncompressed archives and record-at-a-time gzip (.warc.gz, one
+    gzip member per record, as the spec recommends). scan() reads only
+    record headers and the first bytes of each HTTP response, and returns
+    the offsets of the HTML pages and stylesheets; read() fetches one body
+    by offset. An archive gzipped as one stream has no offsets worth
+    keeping (every read would inflate it from the start), so
+    is_single_stream() detects it and stream() reads it in a single pass.
+    """
+
+    CHUNK_SIZE = 1024 * 1024
+    HEAD_BYTES = 16 * 1024  # enough for the HTTP status line and headers
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = str(path)
+        self._file = open(self.path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self.mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self.compressed = self.mm[:2] == b"\x1f\x8b"
+
+    def close(self) -> None:
+        if isinstance(self.mm, mmap.mmap):
+            self.mm.close()
+        self._file.close()
+
+    def __enter__(self) -> "WarcReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ---------- low level ----------
+    def inflate(self, offset: int) -> Tuple[bytes, int]:
+        """Decompress the gzip member at offset. Returns (data, offset of the next member)."""
+        inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        parts, pos = [], offset
+        while not inflater.eof and pos < len(self.mm):
+            chunk = self.mm[pos:pos + self.CHUNK_SIZE]
+            pos += len(chunk)
+            parts.append(inflater.decompress(chunk))
+        if not inflater.eof:
+            raise ValueError(f"{self.path}: truncated gzip member at offset {offset}")
+        return b"".join(parts), pos - len(inflater.unused_data)
+
+    def _inflated(self, members: Optional[int] = None) -> Iterator[bytes]:
+        """Decompressed data of the first members gzip members (all by default), chunk by chunk."""
+        pos = 0
+        while pos < len(self.mm) and members != 0:
+            inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            while not inflater.eof and pos < len(self.mm):
+                chunk = self.mm[pos:pos + self.CHUNK_SIZE]
+                pos += len(chunk)
+                yield inflater.decompress(chunk)
+            if not inflater.eof:
+                raise ValueError(f"{self.path}: truncated gzip member")
+            pos -= len(inflater.unused_data)
+            members = None if members is None else members - 1
+
+    @staticmethod
+    def _records(data, base: int = 0) -> Iterator[Tuple[Dict[str, str], int, int]]:
+        """(WARC headers, block start, block length) for each record in data."""
+        pos = data.find(b"WARC/", base)
+        while pos != -1:
+            end = data.find(b"\r\n\r\n", pos)
+            if end == -1:
+                return
+            headers = _parse_headers(bytes(data[pos:end]).decode("utf-8", "replace").split("\r\n")[1:])
+            try:
+                length = int(headers.get("content-length", ""))
+            except ValueError:
+                logger.warning(f"WARC record at {pos} has no valid Content-Length, stopping")
+                return
+            yield headers, end + 4, length
+            pos = data.find(b"WARC/", end + 4 + length)
+
+    # ---------- index ----------
+    def scan(self) -> Iterator[WarcRecord]:
+        """Every HTML page and stylesheet with a 2xx status, in archive order."""
+        if not self.compressed:
+            yield from self._scan_block(self.mm, -1)
+            return
+        offset = 0
+        while offset < len(self.mm):
+            data, next_offset = self.inflate(offset)
+            yield from self._scan_block(data, offset)
+            offset = next_offset
+
+    def _scan_block(self, data, member: int) -> Iterator[WarcRecord]:
+        for headers, start, length in self._records(data):
+            found = self._classify(headers, bytes(data[start:start + min(length, self.HEAD_BYTES)]))
+            if found:
+                uri = headers.get("warc-target-uri", "").strip("<>")
+                yield WarcRecord(self.path, uri, found[0], member, start, length, found[1])
+
+    @staticmethod
+    def _classify(headers: Dict[str, str], head: bytes) -> Optional[Tuple[str, bool]]:
+        """(content type, block is HTTP) for an HTML page or stylesheet with a 2xx status, else None."""
+        kind = headers.get("warc-type", "")
+        if kind == "response" and headers.get("content-type", "").startswith("application/http"):
+            status, http_headers, _ = _split_http(head)
+            if not 200 <= status < 300:
+                return None
+            content_type, http = http_headers.get("content-type", ""), True
+        elif kind in ("response", "resource"):
+            content_type, http = headers.get("content-type", ""), False
+        else:
+            return None
+        mime = content_type.split(";")[0].strip().lower()
+        return (content_type, http) if mime in HTML_TYPES or mime == "text/css" else None
+
+    # ---------- whole-file gzip ----------
+    def is_single_stream(self) -> bool:
+        """True when the first gzip member holds more than one record, as with gzip over the whole file."""
+        if not self.compressed:
+            return False
+        data = bytearray()
+        for chunk in self._inflated(members=1):
+            data += chunk
+            records = self._records(data)
+            if next(records, None) and next(records, None):
+                return True
+        return False
+
+    def stream(self) -> Iterator[Tuple[str, str, bytes]]:
+        """
+        (uri, content type, decoded body) of every record scan() would
+        return, inflating the archive once from start to end. Only the
+        record being assembled is kept in memory.
+        """
+        data = bytearray()
+        for chunk in self._inflated():
+            data += chunk
+            complete = 0
+            for headers, start, length in self._records(data):
+                if start + length > len(data):
+                    break
+                complete = start + length
+                found = self._classify(headers, bytes(data[start:start + min(length, self.HEAD_BYTES)]))
+                if found:
+                    uri = headers.get("warc-target-uri", "").strip("<>")
+                    yield uri, found[0], self._decode_block(bytes(data[start:start + length]), found[1])
+            del data[:complete]
+
+    # ---------- bodies ----------
+    def read(self, record: WarcRecord) -> bytes:
+        """The decoded body of a record (HTTP framing, chunking and Content-Encoding removed)."""
+        if record.member < 0:
+            block = self.mm[record.start:record.start + record.length]
+        else:
+            data, _ = self.inflate(record.member)
+            block = data[record.start:record.start + record.length]
+        return self._decode_block(block, record.http)
+
+    @staticmethod
+    def _decode_block(block: bytes, http: bool) -> bytes:
+        if not http:
+            return block
+        _, headers, body = _split_http(block)
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            body = _dechunk(body)
+        encoding = headers.get("content-encoding", "").strip().lower()
+        if encoding in ("gzip", "x-gzip"):
+            body = zlib.decompress(body, 16 + zlib.MAX_WBITS)
+        elif encoding == "deflate":
+            try:
+                body = zlib.decompress(body)
+            except zlib.error:
+                body = zlib.decompress(body, -zlib.MAX_WBITS)  # raw deflate, as some servers send
+        elif encoding not in ("", "identity"):
+            raise ValueError(f"unsupported Content-Encoding {encoding!r}")
+        return body
+
+
+def _parse_headers(lines: List[str]) -> Dict[str, str]:
+    headers: Dict[str, str] = {}
+    for line in lines:
+        name, sep, value = line.partition(":")
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+    return headers
+
+
+def _split_http(block: bytes) -> Tuple[int, Dict[str, str], bytes]:
+    """(status, lowercased headers, body) of a raw HTTP response."""
+    end = block.find(b"\r\n\r\n")
+    head, body = (block, b"") if end == -1 else (block[:end], block[end + 4:])
+    lines = head.decode("iso-8859-1").split("\r\n")
+    match = re.match(r"HTTP/\S+\s+(\d{3})", lines[0])
+    return (int(match.group(1)) if match else 0), _parse_headers(lines[1:]), body
+
+
+def _dechunk(body: bytes) -> bytes:
+    parts, pos = [], 0
+    while True:
+        end = body.find(b"\r\n", pos)
+        if end == -1:
+            break
+        try:
+            size = int(body[pos:end].split(b";")[0], 16)
+        except ValueError:
+            break
+        if size == 0:
+            break
+        parts.append(body[end + 2:end + 2 + size])
+        pos = end + 2 + size + 2
+    return b"".join(parts)
+
+
+# ---------- jobs and worker side ----------
+@dataclass(frozen=True)
+class FileJob:
+    path: str
+    output: str
+
+
+@dataclass(frozen=True)
+class WarcJob:
+    record: WarcRecord
+    output: str
+
+
+@dataclass(frozen=True)
+class SpoolJob:
+    """A page from an archive that can't be read by offset, spooled to path by the parent."""
+    uri: str
+    content_type: str
+    path: str
+    output: str
+
+
+Job = Union[FileJob, WarcJob, SpoolJob]
+# normalized URL -> stylesheet record, or its text when the archive was streamed
+Stylesheets = Dict[str, Union[WarcRecord, str]]
+
+
+@dataclass
+class DocResult:
+    source: str
+    output: str
+    bytes_in: int = 0
+    chars_out: int = 0
+    seconds: float = 0.0
+    stages: Dict[str, float] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+@dataclass
+class _WorkerState:
+    width: int
+    reader: bool
+    budget: MemoryBudget
+    mmap_threshold: int
+    stylesheets: Stylesheets  # across all archives
+    archives: Dict[str, WarcReader] = field(default_factory=dict)
+
+    def archive(self, path: str) -> WarcReader:
+        if path not in self.archives:
+            self.archives[path] = WarcReader(path)
+        return self.archives[path]
+
+
+_state: Optional[_WorkerState] = None
+
+
+def _init_worker(width: int, reader: bool, budget: MemoryBudget, mmap_threshold: int,
+                 stylesheets: Stylesheets) -> None:
+    global _state
+    _state = _WorkerState(width, reader, budget, mmap_threshold, stylesheets)
+    _archived_css.cache_clear()
+
+
+def _local_css(url: str) -> str:
+    parts = urlsplit(url)
+    if parts.scheme != "file":
+        logger.debug(f"Offline, skipping stylesheet {url}")
+        return ""
+    path = url2pathname(unquote(parts.path))
+    if not os.path.isfile(path):
+        logger.debug(f"Missing local stylesheet {path}")
+        return ""
+    return StaticFetcher._absolute_css_urls(_read_mapped(path, _state.mmap_threshold, "text/css"), url)
+
+
+@lru_cache(maxsize=256)
+def _archived_css(key: str) -> str:
+    # pages of one site share their stylesheets, so decoded sheets are kept per worker
+    record = _state.stylesheets.get(key)
+    if record is None:
+        logger.debug(f"Stylesheet not in archive: {key}")
+        return ""
+    if isinstance(record, str):
+        return record
+    try:
+        body = _state.archive(record.archive).read(record)
+    except (ValueError, zlib.error) as e:
+        logger.warning(f"Unreadable stylesheet {record.uri}: {e}")
+        return ""
+    return StaticFetcher._absolute_css_urls(BodyReader.decode(body, record.content_type), record.uri)
+
+
+def _render_text(page: PageResource, state: _WorkerState, profiler: Profiler) -> str:
+    dom_tree = prepare_page(page, profiler, state.budget, verbose=False, reader=state.reader)
+    buffer = io.StringIO()
+    console = Console(file=buffer, width=state.width, color_system=None, force_terminal=False)
+    with profiler.stage("render"):
+        TerminalRenderer(console=console).render(dom_tree)
+    return buffer.getvalue()
+
+
+def _render_job(job: Job) -> DocResult:
+    """Worker entry point: load one document, run the pipeline and write its text."""
+    state = _state
+    started = time.perf_counter()
+    if isinstance(job, FileJob):
+        source = job.path
+    elif isinstance(job, WarcJob):
+        source = job.record.uri
+    else:
+        source = job.uri
+    result = DocResult(source, job.output)
+    profiler = Profiler()
+    try:
+        with profiler:
+            with profiler.stage("read"):
+                if isinstance(job, FileJob):
+                    result.bytes_in = os.path.getsize(job.path)
+                    html = _read_mapped(job.path, state.mmap_threshold, "text/html")
+                    page = offline_page(html, Path(job.path).resolve().as_uri(), _local_css)
+                else:
+                    if isinstance(job, WarcJob):
+                        result.bytes_in = job.record.length
+                        body = state.archive(job.record.archive).read(job.record)
+                        html = BodyReader.decode(body, job.record.content_type)
+                    else:
+                        result.bytes_in = os.path.getsize(job.path)
+                        html = _read_mapped(job.path, state.mmap_threshold, job.content_type)
+                    page = offline_page(html, source, lambda url: _archived_css(normalize_url(url)))
+            text = _render_text(page, state, profiler)
+        os.makedirs(os.path.dirname(job.output) or ".", exist_ok=True)
+        with open(job.output, "w", encoding="utf-8") as f:
+            f.write(text)
+        result.chars_out = len(text)
+    except Exception as e:
+        # one broken page must not stop a multi-GB conversion
+        result.error = f"{type(e).__name__}: {e}"
+    result.stages = {name: timing.wall for name, timing in profiler.stages.items()}
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+# ---------- batch driver ----------
+@dataclass
+class BatchStats:
+    documents: int = 0
+    failed: int = 0
+    bytes_in: int = 0
+    chars_out: int = 0
+    elapsed: float = 0.0
+    stages: Dict[str, float] = field(default_factory=dict)  # summed over all workers
+
+    def add(self, result: DocResult) -> None:
+        self.documents += 1
+        self.bytes_in += result.bytes_in
+        self.chars_out += result.chars_out
+        if result.error:
+            self.failed += 1
+        for name, seconds in result.stages.items():
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    @property
+    def docs_per_second(self) -> float:
+        return self.documents / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.bytes_in / 1024 / 1024 / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self) -> str:
+        return (f"{self.documents} documents ({self.failed} failed), "
+                f"{self.bytes_in / 1024 / 1024:.1f} MB in {self.elapsed:.1f}s: "
+                f"{self.docs_per_second:.1f} docs/s, {self.mb_per_second:.2f} MB/s")
+
+    def format_stages(self) -> str:
+        total = sum(self.stages.values()) or 1.0
+        return "\n".join(f"  {name:<8} {seconds:8.2f}s  {seconds / total:6.1%}"
+                         for name, seconds in sorted(self.stages.items(), key=lambda item: -item[1]))
+
+
+class BatchRenderer:
+    """
+    Renders saved pages to text files without touching the network.
+
+    Inputs are directories of saved HTML (stylesheets are read from disk
+    relative to each page), single HTML files and WARC archives (stylesheets
+    are looked up among the archive's own responses). Each document goes
+    through the browser's pipeline (prepare_page, then TerminalRenderer into
+    an uncoloured in-memory console) in a pool of worker processes; the
+    parent only scans archives and hands out small jobs (a path, or an
+    archive offset), so the pages themselves never pass between processes.
+    The exception is an archive gzipped as a single stream: the parent
+    inflates it once while planning, one record at a time, and spools its
+    pages to files under the output directory (removed when run() ends),
+    so the workers still get paths. Files of at least MMAP_THRESHOLD bytes
+    and all archives are memory-mapped.
+    """
+
+    MMAP_THRESHOLD = 1024 * 1024
+    PROGRESS_INTERVAL = 5.0  # seconds between progress log lines
+    MANIFEST = "manifest.tsv"
+
+    def __init__(self, output_dir: Union[str, Path], workers: Optional[int] = None, width: int = 100,
+                 reader: bool = True, budget: Optional[MemoryBudget] = None):
+        self.output_dir = Path(output_dir)
+        self.workers = workers or self.default_workers()
+        self.width = width
+        self.reader = reader
+        self.budget = budget or MemoryBudget()
+        self._spool: Optional[tempfile.TemporaryDirectory] = None
+
+    @staticmethod
+    def default_workers() -> int:
+        if hasattr(os, "sched_getaffinity"):
+            return len(os.sched_getaffinity(0))
+        return os.cpu_count() or 1
+
+    # ---------- planning ----------
+    def _output(self, *parts: str) -> str:
+        return str(self.output_dir.joinpath(*parts))
+
+    @staticmethod
+    def _unique(stem: str, suffix: str, used: Set[str]) -> str:
+        """stem + suffix, or stem-1 + suffix, stem-2 + suffix, ... if an earlier input already took it."""
+        candidate, n = stem + suffix, 0
+        # compared case-insensitively so the tree also unpacks on case-insensitive filesystems
+        while candidate.lower() in used:
+            n += 1
+            candidate = f"{stem}-{n}{suffix}"
+        used.add(candidate.lower())
+        return candidate
+
+    def plan(self, inputs: List[Union[str, Path]]) -> Tuple[List[Job], Stylesheets]:
+        """Jobs for every page under inputs, plus the stylesheet index of the archives."""
+        jobs: List[Job] = []
+        stylesheets: Stylesheets = {}
+        used: Set[str] = set()  # output paths and per-input directories handed out so far
+        for source in map(Path, inputs):
+            if source.is_dir():
+                root = self._unique(self._output(source.name), "", used)
+                for path in sorted(source.rglob("*")):
+                    if path.is_file() and path.suffix.lower() in HTML_SUFFIXES:
+                        relative = path.relative_to(source).with_suffix("")
+                        output = self._unique(os.path.join(root, *relative.parts), ".txt", used)
+                        jobs.append(FileJob(str(path), output))
+            elif source.name.lower().endswith(WARC_SUFFIXES):
+                stem = re.sub(r"\.warc(\.gz)?$", "", source.name, flags=re.I)
+                jobs.extend(self._plan_archive(source, self._unique(self._output(stem), "", used), stylesheets))
+            elif source.suffix.lower() in HTML_SUFFIXES:
+                jobs.append(FileJob(str(source), self._unique(self._output(source.stem), ".txt", used)))
+            else:
+                logger.warning(f"Skipping {source}: not a directory, HTML file or WARC archive")
+        return jobs, stylesheets
+
+    def _spool_file(self, body: bytes) -> str:
+        """Write a page body to this run's spool directory and return its path."""
+        if self._spool is None:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            # next to the output rather than in the system temp dir, which may be memory-backed
+            self._spool = tempfile.TemporaryDirectory(prefix=".spool-", dir=self.output_dir)
+        fd, path = tempfile.mkstemp(suffix=".html", dir=self._spool.name)
+        with os.fdopen(fd, "wb") as f:
+            f.write(body)
+        return path
+
+    def _plan_archive(self, archive: Path, root: str, stylesheets: Stylesheets) -> List[Union[WarcJob, SpoolJob]]:
+        jobs: List[Union[WarcJob, SpoolJob]] = []
+        with WarcReader(archive) as warc:
+            if warc.is_single_stream():
+                # by offset, every page would inflate the archive from the start again
+                logger.warning(f"{archive} is gzipped as a single stream; decompressing it once and spooling "
+                               f"its pages to disk. Recompress it per record to read pages in place.")
+                found = warc.stream()
+            else:
+                found = ((record.uri, record.content_type, record) for record in warc.scan())
+            for uri, content_type, entry in found:
+                if content_type.split(";")[0].strip().lower() == "text/css":
+                    if isinstance(entry, bytes):
+                        entry = StaticFetcher._absolute_css_urls(BodyReader.decode(entry, content_type), uri)
+                    stylesheets.setdefault(normalize_url(uri), entry)
+                    continue
+                parts = urlsplit(uri)
+                slug = re.sub(r"[^\w.-]+", "_", f"{parts.netloc}{parts.path}").strip("_")[:80]
+                output = os.path.join(root, f"{len(jobs):06d}_{slug or 'page'}.txt")
+                if isinstance(entry, bytes):
+                    jobs.append(SpoolJob(uri, content_type, self._spool_file(entry), output))
+                else:
+                    jobs.append(WarcJob(entry, output))
+        logger.info(f"{archive}: {len(jobs)} pages, {len(stylesheets)} stylesheets indexed so far")
+        return jobs
+
+    # ---------- running ----------
+    def run(self, inputs: List[Union[str, Path]]) -> BatchStats:
+        try:
+            return self._run(inputs)
+        finally:
+            if self._spool is not None:
+                self._spool.cleanup()
+                self._spool = None
+
+    def _run(self, inputs: List[Union[str, Path]]) -> BatchStats:
+        started = time.perf_counter()
+        jobs, stylesheets = self.plan(inputs)
+        init_args = (self.width, self.reader, self.budget, self.MMAP_THRESHOLD, stylesheets)
+        stats = BatchStats()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        with open(self.output_dir / self.MANIFEST, "w", encoding="utf-8") as manifest:
+            manifest.write("output\tsource\tbytes\tchars\tseconds\terror\n")
+            last_report = time.perf_counter()
+            for result in self._results(jobs, init_args):
+                stats.add(result)
+                manifest.write(f"{os.path.relpath(result.output, self.output_dir)}\t{result.source}\t"
+                               f"{result.bytes_in}\t{result.chars_out}\t{result.seconds:.3f}\t{result.error or ''}\n")
+                if result.error:
+                    logger.warning(f"{result.source}: {result.error}")
+                now = time.perf_counter()
+                if now - last_report >= self.PROGRESS_INTERVAL:
+                    stats.elapsed = now - started
+                    logger.info(f"{stats.documents}/{len(jobs)}: {stats}")
+                    last_report = now
+
+        stats.elapsed = time.perf_counter() - started
+        logger.info(f"Done: {stats}")
+        return stats
+
+    def _results(self, jobs: List[Job], init_args: tuple) -> Iterator[DocResult]:
+        if self.workers <= 1 or len(jobs) <= 1:
+            yield from self._serial(jobs, init_args)
+            return
+        try:
+            executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=init_args)
+        except (OSError, RuntimeError) as e:
+            logger.warning(f"Process pool unavailable ({e}), rendering serially")
+            yield from self._serial(jobs, init_args)
+            return
+
+        # a bounded window of submitted jobs keeps memory flat however many pages there are
+        window = self.workers * 4
+        pending: Set[Future] = set()
+        queue = iter(jobs)
+        with executor:
+            while True:
+                for job in queue:
+                    pending.add(executor.submit(_render_job, job))
+                    if len(pending) >= window:
+                        break
+                if not pending:
+                    return
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+    @staticmethod
+    def _serial(jobs: List[Job], init_args: tuple) -> Iterator[DocResult]:
+        _init_worker(*init_args)
+        try:
+            for job in jobs:
+                yield _render_job(job)
+        finally:
+            for warc in _state.archives.values():
+                warc.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Render saved HTML pages and WARC archives to text, offline")
+    parser.add_argument("inputs", nargs="+", help="directories of saved pages, .html files or .warc(.gz) archives")
+    parser.add_argument("-o", "--output", required=True, help="directory for the text files and manifest.tsv")
+    parser.add_argument("-j", "--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--width", type=int, default=100, help="console width to render at")
+    parser.add_argument("--full-page", action="store_true",
+                        help="render whole pages instead of only the main article (reader mode)")
+    parser.add_argument("--max-nodes", type=int, help="truncate each DOM after this many nodes")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    budget = MemoryBudget()
+    if args.max_nodes is not None:
+        budget.max_nodes = budget.max_styled_nodes = args.max_nodes
+
+    renderer = BatchRenderer(args.output, workers=args.workers, width=args.width,
+                             reader=not args.full_page, budget=budget)
+    stats = renderer.run(args.inputs)
+    print(stats)
+    print(stats.format_stages())
+    sys.exit(1 if stats.failed == stats.documents and stats.documents else 0)
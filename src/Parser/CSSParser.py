@@ -1,13 +1,49 @@
+import logging
+import multiprocessing
+import os
+import re
+import shutil
+import threading
 import tinycss2
-from typing import List, Dict, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional, Tuple, Union
 from dataclasses import dataclass
 
+logger = logging.getLogger("parser")
+
+
+def _parse_chunk(job: Tuple[str, int]) -> List[Tuple[str, Dict[str, str]]]:
+    """Process-pool entry point: parse one chunk and send back only (selector, props) tuples."""
+    css_text, viewport_width = job
+    return CSSParser._parse_css_string(css_text, viewport_width)
+
 
 @dataclass
 class CSSParser:
 
+    # a terminal cell is treated as this many CSS pixels when evaluating @media widths
+    CELL_WIDTH_PX = 8
+    EM_PX = 16
+    # media types a terminal counts as; everything else (print, speech, ...) never matches
+    SCREEN_MEDIA_TYPES = {"all", "screen"}
+
+    # below this much CSS, starting worker processes costs more than it saves
+    PARALLEL_THRESHOLD = 512 * 1024
+    # large sheets are cut into pieces of about this size at top-level rule boundaries
+    CHUNK_SIZE = 128 * 1024
+    MAX_WORKERS = min(len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1, 8)
+
+    _pool: Optional[ProcessPoolExecutor] = None
+    _pool_lock = threading.Lock()
+
     @staticmethod
-    def parse(css_input: Union[str, dict]) -> list[tuple[str, Dict[str, str]]]:
+    def viewport_width() -> int:
+        """The terminal's width in CSS pixels."""
+        return shutil.get_terminal_size((100, 24)).columns * CSSParser.CELL_WIDTH_PX
+
+    @staticmethod
+    def parse(css_input: Union[str, dict], viewport_width: Optional[int] = None,
+              parallel: Optional[bool] = None) -> list[tuple[str, Dict[str, str]]]:
         """
         Parse CSS from either a string or dict format.
         
@@ -17,18 +53,22 @@ class CSSParser:
             "external": {url: css_string, ...},
             "attribute": [{"selector": str, "style": str}, ...]
         }
+
+        @media blocks are evaluated once against viewport_width (defaults to
+        the terminal width); blocks that don't apply are dropped here.
+
+        parallel: parse stylesheets across a process pool. None (the default)
+        turns it on only when there is more than PARALLEL_THRESHOLD of CSS.
         """
         rules: List[Tuple[str, Dict[str, str]]] = []
+        if viewport_width is None:
+            viewport_width = CSSParser.viewport_width()
         
         # Handle dict format
         if isinstance(css_input, dict):
-            # Parse inline styles
-            for css_text in css_input.get("inline", []):
-                rules.extend(CSSParser._parse_css_string(css_text))
-            
-            # Parse external stylesheets
-            for css_text in css_input.get("external", {}).values():
-                rules.extend(CSSParser._parse_css_string(css_text))
+            # inline styles first, then external stylesheets: the cascade order
+            sheets = list(css_input.get("inline", [])) + list(css_input.get("external", {}).values())
+            rules.extend(CSSParser._parse_sheets(sheets, viewport_width, parallel))
             
             # Parse attribute styles
             for attr in css_input.get("attribute", []):
@@ -39,19 +79,125 @@ class CSSParser:
                     rules.append((selector, props))
         else:
             # Handle string format (backward compatibility)
-            rules = CSSParser._parse_css_string(css_input)
+            rules = CSSParser._parse_sheets([css_input], viewport_width, parallel)
         
         return rules
+
+    # ---------- parallel parsing ----------
+    @staticmethod
+    def _parse_sheets(sheets: List[str], viewport_width: int,
+                      parallel: Optional[bool] = None) -> List[Tuple[str, Dict[str, str]]]:
+        """Parse stylesheets in order, across the process pool when they are large enough."""
+        if parallel is None:
+            parallel = sum(len(css_text) for css_text in sheets) >= CSSParser.PARALLEL_THRESHOLD
+
+        rules: List[Tuple[str, Dict[str, str]]] = []
+        if parallel and CSSParser.MAX_WORKERS > 1:
+            jobs = [
+                (chunk, viewport_width)
+                for css_text in sheets
+                for chunk in CSSParser.split_top_level(css_text, CSSParser.CHUNK_SIZE)
+            ]
+            if len(jobs) > 1:
+                try:
+                    # map() yields results in submission order, which keeps the cascade order
+                    for chunk_rules in CSSParser._get_pool().map(_parse_chunk, jobs):
+                        rules.extend(chunk_rules)
+                    return rules
+                except (OSError, RuntimeError) as e:
+                    # BrokenProcessPool is a RuntimeError; sandboxes may refuse to fork (OSError)
+                    logger.warning(f"Parallel CSS parsing unavailable, parsing serially: {e}")
+                    CSSParser.shutdown_pool()
+                    rules = []
+
+        for css_text in sheets:
+            rules.extend(CSSParser._parse_css_string(css_text, viewport_width))
+        return rules
+
+    @staticmethod
+    def _get_pool() -> ProcessPoolExecutor:
+        with CSSParser._pool_lock:
+            if CSSParser._pool is None:
+                # not fork: the browser has threads running by now (prefetcher, session pools,
+                # @import downloads) whose held locks a forked child would inherit forever
+                method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                CSSParser._pool = ProcessPoolExecutor(max_workers=CSSParser.MAX_WORKERS,
+                                                      mp_context=multiprocessing.get_context(method))
+            return CSSParser._pool
+
+    @staticmethod
+    def shutdown_pool() -> None:
+        with CSSParser._pool_lock:
+            if CSSParser._pool is not None:
+                CSSParser._pool.shutdown(wait=False, cancel_futures=True)
+                CSSParser._pool = None
+
+    @staticmethod
+    def split_top_level(css_text: str, chunk_size: int) -> List[str]:
+        """
+        Cut a stylesheet into pieces of roughly chunk_size characters.
+
+        Cuts only fall right after a "}" or ";" at nesting depth 0, outside
+        strings and comments, so every piece is a sequence of whole rules
+        (an @media block is never split) and parses the same on its own.
+        """
+        if len(css_text) <= chunk_size:
+            return [css_text]
+
+        chunks: List[str] = []
+        start = 0
+        depth = 0
+        i = 0
+        n = len(css_text)
+        while i < n:
+            ch = css_text[i]
+            if ch == "/" and css_text.startswith("/*", i):
+                end = css_text.find("*/", i + 2)
+                i = n if end == -1 else end + 2
+                continue
+            if ch in "\"'":
+                i += 1
+                while i < n and css_text[i] != ch and css_text[i] != "\n":
+                    i += 2 if css_text[i] == "\\" else 1
+                i += 1
+                continue
+            if ch == "\\":
+                i += 2
+                continue
+            if ch in "{[(":
+                depth += 1
+            elif ch in "}])":
+                depth = max(depth - 1, 0)
+
+            if depth == 0 and ch in "};" and i + 1 - start >= chunk_size:
+                chunks.append(css_text[start:i + 1])
+                start = i + 1
+            i += 1
+
+        if start < n:
+            chunks.append(css_text[start:])
+        return chunks
     
     @staticmethod
-    def _parse_css_string(css_text: str) -> list[tuple[str, Dict[str, str]]]:
+    def _parse_css_string(css_text: str, viewport_width: Optional[int] = None) -> list[tuple[str, Dict[str, str]]]:
         """Parse a CSS string and return list of (selector, properties) tuples."""
-        rules: List[Tuple[str, Dict[str, str]]] = []
-        
         # Parse the whole CSS stylesheet
         stylesheet = tinycss2.parse_stylesheet(css_text, skip_whitespace=True, skip_comments=True)
+        if viewport_width is None:
+            viewport_width = CSSParser.viewport_width()
+        return CSSParser._parse_rule_list(stylesheet, viewport_width)
+
+    @staticmethod
+    def _parse_rule_list(stylesheet: list, viewport_width: int) -> list[tuple[str, Dict[str, str]]]:
+        rules: List[Tuple[str, Dict[str, str]]] = []
 
         for rule in stylesheet:
+            if rule.type == "at-rule" and rule.lower_at_keyword == "media" and rule.content is not None:
+                query = tinycss2.serialize(rule.prelude).strip()
+                if CSSParser.media_matches(query, viewport_width):
+                    nested = tinycss2.parse_rule_list(rule.content, skip_whitespace=True, skip_comments=True)
+                    rules.extend(CSSParser._parse_rule_list(nested, viewport_width))
+                continue
             if rule.type != "qualified-rule":
                 continue
             selector = tinycss2.serialize(rule.prelude).strip()
@@ -68,6 +214,72 @@ class CSSParser:
 
         return rules
     
+    # ---------- @media evaluation ----------
+    _FEATURE = re.compile(r"^\(\s*([a-z-]+)\s*(?::\s*([^)]*?))?\s*\)$")
+    _RANGE = re.compile(r"^\(\s*width\s*(<=|>=|<|>|=)\s*([^)]+?)\s*\)$")
+
+    @staticmethod
+    def _length_px(value: str) -> Optional[float]:
+        match = re.match(r"^\s*(-?[\d.]+)\s*(px|em|rem)?\s*$", value)
+        if not match:
+            return None
+        number = float(match.group(1))
+        return number * CSSParser.EM_PX if match.group(2) in ("em", "rem") else number
+
+    @staticmethod
+    def _feature_matches(feature: str, width: int) -> bool:
+        range_match = CSSParser._RANGE.match(feature)
+        if range_match:
+            op, length = range_match.group(1), CSSParser._length_px(range_match.group(2))
+            if length is None:
+                return False
+            return {"<": width < length, "<=": width <= length, ">": width > length,
+                    ">=": width >= length, "=": width == length}[op]
+
+        match = CSSParser._FEATURE.match(feature)
+        if not match:
+            return False
+        name, value = match.group(1), (match.group(2) or "").strip()
+        if name in ("min-width", "max-width", "width"):
+            length = CSSParser._length_px(value)
+            if length is None:
+                return False
+            if name == "min-width":
+                return width >= length
+            if name == "max-width":
+                return width <= length
+            return width == length
+        if name == "orientation":
+            return value == "landscape"
+        if name == "prefers-color-scheme":
+            return value == "dark"
+        # unknown features evaluate to false, as in browsers
+        return False
+
+    @staticmethod
+    def media_matches(query: str, width: int) -> bool:
+        """Evaluate a media query list (e.g. "screen and (min-width: 600px), print") for a terminal."""
+        query = query.strip().lower()
+        if not query:
+            return True
+
+        for single in query.split(","):
+            single = single.strip()
+            negate = single.startswith("not ")
+            if single.startswith(("not ", "only ")):
+                single = single.split(None, 1)[1]
+
+            result = True
+            for part in re.split(r"\s+and\s+", single):
+                part = part.strip()
+                if part.startswith("("):
+                    result = result and CSSParser._feature_matches(part, width)
+                else:
+                    result = result and part in CSSParser.SCREEN_MEDIA_TYPES
+            if result != negate:
+                return True
+        return False
+
     @staticmethod
     def _parse_style_string(style: str) -> Dict[str, str]:
         """Parse inline style attribute string into properties dict."""
@@ -0,0 +1,159 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from .HTMLParser import Node
+
+
+@dataclass
+class PruneStats:
+    """What a pruning pass removed."""
+    rules_before: int = 0
+    rules_after: int = 0
+    selectors_before: int = 0
+    selectors_after: int = 0
+    declarations_before: int = 0
+    declarations_after: int = 0
+
+    @property
+    def rules_removed(self) -> int:
+        return self.rules_before - self.rules_after
+
+    @property
+    def declarations_removed(self) -> int:
+        return self.declarations_before - self.declarations_after
+
+    def __str__(self) -> str:
+        return (f"pruned {self.rules_removed}/{self.rules_before} rules, "
+                f"{self.declarations_removed}/{self.declarations_before} declarations")
+
+
+@dataclass
+class DocumentKeys:
+    """Tags, ids and classes present in a document."""
+    tags: Set[str]
+    ids: Set[str]
+    classes: Set[str]
+
+
+class CSSPruner:
+    """
+    Drops CSS that cannot affect a given document before style resolution.
+
+    A selector can only match if its rightmost compound selector can: its
+    tag, every #id and every .class in it must occur somewhere in the
+    document. Pseudo-classes, attribute selectors and ancestors are ignored,
+    which keeps the check conservative (it never drops a rule that could match).
+    Declarations for properties outside the renderer's whitelist are dropped too.
+    """
+
+    # splits "div > p.note" into compounds on descendant/child/sibling combinators
+    _COMBINATOR = re.compile(r"\s*[>+~]\s*|\s+")
+    _BRACKETED = re.compile(r"\([^()]*\)|\[[^\]]*\]")
+    _TAG = re.compile(r"^(\*|[A-Za-z][\w-]*)")
+    _SIMPLE = re.compile(r"([#.])([\w-]+)")
+
+    @staticmethod
+    def document_keys(root: Node) -> DocumentKeys:
+        tags: Set[str] = set()
+        ids: Set[str] = set()
+        classes: Set[str] = set()
+        for node in root.walk():
+            tags.add(node.tag.lower())
+            if node.attrs.get("id"):
+                ids.add(node.attrs["id"])
+            node_classes = node.attrs.get("class", [])
+            if isinstance(node_classes, str):
+                node_classes = node_classes.split()
+            classes.update(node_classes)
+        return DocumentKeys(tags, ids, classes)
+
+    @staticmethod
+    def split_selector_list(selector: str) -> List[str]:
+        """Split "a, b:not(.x, .y)" on top-level commas only."""
+        parts: List[str] = []
+        depth = 0
+        start = 0
+        for i, ch in enumerate(selector):
+            if ch in "([":
+                depth += 1
+            elif ch in ")]":
+                depth = max(depth - 1, 0)
+            elif ch == "," and depth == 0:
+                parts.append(selector[start:i].strip())
+                start = i + 1
+        parts.append(selector[start:].strip())
+        return [p for p in parts if p]
+
+    @staticmethod
+    def subject_requirements(selector: str) -> Optional[Tuple[Optional[str], List[str], List[str]]]:
+        """
+        Return (tag, ids, classes) required by the rightmost compound selector,
+        or None when the selector is too unusual to analyse (it is then kept).
+        """
+        if "\\" in selector:
+            return None
+        # drop :not(...), :is(...), [attr=...] bodies so their #/. don't count
+        stripped = selector
+        while True:
+            reduced = CSSPruner._BRACKETED.sub("", stripped)
+            if reduced == stripped:
+                break
+            stripped = reduced
+
+        compounds = [c for c in CSSPruner._COMBINATOR.split(stripped.strip()) if c]
+        if not compounds:
+            return None
+        subject = compounds[-1]
+        # pseudo-classes/elements narrow a match but never add requirements we can check
+        subject = subject.split(":", 1)[0]
+
+        tag_match = CSSPruner._TAG.match(subject)
+        tag = tag_match.group(1).lower() if tag_match and tag_match.group(1) != "*" else None
+        ids = [name for kind, name in CSSPruner._SIMPLE.findall(subject) if kind == "#"]
+        classes = [name for kind, name in CSSPruner._SIMPLE.findall(subject) if kind == "."]
+        return tag, ids, classes
+
+    @staticmethod
+    def can_match(selector: str, keys: DocumentKeys) -> bool:
+        requirements = CSSPruner.subject_requirements(selector)
+        if requirements is None:
+            return True
+        tag, ids, classes = requirements
+        if tag is not None and tag not in keys.tags:
+            return False
+        return all(i in keys.ids for i in ids) and all(c in keys.classes for c in classes)
+
+    @staticmethod
+    def prune(rules: List[Tuple[str, Dict[str, str]]], root: Node,
+              properties: Optional[Iterable[str]] = None) -> Tuple[List[Tuple[str, Dict[str, str]]], PruneStats]:
+        """
+        Return the rules that can affect the document, restricted to the given properties.
+
+        Selector lists are rewritten to keep only the parts that can match.
+        """
+        keys = CSSPruner.document_keys(root)
+        allowed: Optional[FrozenSet[str]] = frozenset(properties) if properties is not None else None
+        stats = PruneStats(rules_before=len(rules))
+        kept: List[Tuple[str, Dict[str, str]]] = []
+
+        for selector, props in rules:
+            parts = CSSPruner.split_selector_list(selector)
+            stats.selectors_before += len(parts)
+            stats.declarations_before += len(props)
+
+            if allowed is not None:
+                props = {name: value for name, value in props.items() if name in allowed}
+            if not props:
+                continue
+
+            matching = [part for part in parts if CSSPruner.can_match(part, keys)]
+            if not matching:
+                continue
+
+            stats.selectors_after += len(matching)
+            stats.declarations_after += len(props)
+            kept.append((", ".join(matching), props))
+
+        stats.rules_after = len(kept)
+        return kept, stats
@@ -1,6 +1,13 @@
-from typing import Dict, List, Optional
+import logging
+import re
+import unicodedata
+from typing import Dict, Iterator, List, Optional
 from dataclasses import dataclass, field
-from bs4 import BeautifulSoup, Tag, NavigableString
+from bs4 import BeautifulSoup, Tag, NavigableString, Comment, Declaration, Doctype, ProcessingInstruction
+
+from ..Profiling.Profiler import Profiler
+
+logger = logging.getLogger("parser")
 
 
 @dataclass
@@ -12,6 +19,9 @@ class Node:
     children: List["Node"] = field(default_factory=list)
     computed_style: Dict[str, str] = field(default_factory=dict)
     parent: Optional["Node"] = field(default=None, repr=False)
+    # incremental restyle bookkeeping (see StyleResolver.restyle)
+    style_dirty: bool = field(default=False, repr=False, compare=False)
+    dirty_descendants: bool = field(default=False, repr=False, compare=False)
 
     def __repr__(self) -> str:
         child_tags = [child.tag for child in self.children]
@@ -19,28 +29,187 @@ class Node:
                 f"text='{self.text[:30]}', children={child_tags}, "
                 f"computed_style={self.computed_style})")
 
+    def walk(self) -> Iterator["Node"]:
+        """Yield this node and all descendants in document order, without recursion."""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
+
+    def mark_style_dirty(self) -> None:
+        """Flag this node for restyling and let its ancestors know a descendant needs it."""
+        self.style_dirty = True
+        parent = self.parent
+        while parent is not None and not parent.dirty_descendants:
+            parent.dirty_descendants = True
+            parent = parent.parent
+
+    def mark_subtree_dirty(self) -> None:
+        """Flag a whole (e.g. newly inserted) subtree for restyling."""
+        for node in self.walk():
+            node.style_dirty = True
+            node.dirty_descendants = bool(node.children)
+        self.mark_style_dirty()
+
 
 class HTMLParser:
     """Convert raw HTML into a tree of Node objects."""
 
+    # whitespace-only text next to these is layout indentation and never rendered
+    BLOCK_TAGS = {
+        "html", "head", "body", "title", "meta", "link", "script", "style", "base",
+        "div", "p", "section", "article", "header", "footer", "nav", "main", "aside",
+        "h1", "h2", "h3", "h4", "h5", "h6", "ul", "ol", "li", "dl", "dt", "dd",
+        "table", "thead", "tbody", "tfoot", "tr", "td", "th", "caption",
+        "form", "fieldset", "pre", "blockquote", "figure", "figcaption", "hr", "address",
+    }
+    # elements whose text keeps its whitespace as written (white-space: pre by default)
+    PRESERVE_TAGS = {"pre", "textarea", "listing", "plaintext", "script", "style"}
+    # strings that are markup rather than text
+    _SKIPPED_STRINGS = (Comment, Declaration, Doctype, ProcessingInstruction)
+
+    # CSS white-space characters; a non-breaking space is content, not white space
+    _WHITESPACE = re.compile(r"[ \t\n\r\f]+")
+    _WHITESPACE_ONLY = re.compile(r"^[ \t\n\r\f]*$")
+    _INLINE_WHITE_SPACE = re.compile(r"white-space\s*:\s*([a-z-]+)", re.IGNORECASE)
+
+    @staticmethod
+    def white_space_mode(element: Tag, inherited: str = "normal") -> str:
+        """The element's white-space value: "pre" (kept as is), "pre-line" (newlines kept) or "normal"."""
+        if element.name in HTMLParser.PRESERVE_TAGS:
+            return "pre"
+        style = element.attrs.get("style")
+        if isinstance(style, str):
+            match = HTMLParser._INLINE_WHITE_SPACE.search(style)
+            if match:
+                value = match.group(1).lower()
+                if value in ("pre", "pre-wrap", "break-spaces"):
+                    return "pre"
+                if value == "pre-line":
+                    return "pre-line"
+                if value in ("normal", "nowrap"):
+                    return "normal"
+        return inherited
+
     @staticmethod
-    def bs4_to_node(element: Tag,parent:Optional[Node]=None) -> Node:
-        """Recursively convert BeautifulSoup Tag into Node."""
+    def collapse_whitespace(text: str, mode: str) -> str:
+        if mode == "pre":
+            return text
+        if mode == "pre-line":
+            return "\n".join(HTMLParser._WHITESPACE.sub(" ", line).strip(" ") for line in text.split("\n"))
+        return HTMLParser._WHITESPACE.sub(" ", text)
+
+    @staticmethod
+    def bs4_to_node(element: Tag,parent:Optional[Node]=None, remaining: Optional[List[int]] = None,
+                    white_space: str = "normal") -> Node:
+        """Recursively convert BeautifulSoup Tag into Node.
+
+        Text is built the way it will be laid out: adjacent strings are merged,
+        comments and doctypes are skipped, whitespace collapses according to
+        white-space (kept in <pre> and friends), whitespace-only runs beside
+        block elements are dropped, and the result is NFC-normalized.
+
+        remaining: single-item list holding how many more nodes may be created;
+        children past that budget are dropped.
+        """
         node = Node(tag=element.name or "text", attrs=element.attrs,parent=parent)
+        if remaining is not None:
+            remaining[0] -= 1
+        white_space = HTMLParser.white_space_mode(element, white_space)
+
+        pending: List[str] = []
+        # the start and end of a block element count as block boundaries
+        previous_is_block = node.tag in HTMLParser.BLOCK_TAGS
+
+        def flush(next_is_block: bool) -> None:
+            if not pending:
+                return
+            text = "".join(pending)
+            pending.clear()
+            if white_space != "pre":
+                if HTMLParser._WHITESPACE_ONLY.match(text) and (previous_is_block or next_is_block):
+                    return
+                text = HTMLParser.collapse_whitespace(text, white_space)
+                if previous_is_block:
+                    text = text.lstrip(" ")
+                if next_is_block:
+                    text = text.rstrip(" ")
+            # checked here as well as at the top of the loop, so the flush after the loop stays in budget
+            if text and (remaining is None or remaining[0] > 0):
+                node.children.append(Node(tag="_text", text=unicodedata.normalize("NFC", text), attrs={},parent=node))
+                if remaining is not None:
+                    remaining[0] -= 1
 
         for child in element.children:
+            if remaining is not None and remaining[0] <= 0:
+                break
             if isinstance(child, NavigableString):
-                text = str(child)
-                if text:
-                    node.children.append(Node(tag="_text", text=text, attrs={},parent=node))
+                if not isinstance(child, HTMLParser._SKIPPED_STRINGS):
+                    pending.append(str(child))
             elif isinstance(child, Tag):
-                node.children.append(HTMLParser.bs4_to_node(child,node))
+                is_block = child.name in HTMLParser.BLOCK_TAGS
+                flush(is_block)
+                if remaining is not None and remaining[0] <= 0:
+                    break
+                node.children.append(HTMLParser.bs4_to_node(child,node,remaining,white_space))
+                previous_is_block = is_block
+        flush(node.tag in HTMLParser.BLOCK_TAGS)
         return node
 
+    # attributes BeautifulSoup hands out as lists; tree builders must agree
+    LIST_ATTRS = {"class", "rel", "rev", "headers", "accept-charset", "accesskey", "dropzone"}
+
     @staticmethod
-    def parse_html(html: str) -> Node:
-        """Parse raw HTML into our Node tree."""
+    def from_json_tree(tree: dict, max_nodes: Optional[int] = None) -> Node:
+        """
+        Build Nodes from a browser-computed tree (DynamicFetcher.COMPUTED_TREE_SCRIPT).
+
+        Elements are {"t", "a", "s", "c"} dicts and text nodes plain strings;
+        "s" becomes the node's computed_style as is, so no CSS needs to be
+        parsed or matched. Built iteratively, keeping at most max_nodes nodes.
+        """
+        remaining = max_nodes if max_nodes is not None else -1
+
+        def make(item, parent: Optional[Node]) -> Node:
+            if isinstance(item, str):
+                return Node(tag="_text", attrs={}, text=item, parent=parent)
+            attrs = {
+                name: value.split() if name in HTMLParser.LIST_ATTRS else value
+                for name, value in item.get("a", {}).items()
+            }
+            return Node(tag=item.get("t", "div"), attrs=attrs, computed_style=dict(item.get("s", {})), parent=parent)
+
+        root = make(tree, None)
+        remaining -= 1
+        # pre-order, so a truncated tree keeps the start of the document
+        stack = [(child, root) for child in reversed(tree.get("c", []))]
+        while stack and remaining != 0:
+            item, parent = stack.pop()
+            node = make(item, parent)
+            parent.children.append(node)
+            remaining -= 1
+            if isinstance(item, dict):
+                stack.extend((child, node) for child in reversed(item.get("c", [])))
+
+        if remaining == 0 and stack:
+            logger.warning(f"DOM truncated at {max_nodes} nodes")
+            profiler = Profiler.active()
+            if profiler:
+                profiler.count("dom_truncated")
+        return root
+
+    @staticmethod
+    def parse_html(html: str, max_nodes: Optional[int] = None) -> Node:
+        """Parse raw HTML into our Node tree, keeping at most max_nodes nodes."""
         soup = BeautifulSoup(html, "html.parser")
         root_elem = soup.find("html") or soup
-        return HTMLParser.bs4_to_node(root_elem)
-        
+        remaining = [max_nodes] if max_nodes is not None else None
+        root = HTMLParser.bs4_to_node(root_elem, remaining=remaining)
+
+        if remaining is not None and remaining[0] <= 0:
+            logger.warning(f"DOM truncated at {max_nodes} nodes")
+            profiler = Profiler.active()
+            if profiler:
+                profiler.count("dom_truncated")
+        return root
@@ -0,0 +1,196 @@
+import logging
+import re
+from dataclasses import dataclass
+from typing import Dict, Optional, Set
+
+from .HTMLParser import Node
+from ..Profiling.Profiler import Profiler
+
+logger = logging.getLogger("parser")
+
+
+@dataclass
+class _TextStats:
+    """Text totals for a subtree, gathered bottom-up."""
+    length: int = 0
+    link_length: int = 0
+    commas: int = 0
+    has_block: bool = False
+
+
+class Readability:
+    """
+    Picks the main-content subtree of a page (reader mode).
+
+    Scoring follows the readability heuristics: every paragraph-like node
+    with enough text scores 1 + its commas + one point per 100 characters
+    (max 3), added in full to its parent, half to its grandparent and a
+    sixth (score / (3 * level), level 2) to the next ancestor. Candidates
+    start from a bonus for their tag and class/id names and are finally
+    scaled down by their link density.
+    Subtrees whose class/id looks like chrome (comments, sidebars, cookie
+    banners, related links, ...) are ignored for scoring and removed from
+    the result. When no candidate carries enough text, extract() returns
+    None and the caller should keep the full page.
+    """
+
+    # a paragraph with less text than this doesn't vote
+    MIN_PARAGRAPH_LENGTH = 25
+    # the winning subtree needs at least this much text to be trusted
+    MIN_TEXT_LENGTH = 250
+
+    PARAGRAPH_TAGS = {"p", "pre", "td", "blockquote"}
+    BLOCK_TAGS = {
+        "p", "div", "section", "article", "main", "pre", "blockquote", "table", "ul", "ol", "dl",
+        "h1", "h2", "h3", "h4", "h5", "h6", "figure", "form",
+    }
+    TAG_WEIGHTS = {
+        "article": 10, "main": 10, "div": 5, "section": 3, "pre": 3, "td": 3, "blockquote": 3,
+        "address": -3, "ol": -3, "ul": -3, "dl": -3, "dd": -3, "dt": -3, "li": -3, "form": -3,
+        "h1": -5, "h2": -5, "h3": -5, "h4": -5, "h5": -5, "h6": -5, "th": -5,
+    }
+    # never treated as unlikely, whatever their class says
+    PROTECTED_TAGS = {"html", "body", "article", "main", "a"}
+
+    UNLIKELY = re.compile(
+        r"banner|breadcrumb|combx|comment|community|consent|cookie|disqus|extra|foot|gdpr|header|legends|"
+        r"menu|modal|newsletter|pager|pagination|popup|promo|related|remark|replies|rss|share|shoutbox|"
+        r"sidebar|skyscraper|social|sponsor|subscribe|tweet|widget|yom-remote|\bads?\b|\bad-",
+        re.IGNORECASE,
+    )
+    MAYBE = re.compile(r"and|article|body|column|content|main|shadow", re.IGNORECASE)
+    POSITIVE = re.compile(r"article|body|content|entry|hentry|h-entry|main|page|post|text|blog|story",
+                          re.IGNORECASE)
+    NEGATIVE = re.compile(
+        r"hidden|\bhid\b|banner|combx|comment|com-|contact|foot|footer|footnote|gdpr|masthead|media|meta|"
+        r"outbrain|promo|related|scroll|share|shoutbox|sidebar|skyscraper|sponsor|shopping|tags|tool|widget",
+        re.IGNORECASE,
+    )
+    UNLIKELY_ROLES = {"navigation", "complementary", "banner", "contentinfo", "dialog", "alertdialog", "menu"}
+
+    @staticmethod
+    def _names(node: Node) -> str:
+        classes = node.attrs.get("class", [])
+        if isinstance(classes, (list, tuple)):
+            classes = " ".join(classes)
+        return f"{classes} {node.attrs.get('id', '')}"
+
+    @staticmethod
+    def is_unlikely(node: Node) -> bool:
+        """True for elements that look like page chrome rather than content."""
+        if node.tag == "_text" or node.tag in Readability.PROTECTED_TAGS:
+            return False
+        if node.attrs.get("role") in Readability.UNLIKELY_ROLES or node.attrs.get("aria-hidden") == "true":
+            return True
+        names = Readability._names(node)
+        return bool(Readability.UNLIKELY.search(names)) and not Readability.MAYBE.search(names)
+
+    @staticmethod
+    def class_weight(node: Node) -> int:
+        names = Readability._names(node)
+        weight = 0
+        if Readability.NEGATIVE.search(names):
+            weight -= 25
+        if Readability.POSITIVE.search(names):
+            weight += 25
+        return weight
+
+    @staticmethod
+    def _excluded(root: Node) -> Set[int]:
+        """ids of every node inside an unlikely subtree."""
+        excluded: Set[int] = set()
+        stack = [(root, False)]
+        while stack:
+            node, inside = stack.pop()
+            inside = inside or Readability.is_unlikely(node)
+            if inside:
+                excluded.add(id(node))
+            stack.extend((child, inside) for child in node.children)
+        return excluded
+
+    @staticmethod
+    def text_stats(root: Node, excluded: Set[int]) -> Dict[int, _TextStats]:
+        """Per-node text totals in one post-order pass; excluded subtrees add nothing to their ancestors."""
+        stats: Dict[int, _TextStats] = {}
+        for node in reversed(list(root.walk())):  # reversed pre-order visits children before parents
+            current = _TextStats()
+            if node.tag == "_text":
+                text = node.text.strip()
+                current.length = len(text)
+                current.commas = text.count(",")
+            for child in node.children:
+                if id(child) in excluded:
+                    continue
+                child_stats = stats[id(child)]
+                current.length += child_stats.length
+                current.link_length += child_stats.link_length
+                current.commas += child_stats.commas
+                current.has_block = current.has_block or child_stats.has_block or child.tag in Readability.BLOCK_TAGS
+            if node.tag == "a":
+                current.link_length = current.length
+            stats[id(node)] = current
+        return stats
+
+    @staticmethod
+    def score(root: Node) -> Dict[int, float]:
+        """Content score per candidate node id (after link-density scaling)."""
+        excluded = Readability._excluded(root)
+        stats = Readability.text_stats(root, excluded)
+        scores: Dict[int, float] = {}
+
+        for node in root.walk():
+            if id(node) in excluded:
+                continue
+            node_stats = stats[id(node)]
+            # a div holding only inline content reads as a paragraph
+            is_paragraph = node.tag in Readability.PARAGRAPH_TAGS or (node.tag == "div" and not node_stats.has_block)
+            if not is_paragraph or node_stats.length < Readability.MIN_PARAGRAPH_LENGTH:
+                continue
+
+            content_score = 1 + node_stats.commas + min(node_stats.length // 100, 3)
+            ancestor = node.parent
+            level = 0
+            # only ancestors inside root are candidates (root is usually <body>, not the whole document)
+            while ancestor is not None and ancestor is not root.parent and level < 3:
+                if id(ancestor) not in scores:
+                    scores[id(ancestor)] = Readability.TAG_WEIGHTS.get(ancestor.tag, 0) + Readability.class_weight(ancestor)
+                scores[id(ancestor)] += content_score / (1 if level == 0 else 2 if level == 1 else 3 * level)
+                ancestor = ancestor.parent
+                level += 1
+
+        for node_id in scores:
+            node_stats = stats[node_id]
+            link_density = node_stats.link_length / node_stats.length if node_stats.length else 0
+            scores[node_id] *= 1 - link_density
+        return scores
+
+    @staticmethod
+    def extract(root: Node) -> Optional[Node]:
+        """
+        Return the main-content subtree with unlikely descendants removed,
+        or None when the page has no convincing article (keep the full page then).
+        """
+        scores = Readability.score(root)
+        if not scores:
+            return None
+
+        by_id = {id(node): node for node in root.walk()}
+        best_id = max(scores, key=scores.get)
+        best = by_id[best_id]
+        excluded = Readability._excluded(best)
+        stats = Readability.text_stats(best, excluded)
+        if stats[best_id].length < Readability.MIN_TEXT_LENGTH:
+            logger.info("Reader mode: no main content found, showing the full page")
+            return None
+
+        total_before = len(by_id)
+        for node in list(best.walk()):
+            if any(id(child) in excluded for child in node.children):
+                node.children = [child for child in node.children if id(child) not in excluded]
+        kept = sum(1 for _ in best.walk())
+
+        profiler = Profiler.active()
+        if profiler:
+            profiler.count("reader_nodes_skipped", total_before - kept)
+        logger.info(f"Reader mode: kept <{best.tag}> with {kept} of {total_before} nodes")
+        return best
@@ -0,0 +1,239 @@
+import json
+import mmap
+import struct
+from contextlib import suppress
+from typing import Dict, List, Optional, Tuple, Union
+
+from .HTMLParser import Node
+
+
+Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+
+class Snapshot:
+    """
+    Compact binary form of a styled Node tree.
+
+    Layout (little endian), every section addressed by an offset in the header:
+
+        header        magic "TBSN", version, counts and section offsets
+        strings       u32 end offsets + one UTF-8 blob; tags, attribute
+                      names/values, style properties/values and text are
+                      interned here and referenced by index (0 is "")
+        styles        u32 end offsets into the style pairs; each distinct
+                      computed_style dict is stored once (0 is the empty style)
+        style pairs   (property id, value id)
+        attrs         (name id, value id, is_list)
+        nodes         pre-order (tag, text, first attr, attr count, style, child count)
+        meta          JSON document metadata (url, title, ...)
+
+    loads() builds the whole tree in one pass over the nodes. Each distinct
+    string and style is decoded once, when the first node using it is built
+    (strings no node uses are never decoded). load() maps the file instead
+    of reading it into a bytes object first; the tree keeps no references
+    into the map, which is closed before load() returns.
+    """
+
+    MAGIC = b"TBSN"
+    VERSION = 1
+
+    _HEADER = struct.Struct("<4sHH5I7Q")
+    _NODE = struct.Struct("<6I")
+    _ATTR = struct.Struct("<IIB3x")
+    _PAIR = struct.Struct("<II")
+    _U32 = struct.Struct("<I")
+
+    # ---------- writing ----------
+    @staticmethod
+    def dumps(root: Node, meta: Optional[dict] = None) -> bytes:
+        strings: Dict[str, int] = {"": 0}
+        styles: Dict[Tuple[Tuple[int, int], ...], int] = {(): 0}
+        nodes = bytearray()
+        attrs = bytearray()
+        node_count = attr_count = 0
+
+        def intern(value: str) -> int:
+            index = strings.get(value)
+            if index is None:
+                index = strings[value] = len(strings)
+            return index
+
+        for node in root.walk():
+            first_attr = attr_count
+            for name, value in node.attrs.items():
+                is_list = isinstance(value, (list, tuple))
+                text = " ".join(value) if is_list else str(value)
+                attrs += Snapshot._ATTR.pack(intern(name), intern(text), is_list)
+                attr_count += 1
+
+            key = tuple(sorted((intern(p), intern(v)) for p, v in node.computed_style.items()))
+            style_id = styles.get(key)
+            if style_id is None:
+                style_id = styles[key] = len(styles)
+
+            nodes += Snapshot._NODE.pack(
+                intern(node.tag), intern(node.text), first_attr,
+                attr_count - first_attr, style_id, len(node.children),
+            )
+            node_count += 1
+
+        blob = bytearray()
+        string_ends = bytearray()
+        for value in strings:  # dicts keep insertion order, which is the id order
+            blob += value.encode("utf-8", "surrogatepass")
+            string_ends += Snapshot._U32.pack(len(blob))
+
+        pairs = bytearray()
+        style_ends = bytearray()
+        pair_count = 0
+        for key in styles:
+            for prop_id, value_id in key:
+                pairs += Snapshot._PAIR.pack(prop_id, value_id)
+                pair_count += 1
+            style_ends += Snapshot._U32.pack(pair_count)
+
+        meta_bytes = json.dumps(meta or {}).encode("utf-8")
+
+        sections = [string_ends, blob, style_ends, pairs, attrs, nodes, meta_bytes]
+        offsets = []
+        position = Snapshot._HEADER.size
+        for section in sections:
+            offsets.append(position)
+            position += len(section)
+
+        header = Snapshot._HEADER.pack(
+            Snapshot.MAGIC, Snapshot.VERSION, 0,
+            node_count, len(strings), len(styles), attr_count, pair_count,
+            *offsets,
+        )
+        return b"".join([header, *sections])
+
+    @staticmethod
+    def dump(root: Node, path: str, meta: Optional[dict] = None) -> int:
+        data = Snapshot.dumps(root, meta)
+        with open(path, "wb") as f:
+            f.write(data)
+        return len(data)
+
+    # ---------- reading ----------
+    @staticmethod
+    def _read_header(buffer: Buffer) -> tuple:
+        if len(buffer) < Snapshot._HEADER.size:
+            raise ValueError("Not a snapshot: file too short")
+        header = Snapshot._HEADER.unpack_from(buffer, 0)
+        magic, version = header[0], header[1]
+        if magic != Snapshot.MAGIC:
+            raise ValueError("Not a snapshot: bad magic")
+        if version != Snapshot.VERSION:
+            raise ValueError(f"Unsupported snapshot version {version} (expected {Snapshot.VERSION})")
+        return header
+
+    @staticmethod
+    def meta(buffer: Buffer) -> dict:
+        """Read only the metadata, without building the tree."""
+        header = Snapshot._read_header(buffer)
+        meta_offset = header[-1]
+        return json.loads(bytes(buffer[meta_offset:]).decode("utf-8"))
+
+    @staticmethod
+    def loads(buffer: Buffer) -> Node:
+        """Rebuild the Node tree (with computed styles) from a snapshot buffer."""
+        header = Snapshot._read_header(buffer)
+        view = memoryview(buffer)
+        try:
+            return Snapshot._build(view, header)
+        except (struct.error, IndexError) as e:
+            raise ValueError(f"Corrupt snapshot: {e}") from e
+        finally:
+            # after a failure, slices of the view can still be alive in the traceback
+            # and releasing raises BufferError, which must not replace the real error
+            with suppress(BufferError):
+                view.release()
+
+    @staticmethod
+    def _build(view: memoryview, header: tuple) -> Node:
+        (_, _, _, node_count, string_count, style_count, attr_count, pair_count,
+         string_ends_at, blob_at, style_ends_at, pairs_at, attrs_at, nodes_at, _) = header
+        section_ends = [
+            string_ends_at + 4 * string_count, style_ends_at + 4 * style_count,
+            pairs_at + Snapshot._PAIR.size * pair_count, attrs_at + Snapshot._ATTR.size * attr_count,
+            nodes_at + Snapshot._NODE.size * node_count,
+        ]
+        if max(section_ends) > len(view):
+            raise ValueError(f"Truncated snapshot: {len(view)} bytes, sections end at {max(section_ends)}")
+
+        string_ends = [end for (end,) in Snapshot._U32.iter_unpack(view[string_ends_at:string_ends_at + 4 * string_count])]
+        if string_ends and blob_at + string_ends[-1] > len(view):
+            raise ValueError(f"Truncated snapshot: {len(view)} bytes, strings end at {blob_at + string_ends[-1]}")
+        decoded: List[Optional[str]] = [None] * string_count
+
+        def string(index: int) -> str:
+            value = decoded[index]
+            if value is None:
+                start = string_ends[index - 1] if index else 0
+                value = decoded[index] = str(view[blob_at + start:blob_at + string_ends[index]], "utf-8", "surrogatepass")
+            return value
+
+        style_ends = [end for (end,) in Snapshot._U32.iter_unpack(view[style_ends_at:style_ends_at + 4 * style_count])]
+        pairs = list(Snapshot._PAIR.iter_unpack(view[pairs_at:pairs_at + Snapshot._PAIR.size * pair_count]))
+        style_dicts: List[Optional[Dict[str, str]]] = [None] * style_count
+
+        def style(index: int) -> Dict[str, str]:
+            value = style_dicts[index]
+            if value is None:
+                start = style_ends[index - 1] if index else 0
+                value = style_dicts[index] = {string(p): string(v) for p, v in pairs[start:style_ends[index]]}
+            # every node gets its own dict so later restyling can't leak between nodes
+            return dict(value)
+
+        attrs = list(Snapshot._ATTR.iter_unpack(view[attrs_at:attrs_at + Snapshot._ATTR.size * attr_count]))
+
+        root: Optional[Node] = None
+        # stack of [node, children still to attach]
+        stack: List[list] = []
+        for tag_id, text_id, first_attr, n_attrs, style_id, n_children in Snapshot._NODE.iter_unpack(
+            view[nodes_at:nodes_at + Snapshot._NODE.size * node_count]
+        ):
+            node_attrs: Dict[str, Union[str, List[str]]] = {}
+            for name_id, value_id, is_list in attrs[first_attr:first_attr + n_attrs]:
+                value = string(value_id)
+                node_attrs[string(name_id)] = value.split() if is_list else value
+
+            parent = stack[-1][0] if stack else None
+            node = Node(tag=string(tag_id), attrs=node_attrs, text=string(text_id),
+                        computed_style=style(style_id) if style_id else {}, parent=parent)
+            if parent is None:
+                root = node
+            else:
+                parent.children.append(node)
+                stack[-1][1] -= 1
+
+            if n_children:
+                stack.append([node, n_children])
+            else:
+                while stack and stack[-1][1] == 0:
+                    stack.pop()
+
+        if root is None:
+            raise ValueError("Snapshot contains no nodes")
+        return root
+
+    @staticmethod
+    def load_meta(path: str) -> dict:
+        with open(path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return Snapshot.meta(mapped)
+
+    @staticmethod
+    def load(path: str, use_mmap: bool = True) -> Node:
+        """Load a snapshot file, memory-mapping it by default."""
+        with open(path, "rb") as f:
+            if not use_mmap:
+                return Snapshot.loads(f.read())
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                return Snapshot.loads(mapped)
+            finally:
+                # same as in loads(): if the map is still exported it is unmapped once collected
+                with suppress(BufferError):
+                    mapped.close()
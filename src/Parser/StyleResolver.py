@@ -1,5 +1,11 @@
-from typing import Dict, List, Tuple
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 from .HTMLParser import Node  
+from ..Profiling.Profiler import Profiler
+
+
+# ("id" | "class" | "tag", name): what a simple selector keys on
+SelectorKey = Tuple[str, str]
 
 
 class StyleResolver:
@@ -47,15 +53,54 @@ class StyleResolver:
         return ids * 100 + classes * 10 + tags
         
     @staticmethod
-    def apply_styles(node: Node, css_rules: List[Tuple[str, Dict[str, str]]]) -> None:
-        """Recursively apply CSS rules with specificity and inline style override."""
+    def apply_styles(node: Node, css_rules: List[Tuple[str, Dict[str, str]]],
+                     max_nodes: Optional[int] = None) -> None:
+        """Recursively apply CSS rules with specificity and inline style override.
+
+        max_nodes: style at most this many nodes in document order; later
+        subtrees keep an empty computed_style and render with tag defaults.
+        """
+        profiler = Profiler.active()
+        # [attempts, hits] are only tallied while a profiler is collecting
+        counts = [0, 0] if profiler else None
+        remaining = [max_nodes] if max_nodes is not None else None
+        StyleResolver._apply_styles(node, css_rules, counts, remaining)
+        if profiler:
+            profiler.count("selector_match_attempts", counts[0])
+            profiler.count("selector_match_hits", counts[1])
+            if remaining is not None and remaining[0] <= 0:
+                profiler.count("styling_truncated")
+
+    @staticmethod
+    def _apply_styles(node: Node, css_rules: List[Tuple[str, Dict[str, str]]],
+                      counts: Optional[List[int]] = None,
+                      remaining: Optional[List[int]] = None) -> None:
+        if remaining is not None:
+            if remaining[0] <= 0:
+                return
+            remaining[0] -= 1
+
+        StyleResolver._style_node(node, css_rules, counts)
+    
+        # Recurse for children
+        for child in node.children:
+            StyleResolver._apply_styles(child, css_rules, counts, remaining)
+
+    @staticmethod
+    def _style_node(node: Node, css_rules: Iterable[Tuple[str, Dict[str, str]]],
+                    counts: Optional[List[int]] = None) -> None:
+        """Apply the rules (in cascade order) and the inline style to a single node."""
         applied_specificity: Dict[str, int] = {}
     
         #Apply regular CSS rules (with specificity)
         for selector, props in css_rules:
             selectors = [s.strip() for s in selector.split(",") if s.strip()]
             for sel in selectors:
-                if StyleResolver.match_selector(node, sel):
+                matched = StyleResolver.match_selector(node, sel)
+                if counts is not None:
+                    counts[0] += 1
+                    counts[1] += matched
+                if matched:
                     score = StyleResolver.specificity_score(sel)
                     for prop, value in props.items():
                         current = applied_specificity.get(prop)
@@ -69,7 +114,109 @@ class StyleResolver:
             for prop, value in inline_styles.items():
                 node.computed_style[prop] = value
                 applied_specificity[prop] = 1000  # force to top priority
-    
-        # Recurse for children
-        for child in node.children:
-            StyleResolver.apply_styles(child, css_rules)
\ No newline at end of file
+
+    # ---------- incremental restyle ----------
+    @staticmethod
+    def selector_key(selector: str) -> SelectorKey:
+        """The id, class or tag a simple selector matches on (mirrors match_selector)."""
+        selector = selector.strip()
+        if selector.startswith("#"):
+            return ("id", selector[1:])
+        if selector.startswith("."):
+            return ("class", selector[1:])
+        return ("tag", selector)
+
+    @staticmethod
+    def node_keys(node: Node) -> Set[SelectorKey]:
+        keys = {("tag", node.tag)}
+        if node.attrs.get("id"):
+            keys.add(("id", node.attrs["id"]))
+        classes = node.attrs.get("class", [])
+        if isinstance(classes, str):
+            # match_selector compares the whole string; the split parts are a harmless superset
+            classes = [classes, *classes.split()]
+        keys.update(("class", c) for c in classes)
+        return keys
+
+    @staticmethod
+    def rule_keys(css_rules: Iterable[Tuple[str, Dict[str, str]]]) -> Set[SelectorKey]:
+        return {
+            StyleResolver.selector_key(sel)
+            for selector, _ in css_rules
+            for sel in selector.split(",") if sel.strip()
+        }
+
+    @staticmethod
+    def changed_keys(old_rules: List[Tuple[str, Dict[str, str]]],
+                     new_rules: List[Tuple[str, Dict[str, str]]]) -> Set[SelectorKey]:
+        """Keys of the rules added, removed or edited between two rule lists."""
+        def fingerprint(rule):
+            selector, props = rule
+            return selector, tuple(props.items())
+
+        old = Counter(fingerprint(rule) for rule in old_rules)
+        new = Counter(fingerprint(rule) for rule in new_rules)
+        changed = (old - new) + (new - old)
+        return StyleResolver.rule_keys((selector, dict(props)) for selector, props in changed)
+
+    @staticmethod
+    def mark_dirty(root: Node, keys: Set[SelectorKey]) -> int:
+        """Flag every node whose tag, id or class appears in keys. Returns how many were flagged."""
+        if not keys:
+            return 0
+        flagged = 0
+        for node in root.walk():
+            if not keys.isdisjoint(StyleResolver.node_keys(node)):
+                node.mark_style_dirty()
+                flagged += 1
+        return flagged
+
+    @staticmethod
+    def index_rules(css_rules: List[Tuple[str, Dict[str, str]]]) -> Dict[SelectorKey, List[Tuple[int, int, str, Dict[str, str]]]]:
+        """Map each selector key to its (rule position, part position, selector, props) entries."""
+        index: Dict[SelectorKey, List[Tuple[int, int, str, Dict[str, str]]]] = {}
+        for rule_pos, (selector, props) in enumerate(css_rules):
+            parts = [s.strip() for s in selector.split(",") if s.strip()]
+            for part_pos, sel in enumerate(parts):
+                index.setdefault(StyleResolver.selector_key(sel), []).append((rule_pos, part_pos, sel, props))
+        return index
+
+    @staticmethod
+    def restyle(root: Node, css_rules: List[Tuple[str, Dict[str, str]]]) -> int:
+        """
+        Recompute computed_style for dirty nodes only and clear the dirty flags.
+
+        Only subtrees flagged through dirty_descendants are visited, and each
+        dirty node is only tested against the rules indexed under its own
+        keys, so the cost follows the size of the change rather than the page.
+        Returns the number of nodes restyled.
+        """
+        index = StyleResolver.index_rules(css_rules)
+        restyled = 0
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if node.style_dirty:
+                candidates = sorted(
+                    entry for key in StyleResolver.node_keys(node) for entry in index.get(key, [])
+                )
+                node.computed_style = {}
+                # each candidate is a single simple selector, kept in cascade order
+                StyleResolver._style_node(node, ((sel, props) for _, _, sel, props in candidates))
+                node.style_dirty = False
+                restyled += 1
+            if node.dirty_descendants:
+                stack.extend(node.children)
+                node.dirty_descendants = False
+
+        profiler = Profiler.active()
+        if profiler:
+            profiler.count("nodes_restyled", restyled)
+        return restyled
+
+    @staticmethod
+    def update_styles(root: Node, old_rules: List[Tuple[str, Dict[str, str]]],
+                      new_rules: List[Tuple[str, Dict[str, str]]]) -> int:
+        """Restyle only the nodes affected by a stylesheet change (added, removed or toggled rules)."""
+        StyleResolver.mark_dirty(root, StyleResolver.changed_keys(old_rules, new_rules))
+        return StyleResolver.restyle(root, new_rules)
@@ -0,0 +1,32 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class MemoryBudget:
+    """
+    Limits applied while loading a page. None means unlimited.
+
+    max_body_bytes:   stop reading the response body after this many bytes
+    max_nodes:        stop building the Node tree after this many nodes
+    max_styled_nodes: nodes past this count (in document order) keep no computed style
+    """
+    max_body_bytes: Optional[int] = None
+    max_nodes: Optional[int] = None
+    max_styled_nodes: Optional[int] = None
+
+    # Rough cost of one Node including its attrs/computed_style dicts, the
+    # BeautifulSoup element it came from and the Rich objects made while rendering.
+    NODE_COST_ESTIMATE = 2048
+    # BeautifulSoup and the Node tree together take about this many times the raw HTML size.
+    HTML_EXPANSION_ESTIMATE = 10
+
+    @classmethod
+    def from_memory(cls, limit_bytes: int) -> "MemoryBudget":
+        """Derive byte and node limits from an overall memory budget."""
+        max_nodes = max(limit_bytes // cls.NODE_COST_ESTIMATE, 1)
+        return cls(
+            max_body_bytes=max(limit_bytes // cls.HTML_EXPANSION_ESTIMATE, 1),
+            max_nodes=max_nodes,
+            max_styled_nodes=max_nodes,
+        )
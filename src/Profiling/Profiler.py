@@ -0,0 +1,177 @@
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+
+@dataclass
+class StageTiming:
+    """Accumulated wall and CPU time for one pipeline stage."""
+    name: str
+    wall: float = 0.0
+    cpu: float = 0.0
+    calls: int = 0
+    peak_memory: int = 0  # bytes above the stage's starting allocation, needs track_memory
+
+
+@dataclass
+class ResourceRecord:
+    """One downloaded resource (page, stylesheet, ...)."""
+    url: str
+    bytes: int
+    kind: str = "html"
+
+
+class Profiler:
+    """
+    Collects per-stage timings and counters for one browse() run.
+
+    Instrumented code looks up the active profiler with Profiler.active() and
+    does nothing when it is None, so the hooks cost a single lookup when
+    profiling is off. The active profiler is a context variable: other
+    threads (the prefetcher, for one) start without it and don't pollute the
+    foreground numbers; worker pools that do work for the profiled code run
+    their tasks in a copy of the caller's context.
+
+    With track_memory=True the profiler also runs tracemalloc and reports the
+    peak allocation reached inside each stage. tracemalloc slows Python
+    allocations down noticeably, so it is opt-in.
+
+        with Profiler() as prof:
+            with prof.stage("parse"):
+                ...
+        print(prof.format_text())
+    """
+
+    _active: ContextVar[Optional["Profiler"]] = ContextVar("active_profiler", default=None)
+
+    def __init__(self, track_memory: bool = False) -> None:
+        self.stages: Dict[str, StageTiming] = {}
+        self.counters: Dict[str, int] = {}
+        self.resources: List[ResourceRecord] = []
+        self.track_memory = track_memory
+        self._token: Optional[Token] = None
+        self._started_tracing = False
+        # [allocation at stage start, highest peak seen so far] for each open stage
+        self._memory_stack: List[List[int]] = []
+
+    # ---------- activation ----------
+    @classmethod
+    def active(cls) -> Optional["Profiler"]:
+        """Return the profiler currently collecting data, if any."""
+        return cls._active.get()
+
+    def __enter__(self) -> "Profiler":
+        self._token = Profiler._active.set(self)
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        return self
+
+    def __exit__(self, *exc) -> None:
+        Profiler._active.reset(self._token)
+        self._token = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    # ---------- recording ----------
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageTiming]:
+        """Time a block of work. Nested stages are reported separately."""
+        timing = self.stages.get(name)
+        if timing is None:
+            timing = self.stages[name] = StageTiming(name)
+        tracing = self.track_memory and tracemalloc.is_tracing()
+        if tracing:
+            self._memory_enter()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield timing
+        finally:
+            timing.wall += time.perf_counter() - wall_start
+            timing.cpu += time.process_time() - cpu_start
+            timing.calls += 1
+            if tracing:
+                timing.peak_memory = max(timing.peak_memory, self._memory_exit())
+
+    def _memory_enter(self) -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        # reset_peak() below would lose the enclosing stage's peak, so save it first
+        if self._memory_stack:
+            parent = self._memory_stack[-1]
+            parent[1] = max(parent[1], peak)
+        self._memory_stack.append([current, current])
+        tracemalloc.reset_peak()
+
+    def _memory_exit(self) -> int:
+        _, peak = tracemalloc.get_traced_memory()
+        start, seen = self._memory_stack.pop()
+        peak = max(peak, seen)
+        if self._memory_stack:
+            parent = self._memory_stack[-1]
+            parent[1] = max(parent[1], peak)
+        return peak - start
+
+    def count(self, name: str, amount: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record_resource(self, url: str, nbytes: int, kind: str = "html") -> None:
+        self.resources.append(ResourceRecord(url=url, bytes=nbytes, kind=kind))
+        self.count("bytes_downloaded", nbytes)
+
+    # ---------- output ----------
+    def report(self) -> dict:
+        return {
+            "stages": [
+                {
+                    "name": t.name,
+                    "wall_ms": round(t.wall * 1000, 3),
+                    "cpu_ms": round(t.cpu * 1000, 3),
+                    "calls": t.calls,
+                    **({"peak_memory_bytes": t.peak_memory} if self.track_memory else {}),
+                }
+                for t in self.stages.values()
+            ],
+            "counters": dict(self.counters),
+            "resources": [
+                {"url": r.url, "bytes": r.bytes, "kind": r.kind} for r in self.resources
+            ],
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.report(), indent=2)
+
+    def format_text(self) -> str:
+        header = f"  {'stage':<20} {'wall ms':>10} {'cpu ms':>10} {'calls':>6}"
+        if self.track_memory:
+            header += f" {'peak KiB':>10}"
+        lines = ["Profile", header]
+        for t in self.stages.values():
+            # "fetch.css" is shown indented under "fetch"
+            depth = t.name.count(".")
+            label = "  " * depth + t.name.rsplit(".", 1)[-1]
+            line = f"  {label:<20} {t.wall * 1000:>10.2f} {t.cpu * 1000:>10.2f} {t.calls:>6}"
+            if self.track_memory:
+                line += f" {t.peak_memory / 1024:>10.1f}"
+            lines.append(line)
+
+        if self.counters:
+            lines.append("  counters:")
+            for name, value in self.counters.items():
+                lines.append(f"    {name:<26} {value}")
+
+        attempts = self.counters.get("selector_match_attempts")
+        if attempts:
+            hits = self.counters.get("selector_match_hits", 0)
+            lines.append(f"    {'selector hit rate':<26} {hits / attempts:.1%}")
+
+        if self.resources:
+            lines.append("  resources:")
+            for r in self.resources:
+                lines.append(f"    {r.kind:<5} {r.bytes:>10} B  {r.url}")
+        return "\n".join(lines)
@@ -10,6 +10,7 @@ from rich.syntax import Syntax
 from rich.markdown import Markdown
 
 from ..Parser.HTMLParser import Node
+from .TextIndex import TextIndex
 
 
 class TerminalRenderer:
@@ -33,11 +34,18 @@ class TerminalRenderer:
     LIST_TAGS = {"ul", "ol", "li"}
     FORM_TAGS = {"input", "button", "textarea", "select", "label", "form"}
     TEXT_TAG = "_text"
+
+    # the only computed_style properties to_rich_style reads; CSS for anything else can be pruned
+    STYLE_PROPERTIES = frozenset({"color", "font-weight", "font-style", "text-decoration"})
     
 
-    def __init__(self, force_color: bool = True):
-        self.console = Console(force_terminal=force_color, color_system="truecolor")
+    def __init__(self, force_color: bool = True, console: Optional[Console] = None,
+                 index: Optional[TextIndex] = None):
+        # an explicit console lets callers render into a file or buffer instead of the terminal
+        self.console = console or Console(force_terminal=force_color, color_system="truecolor")
         self.list_depth = 0
+        # filled in as the page is drawn, for in-page search and heading navigation
+        self.index = index
     
     
     # ---------- Core renderer entry ----------
@@ -68,6 +76,8 @@ class TerminalRenderer:
         
         if is_block:
             self.console.print()
+            if self.index is not None:
+                self.index.newline()
 
     # ---------- style conversion ----------
     def to_rich_style(self, node: Node) -> Optional[Style]:
@@ -114,6 +124,10 @@ class TerminalRenderer:
 
         t = Text(text_content.upper(), style=style)
         self.console.print(t, style=Style(bold=True))
+        if self.index is not None:
+            self.index.add_heading(node, level, text_content)
+            self.index.add_text(node, text_content.upper())
+            self.index.newline()
 
     def render_block(self, node: Node, indent: int, parent_style: Optional[Style] = None):
         style = self.to_rich_style(node)
@@ -135,6 +149,8 @@ class TerminalRenderer:
         elif tag == "li":
             bullet = "*" if self.list_depth <= 1 else "-" * (self.list_depth -1)
             self.console.print("  " * indent + f"[bold]{bullet}[/bold] ", end="")
+            if self.index is not None:
+                self.index.advance(2 * indent + len(bullet) + 1)
             for child in node.children:
                 self.render(child, indent, parent_style=style)
 
@@ -150,6 +166,8 @@ class TerminalRenderer:
         if parent_style:
             style = parent_style + style
         self.console.print(Text(node.text, style=style), end="")
+        if self.index is not None:
+            self.index.add_text(node, node.text)
     
     def render_form_element(self, node: Node, indent: int, parent_style: Optional[Style] = None):
         """Render form elements like input, button, textarea, select."""
@@ -169,11 +187,15 @@ class TerminalRenderer:
             display_text = value or placeholder or f"[{input_type} input]"
             text_obj = Text(f"[{display_text}]", style=Style(bgcolor="grey11", color="white"))
             self.console.print(text_obj, end=" ")
+            if self.index is not None:
+                self.index.advance(len(text_obj) + 1)
             
         elif tag == "button":
             button_text = self.extract_text(node) or "Button"
             text_obj = Text(f"[ {button_text} ]", style=Style(bgcolor="blue", color="white", bold=True))
             self.console.print(text_obj, end=" ")
+            if self.index is not None:
+                self.index.add_text(node, text_obj.plain + " ")
             
         elif tag == "textarea":
             placeholder = attrs.get("placeholder", "[textarea]")
@@ -188,6 +210,8 @@ class TerminalRenderer:
             label_text = self.extract_text(node)
             text_obj = Text(label_text, style=Style(bold=True))
             self.console.print(text_obj, end=" ")
+            if self.index is not None:
+                self.index.add_text(node, label_text + " ")
             
         elif tag == "form":
             for child in node.children:
@@ -212,6 +236,8 @@ class TerminalRenderer:
         if node.tag == "code" and (node.parent and node.parent.tag != "pre"):
             highlighted = Syntax(code_text, language, theme="monokai", background_color="default", word_wrap=True)
             self.console.print(highlighted, end="")
+            if self.index is not None:
+                self.index.add_text(node, code_text)
             return
     
         # Block <pre><code>
@@ -220,6 +246,14 @@ class TerminalRenderer:
         panel = Panel(syntax, border_style="cyan", expand=False)
         self.console.print(panel)
         self.console.print()
+        if self.index is not None:
+            # blank line, top border, the code lines (behind a left border), bottom border, blank line
+            self.index.newline(2)
+            for line in code_text.strip("\n").split("\n"):
+                self.index.advance(2)
+                self.index.add_text(node, line)
+                self.index.newline()
+            self.index.newline(2)
 	    
 
     def render_fallback(self, node: Node, indent: int, parent_style: Optional[Style] = None):
@@ -229,10 +263,5 @@ class TerminalRenderer:
 
     # ---------- utils ----------
     def extract_text(self, node: Node) -> str:
-        """Flatten all _text children recursively."""
-        if node.tag == "_text":
-            return node.text or ""
-        combined = []
-        for child in node.children:
-            combined.append(self.extract_text(child))
-        return "".join(combined)
\ No newline at end of file
+        """Flatten all _text descendants in document order (iteratively, so deep trees are fine)."""
+        return "".join(n.text or "" for n in node.walk() if n.tag == self.TEXT_TAG)
\ No newline at end of file
@@ -0,0 +1,167 @@
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from ..Parser.HTMLParser import Node
+
+
+@dataclass
+class Heading:
+    level: int
+    title: str
+    node: Node
+    line: int
+    offset: int
+
+
+@dataclass
+class Match:
+    offset: int  # position in the page text
+    line: int    # approximate rendered line
+    node: Node   # the _text node holding the match
+
+    def __repr__(self) -> str:
+        return f"Match(offset={self.offset}, line={self.line}, node={self.node.tag})"
+
+
+class TextIndex:
+    """
+    Searchable view of a rendered page, filled in by TerminalRenderer as it draws.
+
+    The renderer reports every piece of text it prints, every line break and
+    every heading. The index keeps the page's text as one string with
+    (offset -> node, line) segments, an inverted index from lowercased words
+    to offsets, and the heading outline. Line numbers are approximate: they
+    follow the renderer's line breaks and word-wrap text at the console width
+    the way rich does.
+
+    find(), find_next() and the section lookups are bisects over sorted
+    lists, so they stay fast however long the page is.
+    """
+
+    WORD = re.compile(r"\w+")
+    TOKEN = re.compile(r"\S+\s*|\s+")
+
+    def __init__(self, width: int = 80):
+        self.width = max(width, 1)
+        self.line = 0
+        self.column = 0
+        self.headings: List[Heading] = []
+        self._heading_lines: List[int] = []
+        self.words: Dict[str, List[int]] = {}
+
+        self._chunks: List[str] = []
+        self._length = 0
+        # parallel lists, one entry per text segment (no newlines inside a segment)
+        self._starts: List[int] = []
+        self._nodes: List[Node] = []
+        self._lines: List[int] = []
+        self._text: Optional[str] = None
+
+    # ---------- filled in while rendering ----------
+    def add_text(self, node: Node, text: str) -> None:
+        """Record text printed for node at the current position."""
+        for i, part in enumerate(text.split("\n")):
+            if i:
+                self.newline()
+            if not part:
+                continue
+            for match in self.WORD.finditer(part):
+                self.words.setdefault(match.group().lower(), []).append(self._length + match.start())
+            # greedy word wrap like the console's, one segment per rendered line
+            self._add_segment(node, self._length)
+            for token in self.TOKEN.finditer(part):
+                word = len(token.group().rstrip())
+                if self.column and self.column + word > self.width:
+                    self.line += 1
+                    self.column = 0
+                    self._add_segment(node, self._length + token.start())
+                self.column += len(token.group())
+            self._chunks.append(part)
+            self._length += len(part)
+        self._text = None
+
+    def _add_segment(self, node: Node, start: int) -> None:
+        self._starts.append(start)
+        self._nodes.append(node)
+        self._lines.append(self.line)
+
+    def advance(self, columns: int) -> None:
+        """Account for decoration (bullets, borders) that takes space but isn't page text."""
+        self.column += columns
+
+    def newline(self, count: int = 1) -> None:
+        # a separator keeps words on different lines from running together
+        self._chunks.append("\n")
+        self._length += 1
+        # words longer than the width fold onto extra lines
+        self.line += max(self.column - 1, 0) // self.width + count
+        self.column = 0
+        self._text = None
+
+    def add_heading(self, node: Node, level: int, title: str) -> None:
+        line = self.line
+        self.headings.append(Heading(level, title.strip(), node, line, self._length))
+        self._heading_lines.append(line)
+
+    # ---------- lookups ----------
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = "".join(self._chunks)
+            self._chunks = [self._text]
+        return self._text
+
+    def locate(self, offset: int) -> Match:
+        """The node and approximate line at a text offset."""
+        i = max(bisect_right(self._starts, offset) - 1, 0)
+        return Match(offset, self._lines[i], self._nodes[i])
+
+    def offsets(self, query: str) -> List[int]:
+        """Start offsets of query (case-insensitive), in page order."""
+        query = query.strip()
+        if not query or not self._starts:
+            return []
+        if self.WORD.fullmatch(query):
+            return self.words.get(query.lower(), [])
+        # phrases: scan the page text (offsets stay exact, unlike searching a lowercased copy)
+        return [m.start() for m in re.finditer(re.escape(query), self.text, re.IGNORECASE)]
+
+    def find(self, query: str) -> List[Match]:
+        return [self.locate(offset) for offset in self.offsets(query)]
+
+    def find_next(self, query: str, after_line: int = -1) -> Optional[Match]:
+        """First match on a line after after_line, wrapping around to the top."""
+        offsets = self.offsets(query)
+        if not offsets:
+            return None
+        # lines only grow with the offset, so bisect on the lines of the matches
+        lo, hi = 0, len(offsets)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.locate(offsets[mid]).line <= after_line:
+                lo = mid + 1
+            else:
+                hi = mid
+        return self.locate(offsets[lo % len(offsets)])
+
+    def outline(self) -> List[Heading]:
+        return list(self.headings)
+
+    def section_at(self, line: int) -> Optional[Heading]:
+        """The heading whose section contains line."""
+        i = bisect_right(self._heading_lines, line) - 1
+        return self.headings[i] if i >= 0 else None
+
+    def next_heading(self, line: int) -> Optional[Heading]:
+        i = bisect_right(self._heading_lines, line)
+        return self.headings[i] if i < len(self.headings) else None
+
+    def jump_to(self, title: str) -> Optional[Heading]:
+        """The first heading whose title contains title (case-insensitive)."""
+        title = title.strip().lower()
+        return next((h for h in self.headings if title in h.title.lower()), None)
+
+    def __len__(self) -> int:
+        return self._length
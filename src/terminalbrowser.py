@@ -1,49 +1,311 @@
 from .Parser.HTMLParser import HTMLParser
 from .Parser.HTMLParser import Node 
 from .Parser.CSSParser import CSSParser
+from .Parser.CSSPruner import CSSPruner
+from .Parser.Readability import Readability
 from .Parser.StyleResolver import StyleResolver
+from .Parser.Snapshot import Snapshot
 from .Views.TerminalRenderer import TerminalRenderer
-from .Fetching.FetchURL import Fetcher
-
-import unicodedata
-
-def normalize_texts(node: Node):
-    if node.tag == "_text" and node.text:
-        node.text = unicodedata.normalize("NFC", node.text)
-    for child in node.children:
-        normalize_texts(child)
-
-def browse(url: str):
-	
-    fetcher = Fetcher(mode="auto", prompt_for_dynamic=False)
-    page = fetcher.fetch(url)
-
-    print(f"\n[+] Fetched: {page.url}  (status={page.status_code})")
-    if len(page.html) > 2000:
-        print(f"[i] HTML size: {len(page.html)} chars\n")
-        
-    root = HTMLParser.parse_html(page.html)
+from .Views.TextIndex import TextIndex
+from .Fetching.FetchURL import Fetcher, PageResource
+from .Navigation.PageCache import PageCache
+from .Navigation.Prefetcher import Prefetcher
+from .Profiling.Profiler import Profiler
+from .Profiling.MemoryBudget import MemoryBudget
+
+from contextlib import nullcontext
+from typing import List, Optional, Tuple
+
+
+def browse(url: str, profile: Optional[str] = None, track_memory: bool = False,
+           budget: Optional[MemoryBudget] = None, save_snapshot: Optional[str] = None,
+           reader: bool = True):
+    """
+    Fetch, parse, style and render a page.
+
+    profile: None (off), "text" or "json" - prints a per-stage profile report after rendering.
+    track_memory: include tracemalloc peak memory per stage in the profile.
+    budget: byte/node limits; pages past the budget are truncated instead of loaded in full.
+    save_snapshot: write the styled tree to this file for offline reading (see open_snapshot).
+    reader: style and render only the main article content (falls back to the full page).
+    """
+    profiler = Profiler(track_memory=track_memory) if profile or track_memory else None
+    budget = budget or MemoryBudget()
+
+    with profiler or nullcontext():
+        _browse(url, profiler, budget, save_snapshot, reader)
+
+    if profiler:
+        print()
+        print(profiler.to_json() if profile == "json" else profiler.format_text())
+    return profiler
+
+def _stage(profiler: Optional[Profiler], name: str):
+    return profiler.stage(name) if profiler else nullcontext()
+
+def _browse(url: str, profiler: Optional[Profiler], budget: MemoryBudget, save_snapshot: Optional[str] = None,
+            reader: bool = True):
+    page, dom_tree = load_page(url, profiler, budget, reader=reader)
+    if save_snapshot:
+        with _stage(profiler, "snapshot"):
+            size = Snapshot.dump(dom_tree, save_snapshot, meta={"url": page.url, "title": page.title})
+        print(f"[i] Snapshot saved: {save_snapshot} ({size} bytes)")
+    render_page(dom_tree, profiler)
+
+def open_snapshot(path: str):
+    """Render a page saved with save_snapshot, without fetching, parsing or styling."""
+    meta = Snapshot.load_meta(path)
+    print(f"\n[+] Snapshot: {meta.get('url', path)}")
+    render_page(Snapshot.load(path))
+
+def load_page(url: str, profiler: Optional[Profiler] = None, budget: Optional[MemoryBudget] = None,
+              fetcher: Optional[Fetcher] = None, verbose: bool = True,
+              reader: bool = True, document: Optional[Tuple[str, int, dict]] = None) -> Tuple[PageResource, Node]:
+    """Fetch, parse and style a page. Returns the page and its styled <body> tree
+    (only the main-content subtree when reader is set and one is found).
+    document: the page's HTML already downloaded by a cache revalidation (see Fetcher.fetch)."""
+    budget = budget or MemoryBudget()
+    fetcher = fetcher or Fetcher(mode="auto", prompt_for_dynamic=False, max_body_bytes=budget.max_body_bytes,
+                                 max_nodes=budget.max_nodes)
+    with _stage(profiler, "fetch"):
+        page = fetcher.fetch(url, document=document) if document else fetcher.fetch(url)
+
+    if verbose:
+        print(f"\n[+] Fetched: {page.url}  (status={page.status_code})")
+        if len(page.html) > 2000:
+            print(f"[i] HTML size: {len(page.html)} chars\n")
+    return page, prepare_page(page, profiler, budget, verbose, reader)
+
+def prepare_page(page: PageResource, profiler: Optional[Profiler] = None, budget: Optional[MemoryBudget] = None,
+                 verbose: bool = True, reader: bool = True) -> Node:
+    """Parse and style an already loaded page (fetched, or read from disk by the offline batch renderer)."""
+    budget = budget or MemoryBudget()
+    with _stage(profiler, "parse"):
+        if page.node_tree is not None:
+            # styled by the browser already: no CSS to parse, prune or match
+            root = HTMLParser.from_json_tree(page.node_tree, max_nodes=budget.max_nodes)
+        else:
+            root = HTMLParser.parse_html(page.html, max_nodes=budget.max_nodes)
     body_node = next((child for child in root.children if child.tag == "body"), root)
     dom_tree = body_node  
 
-    css_rules = CSSParser.parse(page.css)
+    if reader:
+        with _stage(profiler, "reader"):
+            dom_tree = Readability.extract(body_node) or body_node
 
-    StyleResolver.apply_styles(dom_tree, css_rules)
-    
-    normalize_texts(dom_tree)
+    if page.node_tree is not None:
+        if profiler:
+            profiler.count("dom_nodes", sum(1 for _ in dom_tree.walk()))
+        return dom_tree
+
+    with _stage(profiler, "css"):
+        css_rules = CSSParser.parse(page.css)
+
+    with _stage(profiler, "prune"):
+        css_rules, prune_stats = CSSPruner.prune(css_rules, dom_tree, TerminalRenderer.STYLE_PROPERTIES)
+    if verbose and prune_stats.rules_removed:
+        print(f"[i] CSS {prune_stats}")
 
+    with _stage(profiler, "style"):
+        StyleResolver.apply_styles(dom_tree, css_rules, max_nodes=budget.max_styled_nodes)
+
+    if profiler:
+        profiler.count("dom_nodes", sum(1 for _ in dom_tree.walk()))
+        profiler.count("css_rules", len(css_rules))
+        profiler.count("css_rules_pruned", prune_stats.rules_removed)
+        profiler.count("css_declarations_pruned", prune_stats.declarations_removed)
+    return dom_tree
+
+def render_page(dom_tree: Node, profiler: Optional[Profiler] = None) -> TextIndex:
+    """Draw the page and return the text index built while drawing it (for find / jump to section)."""
     print("\n\n[+] Rendering page\n")
     renderer = TerminalRenderer()
-    renderer.render(dom_tree)
+    renderer.index = TextIndex(renderer.console.width)
+    with _stage(profiler, "render"):
+        renderer.render(dom_tree)
+    return renderer.index
 
 
-if __name__ == "__main__":
+class Browser:
+    """
+    A browsing session: navigation history plus a cache of styled pages.
+
+    open() reuses a cached page only when HTTP caching allows it (fresh by
+    max-age or confirmed by a conditional request). back() and forward()
+    redisplay the cached tree directly, like a browser's back/forward cache.
+
+    With prefetch=True, likely next links are loaded in the background after
+    each page is shown, so following them renders from the cache.
+    """
+
+    def __init__(self, cache: Optional[PageCache] = None, budget: Optional[MemoryBudget] = None,
+                 prefetch: bool = False, reader: bool = True):
+        self.cache = cache or PageCache()
+        self.budget = budget or MemoryBudget()
+        self.reader = reader
+        self.fetcher = Fetcher(mode="auto", prompt_for_dynamic=False, max_body_bytes=self.budget.max_body_bytes,
+                               max_nodes=self.budget.max_nodes)
+        self.back_stack: List[str] = []
+        self.forward_stack: List[str] = []
+        self.current: Optional[str] = None
+        self.index: Optional[TextIndex] = None  # text index of the page on screen
+        self._prefetch_fetcher = Fetcher(mode="static", prompt_for_dynamic=False,
+                                         max_body_bytes=self.budget.max_body_bytes)
+        self.prefetcher = Prefetcher(self.cache, self._prefetch_load) if prefetch else None
+
+    def _prefetch_load(self, url: str) -> Tuple[PageResource, Node]:
+        # static only: launching a browser in the background would defeat the point
+        return load_page(url, None, self.budget, self._prefetch_fetcher, verbose=False, reader=self.reader)
+
+    def _load(self, url: str, document: Optional[Tuple[str, int, dict]] = None) -> Node:
+        with self.prefetcher.foreground() if self.prefetcher else nullcontext():
+            page, root = load_page(url, Profiler.active(), self.budget, self.fetcher, reader=self.reader,
+                                   document=document)
+        self.cache.put(url, page, root)
+        return root
+
+    def _show(self, root: Node) -> Node:
+        """Render root as the current page."""
+        self.index = render_page(root, Profiler.active())
+        if self.prefetcher:
+            self.prefetcher.schedule(root, self.current)
+        return root
+
+    def open(self, url: str) -> Node:
+        """Navigate to a new URL."""
+        # a stale entry the server says changed comes back as the new document, saving a second request
+        entry, document = self.cache.check(url)
+        root = entry.root if entry else self._load(url, document)
+
+        if self.current is not None and self.current != url:
+            self.back_stack.append(self.current)
+            self.forward_stack.clear()
+        self.current = url
+        return self._show(root)
+
+    def _from_history(self, url: str) -> Node:
+        entry = self.cache.get(url)
+        if entry is None:
+            # evicted (or never cacheable): fall back to a normal load
+            return self._show(self._load(url))
+        print(f"\n[+] From cache: {url}")
+        return self._show(entry.root)
+
+    def back(self) -> Optional[Node]:
+        if not self.back_stack:
+            return None
+        self.forward_stack.append(self.current)
+        self.current = self.back_stack.pop()
+        return self._from_history(self.current)
+
+    def forward(self) -> Optional[Node]:
+        if not self.forward_stack:
+            return None
+        self.back_stack.append(self.current)
+        self.current = self.forward_stack.pop()
+        return self._from_history(self.current)
+
+
+def _snippet(index: TextIndex, offset: int, width: int = 60) -> str:
+    start = max(offset - width // 3, 0)
+    return " ".join(index.text[start:start + width].split())
+
+
+def interactive(browser: Browser, url: Optional[str] = None):
+    """
+    Simple prompt loop: a URL navigates, 'b' goes back, 'f' forward, 'q' quits.
+
+    In-page: '/text' finds text (then 'n' for the next match), 'o' lists the
+    headings and 's text' jumps to the section whose heading contains text.
     """
+    query: Optional[str] = None
+    line = -1  # rendered line of the last match / section shown
+    while True:
+        if url:
+            browser.open(url)
+            query, line = None, -1
+        try:
+            command = input("\nURL, b(ack), f(orward), /find, n(ext), o(utline), s(ection) or q(uit): ").strip()
+        except EOFError:
+            return
+        url = None
+        index = browser.index
+        if command == "q":
+            return
+        elif command == "b":
+            if browser.back() is None:
+                print("[i] No previous page")
+            query, line = None, -1
+        elif command == "f":
+            if browser.forward() is None:
+                print("[i] No next page")
+            query, line = None, -1
+        elif index is not None and (command.startswith("/") or (command == "n" and query)):
+            if command.startswith("/"):
+                query, line = command[1:], -1
+            match = index.find_next(query, line)
+            if match is None:
+                print(f"[i] Not found: {query}")
+            else:
+                line = match.line
+                section = index.section_at(line)
+                where = f" in '{section.title}'" if section else ""
+                print(f"[i] line {match.line}{where}: {_snippet(index, match.offset)}")
+        elif index is not None and command == "o":
+            for heading in index.outline():
+                print(f"{'  ' * (heading.level - 1)}{heading.title}  (line {heading.line})")
+        elif index is not None and command.startswith("s "):
+            heading = index.jump_to(command[2:])
+            if heading is None:
+                print("[i] No such section")
+            else:
+                line = heading.line
+                print(f"[i] line {heading.line}: {heading.title}")
+        elif command:
+            url = command
+
+
+if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser(description="Terminal Browser")
-    parser.add_argument("url", type=str, help="The URL to browse")
+    parser.add_argument("url", type=str, nargs="?", help="The URL to browse")
+    parser.add_argument("--profile", nargs="?", const="text", choices=["text", "json"],
+                        help="print per-stage timings and counters after rendering")
+    parser.add_argument("--memory", action="store_true",
+                        help="report peak memory per stage (tracemalloc, slower)")
+    parser.add_argument("--memory-budget", type=float, metavar="MB",
+                        help="derive byte and node limits from an overall memory budget")
+    parser.add_argument("--max-bytes", type=int, help="stop reading the page after this many bytes")
+    parser.add_argument("--max-nodes", type=int, help="truncate the DOM after this many nodes")
+    parser.add_argument("-i", "--interactive", action="store_true",
+                        help="keep browsing after the first page, with back/forward history")
+    parser.add_argument("--cache-mb", type=float, default=64,
+                        help="memory bound for the back/forward page cache (interactive mode)")
+    parser.add_argument("--save-snapshot", metavar="FILE",
+                        help="save the styled page to FILE for offline reading")
+    parser.add_argument("--snapshot", metavar="FILE",
+                        help="render a saved snapshot instead of fetching a URL")
+    parser.add_argument("--prefetch", action="store_true",
+                        help="load likely next links in the background (interactive mode)")
+    parser.add_argument("--full-page", action="store_true",
+                        help="render the whole page instead of only the main article (reader mode)")
     args = parser.parse_args()
-    """
+
+    budget = MemoryBudget()
+    if args.memory_budget:
+        budget = MemoryBudget.from_memory(int(args.memory_budget * 1024 * 1024))
+    if args.max_bytes is not None:
+        budget.max_body_bytes = args.max_bytes
+    if args.max_nodes is not None:
+        budget.max_nodes = budget.max_styled_nodes = args.max_nodes
     
-    url = str(input("Enter URL: "))
-    browse(url)
+    if args.snapshot:
+        open_snapshot(args.snapshot)
+    elif args.interactive:
+        browser = Browser(PageCache(max_bytes=int(args.cache_mb * 1024 * 1024)), budget,
+                          prefetch=args.prefetch, reader=not args.full_page)
+        interactive(browser, args.url)
+    else:
+        url = args.url or str(input("Enter URL: "))
+        browse(url, profile=args.profile, track_memory=args.memory, budget=budget,
+               save_snapshot=args.save_snapshot, reader=not args.full_page)
@@ -0,0 +1,122 @@
+"""
+test_async_fetcher.py
+
+Unit tests for the asyncio fetcher against a local HTTP server.
+Run with:  pytest -v tests/test_async_fetcher.py
+"""
+
+import asyncio
+import gzip
+import http.server
+import os
+import socketserver
+import sys
+import threading
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.Fetching.AsyncFetcher import AsyncFetcher
+from src.Fetching.FetchURL import StaticFetcher
+from src.Parser.CSSParser import CSSParser
+from src.Profiling.Profiler import Profiler
+
+
+FILES = {
+    "/index.html": '<html><head><title>Home</title><link rel="stylesheet" href="main.css">'
+                   '<link rel="stylesheet" href="main.css">'
+                   '<style>@import "shared.css"; p { color: red; }</style></head>'
+                   '<body><p style="font-weight: bold">x</p></body></html>',
+    "/main.css": "@import 'shared.css';\n@import 'print.css' print;\n.main { color: blue; }",
+    "/shared.css": ".shared { color: green; }",
+    "/print.css": ".printed { color: black; }",
+    # no charset anywhere and an ASCII first 4 KB
+    "/late-utf8.html": "<html><body>" + "<p>plain</p>" * 500 + "<p>café — naïve</p></body></html>",
+}
+REQUESTS = []
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        REQUESTS.append(self.path)
+        body = FILES.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        data = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html" if self.path.endswith(".html") else "text/css")
+        self.send_header("ETag", '"v1"')
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            data = gzip.compress(data)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+async def fetch(*urls, **kwargs):
+    async with AsyncFetcher(mode="static", rate_limit_delay=0, **kwargs) as fetcher:
+        return await fetcher.fetch_all(list(urls))
+
+
+def test_matches_static_fetcher(server):
+    REQUESTS.clear()
+    (page,) = asyncio.run(fetch(server + "/index.html"))
+    assert REQUESTS.count("/shared.css") == 1
+
+    expected = StaticFetcher.fetch_with_css(server + "/index.html", rate_limit_delay=0)
+    assert page.title == expected.title == "Home"
+    assert page.headers["etag"] == '"v1"'
+    assert page.css == expected.css
+    assert [s for s, _ in CSSParser.parse(page.css, viewport_width=800)] == [
+        ".shared", "p", ".shared", ".main", "p",
+    ]
+
+
+def test_errors_become_error_pages(server):
+    pages = asyncio.run(fetch(server + "/index.html", server + "/missing.html"))
+    assert [p.status_code for p in pages] == [200, 500]
+    assert "Error fetching" in pages[1].html
+
+
+def test_rate_limit_is_per_host(server):
+    # three requests to one host wait 2 x 0.2s; the other host doesn't queue behind them
+    async def timed():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        async with AsyncFetcher(mode="static", rate_limit_delay=0.2) as fetcher:
+            await asyncio.gather(*(fetcher._apply_rate_limit(server + "/") for _ in range(3)),
+                                 fetcher._apply_rate_limit("http://other.invalid/"))
+        return loop.time() - start
+
+    assert 0.35 <= asyncio.run(timed()) < 1.0
+
+
+def test_late_non_ascii_and_wire_bytes_match_static_fetcher(server):
+    url = server + "/late-utf8.html"
+    with Profiler() as async_profiler:
+        (page,) = asyncio.run(fetch(url))
+    with Profiler() as sync_profiler:
+        expected = StaticFetcher.fetch_with_css(url, rate_limit_delay=0)
+
+    assert "café — naïve" in page.html and "café — naïve" in expected.html
+    # both count the compressed bytes received, not the decoded body
+    assert async_profiler.counters["bytes_downloaded"] == sync_profiler.counters["bytes_downloaded"]
+    assert async_profiler.counters["bytes_downloaded"] < len(FILES["/late-utf8.html"]) / 5
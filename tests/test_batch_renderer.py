@@ -0,0 +1,215 @@
+"""
+test_batch_renderer.py
+
+Unit tests for offline batch rendering of saved pages and WARC archives.
+Run with:  pytest -v tests/test_batch_renderer.py
+"""
+
+import gzip
+import os
+import sys
+import tracemalloc
+import zlib
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.Offline.BatchRenderer import BatchRenderer, WarcReader, offline_page
+
+
+ARTICLE = "<p>" + "Offline rendering keeps working without a network. " * 8 + "</p>"
+
+
+def warc_record(uri, payload, content_type="application/http; msgtype=response", kind="response"):
+    header = (
+        f"WARC/1.0\r\nWARC-Type: {kind}\r\nWARC-Target-URI: {uri}\r\n"
+        f"Content-Type: {content_type}\r\nContent-Length: {len(payload)}\r\n\r\n"
+    ).encode()
+    return header + payload + b"\r\n\r\n"
+
+
+def http_response(body, content_type, status="200 OK", extra=""):
+    return f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n{extra}\r\n".encode() + body
+
+
+def chunked(body, size=40):
+    parts = [b"%x\r\n%s\r\n" % (len(body[i:i + size]), body[i:i + size]) for i in range(0, len(body), size)]
+    return b"".join(parts) + b"0\r\n\r\n"
+
+
+@pytest.fixture
+def saved_site(tmp_path):
+    site = tmp_path / "site"
+    (site / "css").mkdir(parents=True)
+    (site / "docs").mkdir()
+    (site / "css" / "base.css").write_text("h1 { color: red; }")
+    (site / "css" / "style.css").write_text('@import "base.css";\np { font-weight: bold; }')
+    (site / "index.html").write_text(
+        '<html><head><title>Home</title><link rel="stylesheet" href="css/style.css"></head>'
+        f"<body><h1>Home page</h1>{ARTICLE}</body></html>"
+    )
+    (site / "docs" / "guide.htm").write_bytes(
+        f"<html><body><h1>Guide café</h1>{ARTICLE}</body></html>".encode("latin-1")
+    )
+    return site
+
+
+def test_offline_page_reads_local_stylesheets(saved_site):
+    index = saved_site / "index.html"
+    loaded = []
+
+    def load(url):
+        loaded.append(url)
+        path = url[len("file://"):]
+        return open(path).read() if os.path.exists(path) else ""
+
+    page = offline_page(index.read_text(), index.as_uri(), load)
+    css = page.css["external"]["css/style.css"]
+    assert css.index("color: red") < css.index("font-weight: bold")
+    assert page.title == "Home"
+    assert [url.rsplit("/", 1)[-1] for url in loaded] == ["style.css", "base.css"]
+
+
+def test_directory_batch(saved_site, tmp_path, monkeypatch):
+    # map everything so the mmap path is exercised on small files too
+    monkeypatch.setattr(BatchRenderer, "MMAP_THRESHOLD", 1)
+    out = tmp_path / "out"
+    stats = BatchRenderer(out, workers=1, width=60).run([saved_site])
+
+    assert (stats.documents, stats.failed) == (2, 0)
+    assert "HOME PAGE" in (out / "site" / "index.txt").read_text()
+    assert "GUIDE CAFÉ" in (out / "site" / "docs" / "guide.txt").read_text()
+    manifest = (out / BatchRenderer.MANIFEST).read_text().splitlines()
+    assert len(manifest) == 3 and {"parse", "style", "render"} <= set(stats.stages)
+
+
+def test_output_names_never_collide(tmp_path):
+    for parent in ("a", "b"):
+        (tmp_path / parent / "site").mkdir(parents=True)
+        (tmp_path / parent / "site" / "index.html").write_text(f"<html><body><p>{parent} index</p></body></html>")
+    (tmp_path / "a" / "site" / "index.htm").write_text("<html><body><p>a htm</p></body></html>")
+    (tmp_path / "page.html").write_text("<html><body><p>page html</p></body></html>")
+    (tmp_path / "page.htm").write_text("<html><body><p>page htm</p></body></html>")
+
+    renderer = BatchRenderer(tmp_path / "out", workers=1, reader=False)
+    inputs = [tmp_path / "a" / "site", tmp_path / "b" / "site", tmp_path / "page.html", tmp_path / "page.htm"]
+    jobs, _ = renderer.plan(inputs)
+    outputs = [os.path.relpath(job.output, tmp_path / "out") for job in jobs]
+    assert outputs == [os.path.join("site", "index.txt"), os.path.join("site", "index-1.txt"),
+                       os.path.join("site-1", "index.txt"), "page.txt", "page-1.txt"]
+
+    renderer.run(inputs)
+    assert "b index" in (tmp_path / "out" / "site-1" / "index.txt").read_text()
+    assert "page htm" in (tmp_path / "out" / "page-1.txt").read_text()
+
+
+def test_charset_less_utf8_with_late_non_ascii(tmp_path):
+    # no charset anywhere and the first 4 KiB are ASCII, as on many real pages
+    site = tmp_path / "late"
+    site.mkdir()
+    html = "<html><head><title>t</title></head><body>" + "<p>plain ascii words</p>" * 300
+    html += "<p>café — naïve</p></body></html>"
+    assert html.encode()[:4096].isascii()
+    (site / "page.html").write_bytes(html.encode())
+    archive = tmp_path / "crawl.warc"
+    archive.write_bytes(warc_record("http://example.com/late", http_response(html.encode(), "text/html")))
+
+    out = tmp_path / "out"
+    stats = BatchRenderer(out, workers=1, width=60, reader=False).run([site, archive])
+    assert (stats.documents, stats.failed) == (2, 0)
+    assert "café — naïve" in (out / "late" / "page.txt").read_text(encoding="utf-8")
+    (archived,) = (out / "crawl").iterdir()
+    assert "café — naïve" in archived.read_text(encoding="utf-8")
+
+
+def test_warc_archive_in_process_pool(tmp_path):
+    page = f'<html><head><link rel="stylesheet" href="/s.css"></head><body><h1>Archived</h1>{ARTICLE}</body></html>'
+    records = [
+        warc_record("http://example.com/", http_response(
+            chunked(gzip.compress(page.encode())), "text/html; charset=utf-8",
+            extra="Transfer-Encoding: chunked\r\nContent-Encoding: gzip\r\n")),
+        warc_record("http://example.com/gone", http_response(b"<html>x</html>", "text/html", "404 Not Found")),
+        warc_record("http://example.com/s.css", http_response(b"h1 { color: blue; }", "text/css")),
+        warc_record("http://example.com/second.html", f"<html><body><h1>Second</h1>{ARTICLE}</body></html>".encode(),
+                    content_type="text/html", kind="resource"),
+        warc_record("dns:example.com", b"93.184.216.34", content_type="text/dns", kind="resource"),
+    ]
+    archive = tmp_path / "crawl.warc.gz"
+    archive.write_bytes(b"".join(gzip.compress(record) for record in records))
+
+    with WarcReader(archive) as warc:
+        assert not warc.is_single_stream()
+        found = list(warc.scan())
+        assert [r.uri for r in found] == ["http://example.com/", "http://example.com/s.css",
+                                          "http://example.com/second.html"]
+        assert warc.read(found[1]) == b"h1 { color: blue; }"
+
+    out = tmp_path / "out"
+    stats = BatchRenderer(out, workers=2, width=60).run([archive])
+    assert (stats.documents, stats.failed) == (2, 0)
+    texts = sorted(p.read_text() for p in (out / "crawl").iterdir())
+    assert "ARCHIVED" in texts[0] and "SECOND" in texts[1]
+
+
+def test_whole_file_gzip_is_inflated_once(tmp_path, monkeypatch):
+    records = [
+        warc_record(f"http://example.com/{i}", http_response(
+            f"<html><body><h1>Page {i}</h1>{ARTICLE}</body></html>".encode(), "text/html"))
+        for i in range(3)
+    ]
+    records.append(warc_record("http://example.com/s.css", http_response(b"h1 { color: blue; }", "text/css")))
+    archive = tmp_path / "whole.warc.gz"
+    archive.write_bytes(gzip.compress(b"".join(records)))
+
+    with WarcReader(archive) as warc:
+        assert warc.is_single_stream()
+        assert [uri for uri, _, _ in warc.stream()][-1] == "http://example.com/s.css"
+
+    # nothing may go back to the archive by offset
+    monkeypatch.setattr(WarcReader, "read", lambda self, record: pytest.fail("read by offset"))
+    renderer = BatchRenderer(tmp_path / "out", workers=2, width=60)
+    jobs, stylesheets = renderer.plan([archive])
+    assert len(jobs) == 3 and "color: blue" in stylesheets["http://example.com/s.css"]
+
+    stats = renderer.run([archive])
+    assert (stats.documents, stats.failed) == (3, 0)
+    assert not list((tmp_path / "out").glob(".spool-*"))
+    texts = sorted(p.read_text() for p in (tmp_path / "out" / "whole").iterdir())
+    assert ["PAGE 0" in texts[0], "PAGE 2" in texts[2]] == [True, True]
+
+
+def test_single_stream_archive_planned_one_page_at_a_time(tmp_path, monkeypatch):
+    # incompressible pages, so one inflated chunk is never more than about a page
+    pages = [f"<html><body><h1>Page {i}</h1><p>{os.urandom(32 * 1024).hex()}</p></body></html>".encode()
+             for i in range(40)]
+    archive = tmp_path / "big.warc.gz"
+    archive.write_bytes(gzip.compress(b"".join(
+        warc_record(f"http://example.com/{i}", http_response(page, "text/html")) for i, page in enumerate(pages))))
+    monkeypatch.setattr(WarcReader, "CHUNK_SIZE", 16 * 1024)
+
+    renderer = BatchRenderer(tmp_path / "out", workers=1)
+    tracemalloc.start()
+    try:
+        jobs, _ = renderer.plan([archive])
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert len(jobs) == 40
+    assert all(open(job.path, "rb").read() == page for job, page in zip(jobs, pages))
+    # every page passes through memory, but only a few copies of one at a time
+    assert peak < 10 * len(pages[0]) < sum(map(len, pages)) / 3
+
+
+def test_uncompressed_warc_and_raw_deflate(tmp_path):
+    deflater = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    body = deflater.compress(b"<html><body><p>deflated</p></body></html>") + deflater.flush()
+    archive = tmp_path / "plain.warc"
+    archive.write_bytes(warc_record("http://example.org/", http_response(
+        body, "text/html", extra="Content-Encoding: deflate\r\n")))
+
+    with WarcReader(archive) as warc:
+        (record,) = warc.scan()
+        assert record.member == -1
+        assert warc.read(record) == b"<html><body><p>deflated</p></body></html>"
@@ -0,0 +1,116 @@
+"""
+test_css_imports.py
+
+Unit tests for @import resolution in the fetching layer and @media
+filtering in CSSParser.
+Run with:  pytest -v tests/test_css_imports.py
+"""
+
+import http.server
+import os
+import socketserver
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.Fetching.FetchURL import StaticFetcher
+from src.Parser.CSSParser import CSSParser
+from src.Profiling.Profiler import Profiler
+
+
+FILES = {
+    "/index.html": '<html><head><link rel="stylesheet" href="main.css">'
+                   '<link rel="stylesheet" href="print.css" media="print"></head>'
+                   "<body><p>x</p></body></html>",
+    "/main.css": '@import "base.css";\n@import url(narrow.css) (max-width: 200px);\n'
+                 "@import url('cycle.css');\n.main { color: red; }",
+    "/base.css": "@import 'shared.css';\n.base { color: blue; }",
+    "/shared.css": ".shared { color: green; }",
+    "/narrow.css": "@import 'shared.css';\n.narrow { color: gray; }",
+    "/cycle.css": "@import 'main.css';\n.cycle { font-weight: bold; }",
+    "/print.css": ".printed { color: black; }",
+}
+REQUESTS = []
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        REQUESTS.append(self.path)
+        body = FILES.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html" if self.path.endswith(".html") else "text/css")
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def test_import_chain_resolved_in_cascade_order(server):
+    REQUESTS.clear()
+    page = StaticFetcher.fetch_with_css(server + "/index.html", rate_limit_delay=0)
+    selectors = [s for s, _ in CSSParser.parse(page.css, viewport_width=800)]
+
+    # shared.css is imported twice but fetched once; the cycle back to main.css is cut
+    assert selectors == [".shared", ".base", ".cycle", ".main"]
+    assert REQUESTS.count("/shared.css") == 1
+    assert REQUESTS.count("/main.css") == 1
+
+
+def test_import_media_and_link_media_respected(server):
+    page = StaticFetcher.fetch_with_css(server + "/index.html", rate_limit_delay=0)
+    narrow = [s for s, _ in CSSParser.parse(page.css, viewport_width=160)]
+    assert ".narrow" in narrow
+    assert ".printed" not in narrow
+
+
+def test_import_downloads_reported_to_the_callers_profiler_only(server):
+    with Profiler() as profiler:
+        StaticFetcher.fetch_with_css(server + "/index.html", rate_limit_delay=0)
+        # a background load (like a prefetch) doesn't report to the foreground profiler
+        background = threading.Thread(target=StaticFetcher.fetch_with_css, args=(server + "/index.html",),
+                                      kwargs={"rate_limit_delay": 0})
+        background.start()
+        background.join()
+
+    sheets = sorted(r.url.rsplit("/", 1)[-1] for r in profiler.resources if r.kind == "css")
+    assert sheets == ["base.css", "cycle.css", "main.css", "narrow.css", "print.css", "shared.css"]
+    assert len(profiler.resources) == 7
+
+
+def test_media_blocks_filtered_at_parse_time():
+    css = """
+        p { color: red; }
+        @media print { p { color: black; } }
+        @media screen and (min-width: 600px) {
+            .wide { color: blue; }
+            @media (max-width: 40em) { .mid { color: green; } }
+        }
+        @media not print { .screen { font-weight: bold; } }
+    """
+    assert [s for s, _ in CSSParser.parse(css, viewport_width=620)] == ["p", ".wide", ".mid", ".screen"]
+    assert [s for s, _ in CSSParser.parse(css, viewport_width=800)] == ["p", ".wide", ".screen"]
+    assert [s for s, _ in CSSParser.parse(css, viewport_width=400)] == ["p", ".screen"]
+
+
+def test_media_query_evaluation():
+    assert CSSParser.media_matches("only screen and (max-width: 50em)", 640)
+    assert CSSParser.media_matches("print, (width >= 300px)", 640)
+    assert not CSSParser.media_matches("print", 640)
+    assert not CSSParser.media_matches("(hover: hover)", 640)
+    assert CSSParser.media_matches("not print and (min-width: 1000px)", 640)
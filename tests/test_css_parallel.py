@@ -0,0 +1,46 @@
+"""
+test_css_parallel.py
+
+Unit tests for splitting stylesheets at rule boundaries and parsing them
+across a process pool.
+Run with:  pytest -v tests/test_css_parallel.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.Parser.CSSParser import CSSParser
+
+
+SHEET = "".join(
+    f'.c{i} {{ color: #{i % 10}{i % 10}{i % 10}; content: "}}; /*"; }}\n'
+    f"/* ; }} */ @media (min-width: 1px) {{ .m{i} {{ font-weight: bold; }} .n{i} {{ x: url(a;b) }} }}\n"
+    for i in range(400)
+)
+
+
+def test_split_keeps_whole_rules():
+    chunks = CSSParser.split_top_level(SHEET, 2000)
+    assert len(chunks) > 5
+    assert "".join(chunks) == SHEET
+
+    whole = CSSParser._parse_css_string(SHEET, 800)
+    pieces = [rule for chunk in chunks for rule in CSSParser._parse_css_string(chunk, 800)]
+    assert pieces == whole
+
+
+def test_parallel_matches_serial_in_cascade_order():
+    css = {"inline": [".first { color: red; }"], "external": {"a.css": SHEET, "b.css": ".last { color: blue; }"}}
+    serial = CSSParser.parse(css, viewport_width=800, parallel=False)
+    old_chunk, old_workers = CSSParser.CHUNK_SIZE, CSSParser.MAX_WORKERS
+    try:
+        CSSParser.CHUNK_SIZE, CSSParser.MAX_WORKERS = 4000, 2
+        parallel = CSSParser.parse(css, viewport_width=800, parallel=True)
+        assert CSSParser._pool is not None  # the workers started, no serial fallback
+    finally:
+        CSSParser.CHUNK_SIZE, CSSParser.MAX_WORKERS = old_chunk, old_workers
+        CSSParser.shutdown_pool()
+    assert parallel == serial
+    assert parallel[0][0] == ".first" and parallel[-1][0] == ".last"
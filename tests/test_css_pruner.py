@@ -0,0 +1,72 @@
+"""
+test_css_pruner.py
+
+Unit tests for document-aware CSS pruning.
+Run with:  pytest -v tests/test_css_pruner.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.Parser.CSSPruner import CSSPruner
+from src.Parser.HTMLParser import HTMLParser
+from src.Parser.StyleResolver import StyleResolver
+from src.Views.TerminalRenderer import TerminalRenderer
+
+
+HTML = '<div id="main" class="content wide"><p class="note">hi <a href="#">x</a></p></div>'
+
+
+def test_unmatchable_selectors_removed():
+    root = HTMLParser.parse_html(HTML)
+    rules = [
+        ("p", {"color": "red"}),
+        (".sidebar", {"color": "blue"}),
+        ("#main .note", {"font-weight": "bold"}),
+        ("table td.cell", {"color": "green"}),
+        ("a:hover", {"text-decoration": "underline"}),
+        ("div:not(.sidebar)", {"font-style": "italic"}),
+        ("*", {"color": "black"}),
+    ]
+    kept, stats = CSSPruner.prune(rules, root)
+
+    assert [selector for selector, _ in kept] == ["p", "#main .note", "a:hover", "div:not(.sidebar)", "*"]
+    assert stats.rules_removed == 2
+
+
+def test_selector_lists_are_narrowed():
+    root = HTMLParser.parse_html(HTML)
+    kept, stats = CSSPruner.prune([(".note, .missing, h1", {"color": "red"})], root)
+    assert kept == [(".note", {"color": "red"})]
+    assert stats.selectors_before == 3 and stats.selectors_after == 1
+
+
+def test_property_whitelist():
+    root = HTMLParser.parse_html(HTML)
+    rules = [("p", {"color": "red", "margin": "0", "display": "flex"}), ("div", {"padding": "1em"})]
+    kept, stats = CSSPruner.prune(rules, root, TerminalRenderer.STYLE_PROPERTIES)
+
+    assert kept == [("p", {"color": "red"})]
+    assert stats.declarations_before == 4
+    assert stats.declarations_removed == 3
+
+
+def test_pruning_does_not_change_computed_styles():
+    rules = [
+        ("p", {"color": "red", "margin": "0"}),
+        (".note", {"font-weight": "bold"}),
+        (".nothing", {"color": "blue"}),
+        ("#main", {"font-style": "italic", "display": "block"}),
+    ]
+    full = HTMLParser.parse_html(HTML)
+    StyleResolver.apply_styles(full, rules)
+
+    pruned = HTMLParser.parse_html(HTML)
+    kept, _ = CSSPruner.prune(rules, pruned, TerminalRenderer.STYLE_PROPERTIES)
+    StyleResolver.apply_styles(pruned, kept)
+
+    for a, b in zip(full.walk(), pruned.walk()):
+        expected = {k: v for k, v in a.computed_style.items() if k in TerminalRenderer.STYLE_PROPERTIES}
+        assert b.computed_style == expected
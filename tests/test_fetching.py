@@ -2,7 +2,7 @@
 test_fetching.py
 
 Unit tests for the Fetching Layer of the terminal browser.
-Run with:  pytest -v  (or just python test_fetching.py)
+Run with:  pytest -v tests/test_fetching.py
 """
 
 import os
@@ -14,13 +14,9 @@ import threading
 import textwrap
 import pytest
 
-# Import your fetching code
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-sys.path.append(
-    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
-)
-
-from FetchURL import Fetcher, StaticFetcher, HeuristicsEngine, PageResource
+from src.Fetching.FetchURL import DynamicFetcher, Fetcher, StaticFetcher, HeuristicsEngine, PageResource
 
 # Use a random free port (localhost mini server for testing)
 PORT = 0 # 0 means the OS will pick a random available port
@@ -89,7 +85,7 @@ def test_static_html_and_css_fetch():
         result: PageResource = fetcher.fetch(server.base_url)
 
         assert "<h1>Hello world</h1>" in result.html
-        assert "color: red" in result.css
+        assert "color: red" in result.css["external"]["style.css"]
         assert result.status_code == 200
         assert not result.is_dynamic_render
     finally:
@@ -113,7 +109,7 @@ def test_fetch_css_resolves_relative_urls():
     try:
         res = StaticFetcher.fetch_with_css(server.base_url)
         # URLs in CSS should be converted to absolute
-        assert "http://127.0.0.1" in res.css
+        assert "url(http://127.0.0.1" in res.css["external"]["style.css"]
     finally:
         server.stop()
 
@@ -131,13 +127,12 @@ def test_heuristics_detects_dynamic_html():
 
 def test_heuristics_accepts_static_html():
     """Should classify normal HTML as static"""
-    html = "<html><body><h1>Blog Post</h1><p>Hello</p></body></html>"
+    html = "<html><body><h1>Blog Post</h1><p>Hello</p><p>A second paragraph.</p></body></html>"
     assert not HeuristicsEngine.looks_dynamic(html)
 
 
 @pytest.mark.skipif(
-    not hasattr(__import__("FetchURL"), "DynamicFetcher")
-    or not __import__("FetchURL").DynamicFetcher.is_available(),
+    not DynamicFetcher.is_available(),
     reason="Playwright not installed"
 )
 def test_dynamic_fetch(monkeypatch):
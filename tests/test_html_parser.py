@@ -0,0 +1,79 @@
+"""
+test_html_parser.py
+
+Unit tests for whitespace handling while building the Node tree.
+Run with:  pytest -v tests/test_html_parser.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.Parser.HTMLParser import HTMLParser
+
+
+def texts(root):
+    return [n.text for n in root.walk() if n.tag == "_text"]
+
+
+def test_indentation_between_blocks_dropped():
+    root = HTMLParser.parse_html("<html>\n<body>\n  <div>\n    <p>a</p>\n    <p>b</p>\n  </div>\n</body>\n</html>")
+    assert texts(root) == ["a", "b"]
+
+
+def test_inline_whitespace_collapsed_and_text_merged():
+    root = HTMLParser.parse_html("<p>Hello \n\t <b>big</b>  <!-- note -->  world\n</p>")
+    assert texts(root) == ["Hello ", "big", " world"]
+
+
+def test_pre_and_white_space_style_preserved():
+    root = HTMLParser.parse_html(
+        '<div><pre>  a\n    b</pre><textarea> x  y </textarea>'
+        '<span style="white-space: pre-wrap">p  q</span>'
+        '<p style="white-space:pre-line">one   two\n   three</p></div>'
+    )
+    assert texts(root) == ["  a\n    b", " x  y ", "p  q", "one two\nthree"]
+
+
+def test_text_is_nfc_normalized():
+    root = HTMLParser.parse_html("<p>café</p>")
+    assert texts(root) == ["café"]
+
+
+TREE = {"t": "html", "c": [{"t": "body", "c": [
+    {"t": "p", "a": {"class": "a b", "id": "x"}, "c": ["Hello ", {"t": "b", "s": {"font-weight": "700"}, "c": ["big"]}]},
+    {"t": "a", "a": {"href": "/next"}, "s": {"color": "rgb(0, 0, 238)", "text-decoration": "underline"}, "c": ["link"]},
+]}]}
+
+
+def test_json_tree_keeps_browser_styles():
+    root = HTMLParser.from_json_tree(TREE)
+    body = root.children[0]
+    p, a = body.children
+    assert p.attrs == {"class": ["a", "b"], "id": "x"} and p.parent is body
+    assert [c.tag for c in p.children] == ["_text", "b"]
+    assert p.children[1].computed_style == {"font-weight": "700"}
+    assert a.computed_style["text-decoration"] == "underline"
+    assert texts(root) == ["Hello ", "big", "link"]
+
+
+def test_json_tree_truncated_in_document_order():
+    root = HTMLParser.from_json_tree(TREE, max_nodes=5)
+    assert [n.tag for n in root.walk()] == ["html", "body", "p", "_text", "b"]
+
+
+def test_load_page_skips_css_for_computed_tree():
+    from src.Fetching.FetchURL import PageResource
+    from src.Profiling.Profiler import Profiler
+    from src.terminalbrowser import load_page
+
+    class TreeFetcher:
+        def fetch(self, url):
+            return PageResource(html="", css={"inline": ["p { color: red; }"]}, url=url, node_tree=TREE)
+
+    profiler = Profiler()
+    page, body = load_page("http://example.com/", profiler, fetcher=TreeFetcher(), verbose=False, reader=False)
+    assert body.tag == "body"
+    assert body.children[0].computed_style == {}
+    assert set(profiler.stages) & {"css", "prune", "style"} == set()
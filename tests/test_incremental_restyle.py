@@ -0,0 +1,69 @@
+"""
+test_incremental_restyle.py
+
+Unit tests for dirty-flag restyling after stylesheet changes.
+Run with:  pytest -v tests/test_incremental_restyle.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.Parser.HTMLParser import HTMLParser, Node
+from src.Parser.StyleResolver import StyleResolver
+
+
+HTML = (
+    '<div id="main"><p class="note">one</p><p>two</p>'
+    '<ul><li class="note">three</li><li>four</li></ul></div>'
+)
+
+RULES = [
+    ("p", {"color": "red"}),
+    (".note", {"font-weight": "bold"}),
+    ("#main", {"font-style": "italic"}),
+    ("li, .note", {"color": "blue"}),
+]
+
+
+def styles(root):
+    return [(n.tag, dict(n.computed_style)) for n in root.walk()]
+
+
+def full_restyle(rules):
+    root = HTMLParser.parse_html(HTML)
+    StyleResolver.apply_styles(root, rules)
+    return root
+
+
+def test_update_matches_full_restyle():
+    variants = [
+        RULES + [(".note", {"text-decoration": "underline"})],   # added
+        RULES[1:],                                                # removed
+        [RULES[0], (".note", {"font-weight": "normal"})] + RULES[2:],  # edited
+    ]
+    for new_rules in variants:
+        root = full_restyle(RULES)
+        StyleResolver.update_styles(root, RULES, new_rules)
+        assert styles(root) == styles(full_restyle(new_rules))
+
+
+def test_only_affected_nodes_restyled():
+    root = full_restyle(RULES)
+    new_rules = RULES + [("#main", {"color": "green"})]
+    assert StyleResolver.update_styles(root, RULES, new_rules) == 1
+    assert not any(n.style_dirty or n.dirty_descendants for n in root.walk())
+    assert StyleResolver.update_styles(root, new_rules, new_rules) == 0
+
+
+def test_inserted_subtree_is_styled():
+    root = full_restyle(RULES)
+    ul = next(n for n in root.walk() if n.tag == "ul")
+    li = Node(tag="li", attrs={"class": ["note"]}, parent=ul)
+    li.children.append(Node(tag="_text", attrs={}, text="five", parent=li))
+    ul.children.append(li)
+    li.mark_subtree_dirty()
+
+    assert StyleResolver.restyle(root, RULES) == 2
+    assert li.computed_style == {"font-weight": "bold", "color": "blue"}
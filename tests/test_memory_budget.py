@@ -0,0 +1,77 @@
+"""
+test_memory_budget.py
+
+Unit tests for memory reporting and the page load budget.
+Run with:  pytest -v tests/test_memory_budget.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.Fetching.FetchURL import StaticFetcher
+from src.Parser.HTMLParser import HTMLParser
+from src.Parser.StyleResolver import StyleResolver
+from src.Profiling.MemoryBudget import MemoryBudget
+from src.Profiling.Profiler import Profiler
+
+
+PAGE = "<html><body>" + "".join(f"<p>para {i}</p>" for i in range(50)) + "</body></html>"
+
+
+def test_parse_truncates_after_max_nodes():
+    full = sum(1 for _ in HTMLParser.parse_html(PAGE).walk())
+    truncated = sum(1 for _ in HTMLParser.parse_html(PAGE, max_nodes=20).walk())
+    assert truncated == 20
+    assert full > truncated
+
+
+def test_budget_running_out_on_trailing_text():
+    # html, body, p, b, "bold", then the trailing run is the 6th node
+    page = "<html><body><p><b>bold</b> trailing text</p></body></html>"
+    texts = lambda root: [n.text for n in root.walk() if n.tag == "_text"]
+    assert texts(HTMLParser.parse_html(page, max_nodes=6)) == ["bold", " trailing text"]
+    assert texts(HTMLParser.parse_html(page, max_nodes=5)) == ["bold"]
+    for max_nodes in range(1, 7):
+        assert sum(1 for _ in HTMLParser.parse_html(page, max_nodes=max_nodes).walk()) == max_nodes
+
+
+def test_styling_skips_nodes_past_budget():
+    root = HTMLParser.parse_html(PAGE)
+    StyleResolver.apply_styles(root, [("p", {"color": "red"})], max_nodes=10)
+    styled = [n for n in root.walk() if n.tag == "p" and n.computed_style]
+    unstyled = [n for n in root.walk() if n.tag == "p" and not n.computed_style]
+    assert styled and unstyled
+
+
+def test_read_body_stops_at_max_bytes():
+    class FakeResponse:
+        def iter_content(self, chunk_size):
+            for _ in range(10):
+                yield b"x" * 100
+
+    body, truncated = StaticFetcher._read_body(FakeResponse(), max_bytes=250)
+    assert truncated
+    assert len(body) == 250
+
+    body, truncated = StaticFetcher._read_body(FakeResponse())
+    assert not truncated
+    assert len(body) == 1000
+
+
+def test_profiler_reports_peak_memory_per_stage():
+    with Profiler(track_memory=True) as prof:
+        with prof.stage("outer"):
+            with prof.stage("inner"):
+                blob = [bytes(1024) for _ in range(512)]
+                del blob
+
+    assert prof.stages["inner"].peak_memory >= 512 * 1024
+    assert prof.stages["outer"].peak_memory >= prof.stages["inner"].peak_memory
+
+
+def test_budget_from_memory_derives_limits():
+    budget = MemoryBudget.from_memory(64 * 1024 * 1024)
+    assert budget.max_body_bytes < 64 * 1024 * 1024
+    assert budget.max_nodes == budget.max_styled_nodes > 0
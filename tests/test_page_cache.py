@@ -0,0 +1,188 @@
+"""
+test_page_cache.py
+
+Unit tests for the session page cache and back/forward history.
+Run with:  pytest -v tests/test_page_cache.py
+"""
+
+import http.server
+import os
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.Fetching.FetchURL import PageResource, StaticFetcher
+from src.Navigation.PageCache import PageCache, CachedPage
+from src.Parser.HTMLParser import HTMLParser
+
+
+def make_page(url: str, html: str = "<p>hello</p>", headers: dict = None) -> PageResource:
+    return PageResource(
+        html=html,
+        css={"inline": [], "external": {}, "attribute": []},
+        url=url,
+        headers=headers or {},
+    )
+
+
+def make_entry(cache: PageCache, url: str, html: str = "<p>hello</p>", headers: dict = None):
+    page = make_page(url, html, headers)
+    return cache.put(url, page, HTMLParser.parse_html(html))
+
+
+def test_lru_eviction_respects_memory_bound():
+    sample = make_page("a", "<p>" + "x" * 1000 + "</p>")
+    size = PageCache.estimate_size(sample, HTMLParser.parse_html(sample.html))
+    cache = PageCache(max_bytes=size * 2)
+
+    for url in ("a", "b", "c"):
+        make_entry(cache, url, sample.html)
+        cache.get("a")  # keep "a" recently used
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.total_bytes <= cache.max_bytes
+
+
+def test_no_store_pages_are_not_cached():
+    cache = PageCache()
+    assert make_entry(cache, "a", headers={"cache-control": "no-store"}) is None
+    assert "a" not in cache
+
+
+def test_max_age_freshness():
+    page = make_page("a", headers={"cache-control": "public, max-age=60"})
+    entry = CachedPage(url="a", page=page, root=HTMLParser.parse_html(page.html), size=1)
+    assert entry.is_fresh()
+    assert not entry.is_fresh(now=entry.stored_at + 61)
+
+
+@pytest.fixture
+def served_page():
+    tempdir = tempfile.TemporaryDirectory()
+    with open(os.path.join(tempdir.name, "index.html"), "w") as f:
+        f.write("<html><body><p>cached</p></body></html>")
+
+    class Handler(http.server.SimpleHTTPRequestHandler):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=tempdir.name, **kwargs)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = socketserver.TCPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/index.html", tempdir.name
+    httpd.shutdown()
+    tempdir.cleanup()
+
+
+def test_lookup_revalidates_with_server(served_page):
+    url, root_dir = served_page
+    page = StaticFetcher.fetch_with_css(url, rate_limit_delay=0)
+    assert "last-modified" in page.headers
+
+    cache = PageCache()
+    cache.put(url, page, HTMLParser.parse_html(page.html))
+    assert cache.lookup(url) is not None  # 304 Not Modified
+
+    # touch the file so Last-Modified moves forward and the copy goes stale
+    future = time.time() + 3600
+    os.utime(os.path.join(root_dir, "index.html"), (future, future))
+    assert cache.lookup(url) is None
+    assert url not in cache
+
+
+def test_changed_page_is_returned_by_revalidation(served_page, monkeypatch):
+    url, root_dir = served_page
+    page = StaticFetcher.fetch_with_css(url, rate_limit_delay=0)
+    cache = PageCache(rate_limit_delay=0.25)
+    cache.put(url, page, HTMLParser.parse_html(page.html))
+
+    delays = []
+    monkeypatch.setattr(StaticFetcher, "_apply_rate_limit", classmethod(lambda cls, delay: delays.append(delay)))
+    with open(os.path.join(root_dir, "index.html"), "w") as f:
+        f.write("<html><body><p>changed</p></body></html>")
+    future = time.time() + 3600
+    os.utime(os.path.join(root_dir, "index.html"), (future, future))
+
+    entry, document = cache.check(url)
+    assert entry is None and delays == [0.25]
+    html, status, headers = document
+    assert "changed" in html and status == 200 and "last-modified" in headers
+
+    # the stylesheets are fetched, the document is not downloaded again
+    delays.clear()
+    assert "changed" in StaticFetcher.fetch_with_css(url, rate_limit_delay=0, document=document).html
+    assert delays == []
+
+
+def test_prefetch_candidates_ranked():
+    from src.Navigation.Prefetcher import Prefetcher
+
+    root = HTMLParser.parse_html("""
+        <div><a href="/menu">menu</a></div>
+        <article><p>See <a href="/story">story</a>
+          and <a href="https://other.example/x">elsewhere</a></p></article>
+        <a rel="next" href="/page/2">next</a>
+        <a href="#top">top</a>
+    """)
+    links = Prefetcher.candidate_links(root, "https://site.example/page/1", limit=5)
+    assert links == [
+        "https://site.example/page/2",
+        "https://site.example/story",
+        "https://site.example/menu",
+    ]
+
+
+def test_prefetcher_fills_cache():
+    from src.Navigation.Prefetcher import Prefetcher
+
+    loaded = []
+
+    def load(url):
+        loaded.append(url)
+        return make_page(url), HTMLParser.parse_html("<p>prefetched</p>")
+
+    cache = PageCache()
+    prefetcher = Prefetcher(cache, load, host_delay=0, max_bytes_per_second=0)
+    root = HTMLParser.parse_html('<p><a href="/a">a</a> <a href="/b">b</a></p>')
+    prefetcher.schedule(root, "https://site.example/")
+
+    deadline = time.time() + 5
+    while len(prefetcher.prefetched) < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    prefetcher.stop()
+
+    assert sorted(loaded) == ["https://site.example/a", "https://site.example/b"]
+    entry = cache.lookup("https://site.example/a")
+    assert entry is not None and entry.prefetched
+
+
+def test_background_requests_yield_rate_limit_slots():
+    order = []
+
+    def background():
+        with StaticFetcher.background_requests():
+            StaticFetcher._apply_rate_limit(0.3)
+        order.append(("background", time.time()))
+
+    StaticFetcher._apply_rate_limit(0)  # a request just went out
+    worker = threading.Thread(target=background)
+    worker.start()
+    time.sleep(0.05)  # the background request is now waiting for its slot
+    StaticFetcher._apply_rate_limit(0.3)
+    order.append(("foreground", time.time()))
+    worker.join()
+
+    assert [name for name, _ in order] == ["foreground", "background"]
+    # still rate-limited: the background request waits a full delay after the foreground one
+    assert order[1][1] - order[0][1] >= 0.29
@@ -0,0 +1,57 @@
+"""
+test_profiler.py
+
+Unit tests for the pipeline profiler.
+Run with:  pytest -v tests/test_profiler.py
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.Profiling.Profiler import Profiler
+from src.Parser.HTMLParser import HTMLParser
+from src.Parser.StyleResolver import StyleResolver
+
+
+def test_profiler_is_only_active_inside_context():
+    assert Profiler.active() is None
+    with Profiler() as prof:
+        assert Profiler.active() is prof
+    assert Profiler.active() is None
+
+
+def test_stage_records_wall_and_cpu_time():
+    prof = Profiler()
+    for _ in range(2):
+        with prof.stage("parse"):
+            sum(range(10000))
+
+    timing = prof.stages["parse"]
+    assert timing.calls == 2
+    assert timing.wall > 0
+    assert timing.cpu >= 0
+
+
+def test_selector_counters_collected_when_profiling():
+    root = HTMLParser.parse_html('<p class="note">hi</p><div>x</div>')
+    rules = [(".note", {"color": "red"}), ("div", {"font-weight": "bold"})]
+
+    with Profiler() as prof:
+        StyleResolver.apply_styles(root, rules)
+
+    assert prof.counters["selector_match_hits"] == 2
+    assert prof.counters["selector_match_attempts"] > prof.counters["selector_match_hits"]
+
+
+def test_json_report_round_trips():
+    prof = Profiler()
+    with prof.stage("fetch"):
+        prof.record_resource("http://example.com/", 1234)
+    report = json.loads(prof.to_json())
+
+    assert report["stages"][0]["name"] == "fetch"
+    assert report["resources"] == [{"url": "http://example.com/", "bytes": 1234, "kind": "html"}]
+    assert report["counters"]["bytes_downloaded"] == 1234
@@ -0,0 +1,56 @@
+"""
+test_readability.py
+
+Unit tests for reader-mode main-content extraction.
+Run with:  pytest -v tests/test_readability.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.Parser.HTMLParser import HTMLParser
+from src.Parser.Readability import Readability
+
+
+PARAGRAPH = "<p>" + "The council met on Tuesday, and after a long debate, approved the budget. " * 3 + "</p>"
+LINKS = "".join(f'<li><a href="/story/{i}">Related story number {i} with a headline</a></li>' for i in range(12))
+
+NEWS = (
+    "<html><body>"
+    '<div class="cookie-banner"><p>We use cookies to improve your experience, please accept them all.</p></div>'
+    f'<div class="layout"><div id="story" class="article-body">{PARAGRAPH * 5}'
+    '<div class="comments"><p>First comment, which is quite long and says nothing at all really.</p></div>'
+    "</div>"
+    f'<div class="sidebar"><ul>{LINKS}</ul></div>'
+    f'<div class="related-grid"><ul>{LINKS}</ul></div></div>'
+    "</body></html>"
+)
+
+
+def body_of(html):
+    root = HTMLParser.parse_html(html)
+    return next(child for child in root.children if child.tag == "body")
+
+
+def test_article_selected_and_chrome_removed():
+    body = body_of(NEWS)
+    total = sum(1 for _ in body.walk())
+    article = Readability.extract(body)
+
+    assert article is not None and article.attrs.get("id") == "story"
+    kept = list(article.walk())
+    assert not any("comments" in n.attrs.get("class", []) for n in kept)
+    assert sum(1 for n in kept if n.tag == "p") == 5
+    assert len(kept) * 3 < total
+
+
+def test_short_page_falls_back_to_full_page():
+    assert Readability.extract(body_of("<html><body><p>Just a short note.</p></body></html>")) is None
+
+
+def test_paragraphs_directly_in_body():
+    # ancestors above the subtree being scored (here <html>) are never candidates
+    body = body_of(f"<html><body><h1>Title</h1>{PARAGRAPH * 3}</body></html>")
+    assert Readability.extract(body) is body
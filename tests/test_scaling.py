@@ -0,0 +1,52 @@
+"""
+test_scaling.py
+
+Checks for the synthetic document generator and the scaling harness.
+Run with:  pytest -v tests/test_scaling.py
+"""
+
+import os
+import sys
+from dataclasses import replace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.Benchmarks.SyntheticPage import SyntheticPage, SyntheticSpec
+from src.Benchmarks.ScalingHarness import ScalingHarness, count_nodes, fit_exponent
+from src.Parser.HTMLParser import HTMLParser
+
+
+def test_generator_is_deterministic():
+    spec = SyntheticSpec(depth=3, width=3, seed=7)
+    assert SyntheticPage.generate_html(spec) == SyntheticPage.generate_html(spec)
+    assert SyntheticPage.generate_css(spec) == SyntheticPage.generate_css(spec)
+
+
+def test_generator_respects_shape():
+    spec = SyntheticSpec(depth=3, width=3, rule_count=17)
+    root = HTMLParser.parse_html(SyntheticPage.generate_html(spec))
+    body = next(child for child in root.children if child.tag == "body")
+
+    elements = count_nodes(body) - 1
+    text_nodes = spec.width ** spec.depth  # one text node per leaf
+    assert elements == spec.element_count + text_nodes
+    assert len(SyntheticPage.generate_css(spec).splitlines()) == 17
+
+
+def test_fit_exponent_recovers_power_law():
+    sizes = [10, 20, 40, 80]
+    assert abs(fit_exponent(sizes, [s * 3.0 for s in sizes]) - 1.0) < 1e-9
+    assert abs(fit_exponent(sizes, [s ** 2 for s in sizes]) - 2.0) < 1e-9
+
+
+def test_style_resolution_is_near_linear_in_nodes():
+    # calls made while styling, not wall time: the same on any machine, however loaded,
+    # and unlike the selector counters they grow with any extra work done per node
+    base = SyntheticSpec(depth=3, rule_count=40)
+    (small_nodes, _, small), (large_nodes, _, large) = (
+        ScalingHarness.count_work(replace(base, width=w)) for w in (4, 9)
+    )
+    node_growth = large_nodes / small_nodes
+    call_growth = large["function_calls"] / small["function_calls"]
+    assert node_growth > 5
+    assert call_growth <= 1.1 * node_growth, (node_growth, call_growth)
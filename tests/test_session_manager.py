@@ -0,0 +1,85 @@
+"""
+test_session_manager.py
+
+Unit tests for per-thread sessions sharing pooled connections.
+Run with:  pytest -v tests/test_session_manager.py
+"""
+
+import http.server
+import os
+import socketserver
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.Fetching.SessionManager import SessionManager
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def test_each_thread_gets_its_own_session_with_shared_adapters_and_cookies():
+    manager = SessionManager()
+    manager.session().cookies.set("token", "abc", domain="example.com")
+    barrier = threading.Barrier(3)
+
+    def session(_):
+        barrier.wait()  # all three threads alive at once, so none reuses another's thread
+        return manager.session()
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        sessions = list(pool.map(session, range(3)))
+    assert manager.session() is manager.session()
+    assert len({id(s) for s in sessions} | {id(manager.session())}) == 4
+    assert len({id(s.get_adapter("https://example.com/")) for s in sessions + [manager.session()]}) == 1
+    assert all(s.cookies.get("token", domain="example.com") == "abc" for s in sessions)
+
+
+def test_connections_reused_across_threads(server):
+    manager = SessionManager(pool_maxsize=2)
+
+    def get(i):
+        return manager.session().get(f"{server}/{i}").status_code
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        assert set(pool.map(get, range(20))) == {200}
+
+    stats = manager.stats()
+    # both threads' sessions went through the one pool for this host
+    assert len(stats.pools) == 1
+    assert stats.requests == 20
+    assert stats.connections <= 2
+    assert stats.reuse_ratio >= 0.8
+    manager.close()
+
+
+def test_host_pool_size_override(server):
+    manager = SessionManager(host_pool_sizes={server.split("//")[1]: 7})
+    adapter = manager.session().get_adapter(server + "/")
+    assert adapter._pool_maxsize == 7
+    assert manager.session().get_adapter("http://example.com/")._pool_maxsize == 10
@@ -0,0 +1,109 @@
+"""
+test_single_flight.py
+
+Unit tests for coalescing concurrent requests for the same URL.
+Run with:  pytest -v tests/test_single_flight.py
+"""
+
+import http.server
+import os
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.Fetching.FetchURL import PageSheets, StaticFetcher
+from src.Fetching.SingleFlight import SingleFlight, normalize_url
+
+
+REQUESTS = []
+
+
+class SlowHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        REQUESTS.append(self.path)
+        time.sleep(0.3)
+        body = b".a { color: red; }" if self.path.endswith(".css") else b"<html><body><p>x</p></body></html>"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = socketserver.ThreadingTCPServer(("127.0.0.1", 0), SlowHandler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def test_normalize_url():
+    assert normalize_url("HTTP://Example.COM:80/a?b=1#frag") == "http://example.com/a?b=1"
+    assert normalize_url("https://example.com:443") == "https://example.com/"
+    assert normalize_url("https://example.com:8443/x") == "https://example.com:8443/x"
+    assert normalize_url("https://example.com/A") != normalize_url("https://example.com/a")
+
+
+def test_concurrent_calls_share_one_result():
+    flight = SingleFlight()
+    calls = []
+
+    def work():
+        calls.append(1)
+        time.sleep(0.2)
+        return "done"
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        results = list(pool.map(lambda _: flight.do("k", work), range(5)))
+
+    assert len(calls) == 1
+    assert [r for r, _ in results] == ["done"] * 5
+    assert sum(shared for _, shared in results) == flight.coalesced_hits == 4
+    # nothing is cached once the call has finished
+    assert flight.do("k", work) == ("done", False) and len(calls) == 2
+
+
+def test_errors_reach_every_waiter():
+    flight = SingleFlight()
+
+    def fail():
+        time.sleep(0.1)
+        raise ValueError("boom")
+
+    def call(_):
+        try:
+            flight.do("k", fail)
+        except ValueError as e:
+            return str(e)
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        assert list(pool.map(call, range(3))) == ["boom"] * 3
+
+
+def test_static_fetcher_coalesces_pages_and_css(server):
+    REQUESTS.clear()
+    urls = [server + "/page.html", server.replace("http://", "HTTP://") + "/page.html#top"]
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        pages = list(pool.map(lambda u: StaticFetcher._fetch_document(u, rate_limit_delay=0), urls))
+    assert pages[0][0] == pages[1][0]
+    assert REQUESTS.count("/page.html") == 1
+
+    page_sheets = PageSheets()
+    fetch = lambda _: StaticFetcher.fetch_css(server, "/s.css", rate_limit_delay=0, sheets=page_sheets)
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        sheets = list(pool.map(fetch, range(3)))
+    # repeats get the content, not an empty string
+    assert sheets == [".a { color: red; }"] * 3
+    assert StaticFetcher.fetch_css(server, "s.css", rate_limit_delay=0, sheets=page_sheets) == ".a { color: red; }"
+    assert REQUESTS.count("/s.css") == 1
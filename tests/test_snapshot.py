@@ -0,0 +1,95 @@
+"""
+test_snapshot.py
+
+Unit tests for the binary snapshot format of styled Node trees.
+Run with:  pytest -v tests/test_snapshot.py
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.Parser.HTMLParser import HTMLParser
+from src.Parser.Snapshot import Snapshot
+from src.Parser.StyleResolver import StyleResolver
+
+
+HTML = """
+<html><body>
+  <h1 id="title" class="big main">Héllo ✓</h1>
+  <p class="note" style="font-style: italic">first <a href="/x" rel="next">link</a></p>
+  <p class="note">second</p>
+</body></html>
+"""
+RULES = [("p", {"color": "red"}), (".note", {"font-weight": "bold"}), ("#title", {"color": "blue"})]
+
+
+def styled_tree():
+    root = HTMLParser.parse_html(HTML)
+    StyleResolver.apply_styles(root, RULES)
+    return root
+
+
+def flatten(root):
+    return [
+        (n.tag, n.text, dict(n.attrs), dict(n.computed_style), len(n.children),
+         n.parent.tag if n.parent else None)
+        for n in root.walk()
+    ]
+
+
+def test_round_trip_preserves_tree():
+    root = styled_tree()
+    loaded = Snapshot.loads(Snapshot.dumps(root))
+    assert flatten(loaded) == flatten(root)
+
+
+def test_identical_styles_are_stored_once():
+    root = styled_tree()
+    data = Snapshot.dumps(root)
+    header = Snapshot._read_header(data)
+    style_count = header[5]
+    distinct = {tuple(sorted(n.computed_style.items())) for n in root.walk()}
+    assert style_count == len(distinct)
+
+
+def test_loaded_styles_are_independent():
+    loaded = Snapshot.loads(Snapshot.dumps(styled_tree()))
+    notes = [n for n in loaded.walk() if n.tag == "p"]
+    notes[1].computed_style["color"] = "green"
+    assert notes[0].computed_style["color"] == "red"
+
+
+def test_file_load_with_and_without_mmap(tmp_path):
+    root = styled_tree()
+    path = str(tmp_path / "page.tbsn")
+    Snapshot.dump(root, path, meta={"url": "https://example.com/"})
+
+    assert flatten(Snapshot.load(path)) == flatten(root)
+    assert flatten(Snapshot.load(path, use_mmap=False)) == flatten(root)
+    assert Snapshot.load_meta(path) == {"url": "https://example.com/"}
+
+
+def test_rejects_other_files_and_versions():
+    with pytest.raises(ValueError):
+        Snapshot.loads(b"<html>" * 20)
+
+    data = bytearray(Snapshot.dumps(styled_tree()))
+    data[4] = Snapshot.VERSION + 1
+    with pytest.raises(ValueError, match="version"):
+        Snapshot.loads(bytes(data))
+
+
+@pytest.mark.parametrize("use_mmap", [True, False])
+def test_truncated_snapshot_raises_value_error(tmp_path, use_mmap):
+    data = Snapshot.dumps(styled_tree(), meta={"url": "https://example.com/"})
+    path = tmp_path / "page.tbsn"
+    meta_at = Snapshot._HEADER.unpack_from(data, 0)[-1]
+    # cut inside the nodes section and inside the string blob
+    for cut in (meta_at - 10, Snapshot._HEADER.size + 40):
+        path.write_bytes(data[:cut])
+        with pytest.raises(ValueError, match="Truncated"):
+            Snapshot.load(str(path), use_mmap=use_mmap)
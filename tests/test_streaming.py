@@ -0,0 +1,116 @@
+"""
+test_streaming.py
+
+Unit tests for streamed response reading in the fetching layer.
+Run with:  pytest -v tests/test_streaming.py
+"""
+
+import gzip
+import http.server
+import os
+import socketserver
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.Fetching.FetchURL import BodyReader, StaticFetcher
+
+
+LATIN1_PAGE = (
+    '<html><head><meta charset="iso-8859-1"></head>'
+    "<body><p>café crème</p>" + "<p>filler</p>" * 20000 + "</body></html>"
+).encode("latin-1")
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/latin1":
+            body, headers = LATIN1_PAGE, {"Content-Type": "text/html"}
+        elif self.path == "/gzip":
+            Handler.seen_accept_encoding = self.headers.get("Accept-Encoding", "")
+            body = gzip.compress(b"<html><body>" + b"<p>same text</p>" * 5000 + b"</body></html>")
+            headers = {"Content-Type": "text/html; charset=utf-8", "Content-Encoding": "gzip"}
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def test_charset_detected_from_meta_in_prefix(server):
+    html, status = StaticFetcher.fetch(server + "/latin1", rate_limit_delay=0)
+    assert status == 200
+    assert "café crème" in html
+
+
+def test_stream_yields_chunks_as_they_arrive(server):
+    chunks = list(StaticFetcher.stream(server + "/latin1", rate_limit_delay=0))
+    assert len(chunks) > 1
+    assert "".join(chunks).startswith("<html>")
+
+
+def test_max_bytes_cuts_body(server):
+    html, _ = StaticFetcher.fetch(server + "/latin1", rate_limit_delay=0, max_bytes=100)
+    assert len(html) == 100
+
+
+def test_compressed_response_decoded_and_counted_on_wire(server):
+    from src.Profiling.Profiler import Profiler
+
+    with Profiler() as prof:
+        html, _ = StaticFetcher.fetch(server + "/gzip", rate_limit_delay=0)
+
+    assert "gzip" in Handler.seen_accept_encoding
+    assert html.count("same text") == 5000
+    assert prof.resources[0].bytes < len(html.encode()) / 10
+
+
+def test_detect_encoding_order():
+    class Response:
+        headers = {"content-type": "text/html; charset=windows-1252"}
+
+    assert BodyReader(Response()).detect_encoding(b'<meta charset="utf-8">') == "cp1252"
+
+    Response.headers = {"content-type": "text/css"}
+    assert BodyReader(Response()).detect_encoding(b'@charset "iso-8859-2";') == "iso8859-2"
+    assert BodyReader(Response()).detect_encoding(b"\xef\xbb\xbfbody{}") == "utf-8-sig"
+
+
+def test_ascii_prefix_does_not_decide_the_charset():
+    body = ("<html><head><title>t</title></head><body>" + "<p>plain</p>" * 500
+            + "<p>café — naïve</p></body></html>").encode()
+    assert body[:BodyReader.PREFIX_BYTES].isascii()
+
+    class Response:
+        headers = {"content-type": "text/html"}
+
+        def iter_content(self, chunk_size):
+            for i in range(0, len(body), 1024):
+                yield body[i:i + 1024]
+
+    reader = BodyReader(Response())
+    assert "café — naïve" in reader.read_text()
+    assert reader.encoding == "utf-8"
+
+    # a BOM wins over the charset in Content-Type
+    Response.headers = {"content-type": "text/html; charset=windows-1252"}
+    assert BodyReader(Response()).detect_encoding(b"\xef\xbb\xbf<p>caf\xc3\xa9</p>") == "utf-8-sig"
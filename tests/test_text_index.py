@@ -0,0 +1,69 @@
+"""
+test_text_index.py
+
+Unit tests for the text index built while rendering.
+Run with:  pytest -v tests/test_text_index.py
+"""
+
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from rich.console import Console
+
+from src.Parser.HTMLParser import HTMLParser, Node
+from src.Views.TerminalRenderer import TerminalRenderer
+from src.Views.TextIndex import TextIndex
+
+
+def render(html, width=40):
+    root = HTMLParser.parse_html(html)
+    body = next(child for child in root.children if child.tag == "body")
+    buffer = io.StringIO()
+    renderer = TerminalRenderer(console=Console(file=buffer, width=width, color_system=None),
+                                index=TextIndex(width))
+    renderer.render(body)
+    return renderer.index, buffer.getvalue().split("\n")
+
+
+PAGE = (
+    "<html><body><h1>Intro</h1><p>The quick brown fox.</p>"
+    "<h2>Details</h2><p>" + "filler words here " * 10 + "and a fox again.</p>"
+    "<h2>End</h2><p>Last <b>fox</b> standing.</p></body></html>"
+)
+
+
+def test_find_maps_to_nodes_and_rendered_lines():
+    index, lines = render(PAGE)
+    matches = index.find("fox")
+    assert [m.node.text for m in matches][::2] == ["The quick brown fox.", "fox"]
+    assert matches[1].node.text.endswith("and a fox again.")
+    for match in matches:
+        assert "fox" in lines[match.line]
+    assert index.find("Brown Fox")[0].line == matches[0].line
+
+
+def test_find_next_wraps_and_outline():
+    index, _ = render(PAGE)
+    first = index.find_next("fox")
+    second = index.find_next("fox", first.line)
+    third = index.find_next("fox", second.line)
+    assert first.line < second.line < third.line
+    assert index.find_next("fox", third.line).offset == first.offset
+
+    assert [(h.level, h.title) for h in index.outline()] == [(1, "Intro"), (2, "Details"), (2, "End")]
+    assert index.section_at(second.line).title == "Details"
+    assert index.next_heading(second.line).title == "End"
+    assert index.jump_to("end").line < third.line
+
+
+def test_extract_text_handles_deep_trees():
+    root = node = Node(tag="div", attrs={})
+    for _ in range(5000):
+        child = Node(tag="div", attrs={}, parent=node)
+        node.children.append(child)
+        node = child
+    node.children.append(Node(tag=TerminalRenderer.TEXT_TAG, attrs={}, text="deep", parent=node))
+    assert TerminalRenderer(console=Console(file=io.StringIO())).extract_text(root) == "deep"